@@ -0,0 +1,857 @@
+"""
+Acumuladores combinables para validar archivos por bloques (chunks).
+
+Cada acumulador se alimenta con bloques sucesivos del archivo mediante update()
+y puede combinarse con otro acumulador del mismo tipo mediante merge(), de modo
+que el resultado final es el mismo que se obtendría con el archivo completo en memoria.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    # Con pyarrow las búsquedas de texto (str.contains, str.replace) usan los kernels de Arrow (RE2)
+    TIPO_TEXTO = pd.StringDtype("pyarrow")
+except ImportError:
+    TIPO_TEXTO = pd.StringDtype("python")
+
+from comparacion import ACTUAL, ANTERIOR, ComparadorArchivos
+from duplicados import DetectorDuplicados, hashes_de
+from file_selector import es_columna_texto
+from resultados import MapaFilas
+from rut import calcular_dv, cuerpo_rut, formatear_dv, normalizar_dv, separar_rut
+
+
+# Los RUT caben en un rango entero denso, por lo que los valores distintos
+# se registran en un mapa de bits en lugar de un set de Python.
+LIMITE_BITMAP = 100_000_000
+
+# Bytes del mapa de bits que se desempaquetan de una vez al contar
+BLOQUE_CONTEO = 1 << 20
+
+# Valores distintos hasta los que el perfil de una columna guarda la frecuencia de cada valor
+MAX_FRECUENCIAS = 100_000
+
+# Valores distintos (con la fila de su primera aparición) que guarda ValoresRepetidos para mostrar la
+# muestra sin volver a leer la columna
+MAX_VALORES_MUESTRA = 200_000
+
+# Marca de los nulos en las frecuencias del perfil (NaN no sirve como llave de diccionario)
+NULO = object()
+
+# Clase de caracteres permitidos por defecto en validate_sin_caracteres_especiales (contenido de [...]):
+# letras, vocales acentuadas, ñ, dígitos, espacio y puntuación habitual. Quedan fuera, entre otros,
+# el separador ';', los caracteres de control y las secuencias de mojibake como 'ï»¿' o 'Ã±'
+CARACTERES_PERMITIDOS = "A-Za-z0-9áéíóúÁÉÍÓÚñÑüÜ .,:()'/#°&@_-"
+
+
+def _agregar_primeros(lista, valores, limite):
+    """
+    Agrega a la lista los valores aún no presentes, respetando el orden de aparición,
+    hasta alcanzar el límite. Los nulos se consideran iguales entre sí.
+    """
+    for valor in valores:
+        if len(lista) >= limite:
+            return
+        if pd.isna(valor):
+            if any(pd.isna(v) for v in lista):
+                continue
+        elif valor in lista:
+            continue
+        lista.append(valor)
+
+
+class ConjuntoDistintos:
+    """
+    Conjunto de valores distintos de una columna. Usa un mapa de bits para enteros
+    no negativos menores a LIMITE_BITMAP y, para cualquier otro valor, un arreglo NumPy de
+    valores únicos. Los bloques nuevos quedan pendientes y se consolidan con pd.unique cuando
+    superan al arreglo consolidado, así cada valor se vuelve a hashear un número acotado de veces.
+    Los nulos se ignoran, igual que en nunique().
+    """
+
+    def __init__(self):
+        self.bits = None
+        self.en_valores = False
+        self._valores = None
+        self._pendientes = []
+        self._en_pendientes = 0
+
+    @staticmethod
+    def _es_entero_acotado(valores):
+        if valores.dtype.kind not in "iuf":
+            return False
+        if not (valores.min() >= 0 and valores.max() < LIMITE_BITMAP):
+            return False
+        return valores.dtype.kind != "f" or bool((valores == np.trunc(valores)).all())
+
+    @property
+    def valores(self):
+        """
+        Arreglo de los valores distintos, o None si el conjunto usa el mapa de bits (o está vacío).
+        """
+        self._consolidar()
+        return self._valores
+
+    def _marcar(self, enteros):
+        necesario = int(enteros.max() >> 3) + 1
+        if self.bits is None:
+            self.bits = np.zeros(necesario, dtype=np.uint8)
+        elif len(self.bits) < necesario:
+            bits = np.zeros(necesario, dtype=np.uint8)
+            bits[:len(self.bits)] = self.bits
+            self.bits = bits
+        np.bitwise_or.at(self.bits, enteros >> 3, np.left_shift(1, enteros & 7).astype(np.uint8))
+
+    def _agregar(self, unicos):
+        self._pendientes.append(unicos)
+        self._en_pendientes += len(unicos)
+        if self._en_pendientes > (0 if self._valores is None else len(self._valores)):
+            self._consolidar()
+
+    def _consolidar(self):
+        if not self._pendientes:
+            return
+        partes = ([] if self._valores is None else [self._valores]) + self._pendientes
+        self._valores = pd.unique(np.concatenate(partes)) if len(partes) > 1 else partes[0]
+        self._pendientes = []
+        self._en_pendientes = 0
+
+    def _a_valores(self):
+        # Pasa el mapa de bits a valores cuando llega un valor que no cabe en él
+        self.en_valores = True
+        if self.bits is not None:
+            bits, self.bits = self.bits, None
+            self._agregar(np.flatnonzero(np.unpackbits(bits, bitorder="little")))
+
+    def update(self, valores, unicos=False):
+        """
+        Agrega valores sin nulos (Series o arreglo; unicos=True si ya no tienen repetidos).
+        Retorna sus valores únicos, o None si se marcaron en el mapa de bits sin calcularlos.
+        """
+        valores = np.asarray(valores)
+        if len(valores) == 0:
+            return None
+        if not self.en_valores and self._es_entero_acotado(valores):
+            # Marcar un bit repetido no cambia el mapa, no hace falta deduplicar antes
+            self._marcar(valores.astype(np.int64))
+            return None
+        self._a_valores()
+        if not unicos:
+            valores = pd.unique(valores)
+        self._agregar(valores)
+        return valores
+
+    def merge(self, other):
+        if other.bits is not None and not self.en_valores:
+            self._marcar(np.flatnonzero(np.unpackbits(other.bits, bitorder="little")))
+        elif other.bits is not None or other.en_valores:
+            self._a_valores()
+            if other.bits is not None:
+                self._agregar(np.flatnonzero(np.unpackbits(other.bits, bitorder="little")))
+            if other.en_valores:
+                self._agregar(other.valores)
+
+    def contiene(self, valores):
+        """
+        Retorna un arreglo booleano indicando qué valores ya están en el conjunto.
+        """
+        valores = np.asarray(valores)
+        if len(valores) == 0:
+            return np.zeros(0, dtype=bool)
+        if self.bits is not None and self._es_entero_acotado(valores):
+            enteros = valores.astype(np.int64)
+            dentro = (enteros >> 3) < len(self.bits)
+            resultado = np.zeros(len(enteros), dtype=bool)
+            resultado[dentro] = (self.bits[enteros[dentro] >> 3] >> (enteros[dentro] & 7)) & 1 == 1
+            return resultado
+        if self.bits is not None:
+            self._a_valores()
+        if not self.en_valores:
+            return np.zeros(len(valores), dtype=bool)
+        return pd.Series(valores).isin(self.valores).to_numpy()
+
+    def contar(self, desde=None, hasta=None):
+        """
+        Cuenta los valores distintos dentro del rango [desde, hasta).
+        """
+        if self.bits is not None:
+            inicio = 0 if desde is None else max(int(desde), 0)
+            fin = len(self.bits) * 8 if hasta is None else min(int(hasta), len(self.bits) * 8)
+            if fin <= inicio:
+                return 0
+            total = 0
+            for byte in range(inicio >> 3, ((fin - 1) >> 3) + 1, BLOQUE_CONTEO):
+                bloque = np.unpackbits(self.bits[byte:byte + BLOQUE_CONTEO], bitorder="little")
+                base = byte * 8
+                total += int(bloque[max(inicio - base, 0):fin - base].sum())
+            return total
+        valores = self.valores
+        if valores is None:
+            return 0
+        dentro = np.ones(len(valores), dtype=bool)
+        if desde is not None:
+            dentro &= valores >= desde
+        if hasta is not None:
+            dentro &= valores < hasta
+        return int(dentro.sum())
+
+    def __len__(self):
+        return self.contar()
+
+
+class Acumulador:
+    """
+    Estado parcial de una validación.
+    """
+
+    def update(self, chunk):
+        raise NotImplementedError
+
+    def merge(self, other):
+        raise NotImplementedError
+
+
+class AcumuladorColumna(Acumulador):
+    """
+    Acumulador que solo observa una columna. Los bloques sin la columna se ignoran,
+    la existencia de la columna se verifica al momento de informar.
+    """
+    # True si basta con la columna: el validador puede entregarle la serie ya extraída (update_serie)
+    solo_columna = True
+
+    def __init__(self, column_name):
+        self.column_name = column_name
+
+    def update(self, chunk):
+        if self.column_name in chunk.columns:
+            self.update_serie(chunk[self.column_name])
+
+    def update_serie(self, serie):
+        raise NotImplementedError
+
+
+class FilasRepetidas(Acumulador):
+    """
+    Filas repetidas (equivalente a duplicated(keep='first')) con memoria acotada.
+    """
+
+    def __init__(self):
+        self.detector = DetectorDuplicados()
+
+    def update(self, chunk):
+        h1, h2 = hashes_de(chunk)
+        self.detector.agregar(h1, h2, chunk.index.to_numpy())
+
+    def merge(self, other):
+        self.detector.merge(other.detector)
+
+    def resultado(self):
+        return self.detector.resultado()
+
+
+class ValoresRepetidos(AcumuladorColumna):
+    """
+    Valores repetidos de una columna (sin contar nulos), con el mismo motor que las filas repetidas.
+    Con guardar_valores se guarda además la primera aparición de los primeros MAX_VALORES_MUESTRA
+    valores distintos, de donde sale la muestra del informe sin volver a recorrer el archivo.
+    """
+
+    def __init__(self, column_name, guardar_valores=False):
+        super().__init__(column_name)
+        self.detector = DetectorDuplicados()
+        self.guardar_valores = guardar_valores
+        self.vistos = set()
+        self.valores = {}
+
+    def update_serie(self, serie):
+        serie = serie.dropna()
+        h1, h2 = hashes_de(serie)
+        self.detector.agregar(h1, h2, serie.index.to_numpy())
+        if self.guardar_valores and len(self.valores) < MAX_VALORES_MUESTRA:
+            self._guardar_primeros(serie, h1)
+
+    def _guardar_primeros(self, serie, h1):
+        # Primera aparición de cada hash en el bloque, en orden de fila
+        _, posiciones = np.unique(h1, return_index=True)
+        posiciones.sort()
+        faltan = MAX_VALORES_MUESTRA - len(self.valores)
+        filas = serie.index.to_numpy()
+        for posicion in posiciones.tolist():
+            if faltan == 0:
+                return
+            if h1[posicion] in self.vistos:
+                continue
+            self.vistos.add(h1[posicion])
+            self.valores[int(filas[posicion])] = serie.iloc[posicion]
+            faltan -= 1
+
+    def valores_de(self, filas):
+        """
+        Valores de las filas indicadas (primeras filas de grupos), o None si alguna no se guardó.
+        """
+        if not all(fila in self.valores for fila in filas):
+            return None
+        return [self.valores[fila] for fila in filas]
+
+    def merge(self, other):
+        self.detector.merge(other.detector)
+        for fila, valor in other.valores.items():
+            if len(self.valores) >= MAX_VALORES_MUESTRA:
+                break
+            self.valores.setdefault(fila, valor)
+        self.vistos.update(other.vistos)
+
+    def resultado(self):
+        return self.detector.resultado()
+
+
+class FueraDeRango(AcumuladorColumna):
+    """
+    Valores menores (minimo) o mayores (maximo) al límite indicado. Se guarda el número de
+    valores fuera de rango, una muestra de las primeras filas y el mapa de bits de las filas.
+    """
+
+    def __init__(self, column_name, limite, minimo=True, max_muestra=10):
+        super().__init__(column_name)
+        # Los límites numéricos llegan como texto desde el archivo de validaciones; las fechas como Timestamp
+        self.limite = float(limite) if isinstance(limite, str) else limite
+        self.minimo = minimo
+        self.max_muestra = max_muestra
+        self.infracciones = 0
+        self.muestra = []
+        self.filas = MapaFilas()
+
+    def update_serie(self, serie):
+        fuera = (serie < self.limite if self.minimo else serie > self.limite).to_numpy(dtype=bool)
+        filas = serie.index.to_numpy()[fuera]
+        self.infracciones += len(filas)
+        self.filas.agregar(filas)
+
+        faltan = self.max_muestra - len(self.muestra)
+        if faltan > 0:
+            self.muestra.extend(zip(filas[:faltan].tolist(), serie[fuera].iloc[:faltan].tolist()))
+
+    def merge(self, other):
+        self.infracciones += other.infracciones
+        self.filas.merge(other.filas)
+        self.muestra = sorted(self.muestra + other.muestra)[:self.max_muestra]
+
+
+class TiposColumna(AcumuladorColumna):
+    """
+    Indica si todos los bloques de la columna cumplen cada uno de los tipos de dato posibles.
+    """
+
+    def __init__(self, column_name):
+        super().__init__(column_name)
+        self.cumple = {"texto": True, "entero": True, "decimal": True, "fecha": True}
+
+    def update_serie(self, serie):
+        # Una columna codificada como categórica tiene el tipo de sus categorías, el mismo que
+        # tendría sin codificar (is_string_dtype es True para cualquier categórica)
+        self.cumple["texto"] &= es_columna_texto(serie)
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.cat.categories
+        self.cumple["entero"] &= pd.api.types.is_integer_dtype(serie)
+        self.cumple["decimal"] &= pd.api.types.is_float_dtype(serie)
+        self.cumple["fecha"] &= pd.api.types.is_datetime64_any_dtype(serie)
+
+    def merge(self, other):
+        for tipo, cumple in other.cumple.items():
+            self.cumple[tipo] &= cumple
+
+
+class RutsFalsos(AcumuladorColumna):
+    """
+    Ocurrencias de RUTs de prueba. ruts_prueba es un IndiceRuts, por lo que la búsqueda
+    es una sola operación vectorizada sobre cada bloque.
+    """
+
+    def __init__(self, column_name, ruts_prueba, max_muestra=10):
+        super().__init__(column_name)
+        self.ruts_prueba = ruts_prueba
+        self.max_muestra = max_muestra
+        self.es_entero = True
+        self.total = 0
+        self.ocurrencias = 0
+        self.falsos = set()
+        self.muestra = []
+        self.filas = MapaFilas()
+
+    def update_serie(self, serie):
+        if not pd.api.types.is_integer_dtype(serie):
+            self.es_entero = False
+            return
+        self.total += len(serie)
+        valores = serie.to_numpy()
+        mascara = self.ruts_prueba.contiene(valores)
+        self.ocurrencias += int(mascara.sum())
+        if not mascara.any():
+            return
+        self.falsos.update(np.unique(valores[mascara]).tolist())
+        filas = serie.index.to_numpy()[mascara]
+        self.filas.agregar(filas)
+        faltan = self.max_muestra - len(self.muestra)
+        if faltan > 0:
+            self.muestra.extend(zip(filas[:faltan].tolist(), valores[mascara][:faltan].tolist()))
+
+    def merge(self, other):
+        self.es_entero = self.es_entero and other.es_entero
+        self.total += other.total
+        self.ocurrencias += other.ocurrencias
+        self.falsos.update(other.falsos)
+        self.muestra = sorted(self.muestra + other.muestra)[:self.max_muestra]
+        self.filas.merge(other.filas)
+
+
+class DigitoVerificador(AcumuladorColumna):
+    """
+    Compara el dígito verificador informado con el calculado por módulo 11. El DV se toma
+    de dv_column o, si no se indica, del mismo valor del RUT ("12.345.678-9").
+    Se guarda una muestra acotada de filas con DV incorrecto y el mapa de bits de esas filas.
+    """
+    # Puede leer también la columna del DV
+    solo_columna = False
+
+    def __init__(self, column_name, dv_column=None, max_muestra=10):
+        super().__init__(column_name)
+        self.dv_column = dv_column or None
+        self.max_muestra = max_muestra
+        self.total = 0
+        self.sin_dato = 0
+        self.incorrectos = 0
+        self.muestra = []
+        self.filas = MapaFilas()
+
+    def update(self, chunk):
+        if self.column_name not in chunk.columns or (self.dv_column and self.dv_column not in chunk.columns):
+            return
+
+        rut = chunk[self.column_name]
+        if self.dv_column:
+            cuerpos, dvs = cuerpo_rut(rut), normalizar_dv(chunk[self.dv_column])
+        else:
+            cuerpos, dvs = separar_rut(rut)
+
+        interpretable = ~np.isnan(cuerpos) & ~np.isnan(dvs)
+        self.total += len(rut)
+        self.sin_dato += int((~interpretable).sum())
+
+        esperados = calcular_dv(cuerpos[interpretable])
+        incorrectos = esperados != dvs[interpretable]
+        self.incorrectos += int(incorrectos.sum())
+        if not incorrectos.any():
+            return
+
+        filas = chunk.index.to_numpy()[interpretable][incorrectos]
+        self.filas.agregar(filas)
+        faltan = self.max_muestra - len(self.muestra)
+        if faltan > 0:
+            for fila, cuerpo, dv, esperado in zip(filas[:faltan].tolist(), cuerpos[interpretable][incorrectos], dvs[interpretable][incorrectos], esperados[incorrectos]):
+                self.muestra.append((fila, int(cuerpo), formatear_dv(dv), formatear_dv(esperado)))
+
+    def merge(self, other):
+        self.total += other.total
+        self.sin_dato += other.sin_dato
+        self.incorrectos += other.incorrectos
+        self.muestra = sorted(self.muestra + other.muestra)[:self.max_muestra]
+        self.filas.merge(other.filas)
+
+
+class ComparacionArchivos(Acumulador):
+    """
+    Comparación con el archivo del período anterior. El archivo actual se recibe por bloques
+    como cualquier otro acumulador; el anterior se recorre con leer_anterior() al pedir el resultado.
+    Sin columna clave solo se cuentan las filas de ambos archivos; si ya se conocen las filas del
+    anterior (filas_anterior, por ejemplo de su instantánea) el archivo anterior no se lee.
+    """
+
+    def __init__(self, key_column, columns, leer_anterior, workers=None, filas_anterior=None):
+        self.key_column = key_column
+        self.leer_anterior = leer_anterior
+        self.comparador = ComparadorArchivos(key_column, columns, workers=workers) if key_column else None
+        self.filas = 0
+        self.filas_anterior = filas_anterior if self.comparador is None else None
+        self._resultado = None
+
+    def update(self, chunk):
+        if self.leer_anterior is None and self.filas_anterior is None:
+            return
+        if self.comparador is None:
+            self.filas += len(chunk)
+        else:
+            self.comparador.agregar(ACTUAL, chunk)
+
+    def merge(self, other):
+        raise NotImplementedError("La comparación entre archivos se calcula en un único acumulador")
+
+    def resultado(self):
+        if self._resultado is None and self.filas_anterior is not None:
+            self._resultado = (self.filas, self.filas_anterior)
+        if self._resultado is None:
+            filas_anterior = 0
+            for chunk in self.leer_anterior():
+                if self.comparador is None:
+                    filas_anterior += len(chunk)
+                else:
+                    self.comparador.agregar(ANTERIOR, chunk)
+            if self.comparador is None:
+                self._resultado = (self.filas, filas_anterior)
+            else:
+                resultado = self.comparador.resultado()
+                self._resultado = (resultado.filas_actual, resultado.filas_anterior, resultado)
+        return self._resultado
+
+
+class PerfilColumna(AcumuladorColumna):
+    """
+    Perfil de una columna calculado en una sola pasada: nulos, mínimo, máximo, valores distintos
+    (también por rango) y frecuencia de cada valor. Cada bloque se factoriza una única vez y todo
+    se deriva de sus valores únicos, por lo que la columna no se vuelve a recorrer para cada
+    estadística. Lo comparten describe_rut, validate_sin_valores_nulos y las categorías.
+    Las frecuencias se guardan en orden de aparición hasta MAX_FRECUENCIAS valores distintos.
+    Las filas con nulos se guardan en un mapa de bits (filas_nulas).
+    """
+
+    def __init__(self, column_name):
+        super().__init__(column_name)
+        self.filas = 0
+        self.nulos = 0
+        self.filas_nulas = MapaFilas()
+        self.minimo = None
+        self.maximo = None
+        self.distintos = ConjuntoDistintos()
+        self.frecuencias = {}
+        self.numerico = set()
+        # Valores de tipos sin orden entre sí (números y textos): la columna no tiene extremos
+        self.sin_orden = False
+
+    def _actualizar_extremos(self, maximo, minimo):
+        if self.sin_orden:
+            return
+        try:
+            if maximo is not None and not pd.isna(maximo):
+                self.maximo = maximo if self.maximo is None else max(self.maximo, maximo)
+            if minimo is not None and not pd.isna(minimo):
+                self.minimo = minimo if self.minimo is None else min(self.minimo, minimo)
+        except TypeError:
+            # Un bloque se leyó como número y otro como texto: igual que con el archivo completo, sin extremos
+            self._sin_orden()
+
+    def _sin_orden(self):
+        self.sin_orden = True
+        self.maximo = self.minimo = None
+
+    def _agregar_frecuencias(self, valores, conteos):
+        if self.frecuencias is None:
+            return
+        nuevos = sum(1 for valor in valores if valor not in self.frecuencias)
+        if len(self.frecuencias) + nuevos > MAX_FRECUENCIAS:
+            # Columna de alta cardinalidad: no es categórica y no se guardan sus frecuencias
+            self.frecuencias = None
+            return
+        for valor, conteo in zip(valores, conteos):
+            self.frecuencias[valor] = self.frecuencias.get(valor, 0) + conteo
+
+    def update_serie(self, serie):
+        self.filas += len(serie)
+        self.numerico.add(pd.api.types.is_numeric_dtype(serie))
+        nulos = serie.isna().to_numpy()
+        if nulos.any():
+            self.filas_nulas.agregar(serie.index.to_numpy()[nulos])
+        if self.frecuencias is not None:
+            # En una columna categórica se factorizan los códigos enteros, no los textos
+            codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+            if len(unicos) == 0:
+                return
+            conteos = np.bincount(codigos, minlength=len(unicos))
+            unicos = pd.Series(np.asarray(unicos) if isinstance(unicos.dtype, pd.CategoricalDtype) else unicos)
+            nulos_unicos = unicos.isna().to_numpy()
+            self.nulos += int(conteos[nulos_unicos].sum())
+            presentes = unicos[~nulos_unicos].to_numpy()
+            if len(unicos) > MAX_FRECUENCIAS:
+                # Columna de alta cardinalidad: no es categórica y no se guardan sus frecuencias
+                self.frecuencias = None
+            else:
+                valores = [NULO if nulo else valor for valor, nulo in zip(unicos.tolist(), nulos_unicos)]
+                self._agregar_frecuencias(valores, conteos.tolist())
+            self.distintos.update(presentes, unicos=True)
+        else:
+            # Sin frecuencias no se materializan los valores: nulos, distintos y extremos son vectorizados
+            self.nulos += int(nulos.sum())
+            presentes = serie.to_numpy()[~nulos] if nulos.any() else serie.to_numpy()
+            unicos = self.distintos.update(presentes)
+            if unicos is not None and presentes.dtype.kind not in "iufM":
+                # Los extremos de texto se buscan solo entre los valores únicos
+                presentes = unicos
+        if self.sin_orden:
+            return
+        try:
+            self._actualizar_extremos(*self._extremos(presentes))
+        except TypeError:
+            # Columna con tipos mezclados, sin orden definido
+            self._sin_orden()
+
+    @staticmethod
+    def _extremos(valores):
+        """
+        Máximo y mínimo de un arreglo sin nulos (None si está vacío). Lanza TypeError si los valores
+        no tienen orden definido.
+        """
+        if len(valores) == 0:
+            return None, None
+        if valores.dtype.kind in "iuf":
+            return valores.max(), valores.min()
+        if valores.dtype.kind == "M":
+            return pd.Timestamp(valores.max()), pd.Timestamp(valores.min())
+        serie = pd.Series(valores)
+        return serie.max(), serie.min()
+
+    def merge(self, other):
+        self.filas += other.filas
+        self.nulos += other.nulos
+        self.filas_nulas.merge(other.filas_nulas)
+        self.distintos.merge(other.distintos)
+        if other.sin_orden:
+            self._sin_orden()
+        self._actualizar_extremos(other.maximo, other.minimo)
+        self.numerico |= other.numerico
+        if other.frecuencias is None:
+            self.frecuencias = None
+        else:
+            self._agregar_frecuencias(list(other.frecuencias), list(other.frecuencias.values()))
+
+    def mas_frecuentes(self, n=5):
+        """
+        Retorna los n valores no nulos más frecuentes como tuplas (valor, veces), o None
+        si la columna tiene demasiados valores distintos.
+        """
+        if self.frecuencias is None:
+            return None
+        return heapq.nlargest(n, ((valor, veces) for valor, veces in self.frecuencias.items() if valor is not NULO),
+                              key=lambda item: item[1])
+
+
+class Categorias(AcumuladorColumna):
+    """
+    Pertenencia a categorías. Solo se guardan los primeros valores encontrados e inválidos
+    (en orden de aparición), que es lo que se muestra en el informe.
+    """
+
+    def __init__(self, column_name, categorias_str, max_encontrados=16, max_invalidos=11):
+        super().__init__(column_name)
+        self.categorias_str = categorias_str
+        self.max_encontrados = max_encontrados
+        self.max_invalidos = max_invalidos
+        self.error_conversion = False
+        self.invalidos = 0
+        self.encontrados = []
+        self.primeros_invalidos = []
+
+    @classmethod
+    def desde_perfil(cls, perfil, categorias_str):
+        """
+        Calcula la pertenencia a categorías con las frecuencias del perfil de la columna, sin
+        volver a recorrerla. Retorna None si el perfil no guardó frecuencias (demasiados valores
+        distintos) o si la columna fue numérica solo en algunos bloques.
+        """
+        if perfil.frecuencias is None or len(perfil.numerico) > 1:
+            return None
+        categorias = cls(perfil.column_name, categorias_str)
+        convertidas = categorias._convertir(True in perfil.numerico)
+        if convertidas is None:
+            categorias.error_conversion = True
+            return categorias
+
+        convertidas = set(convertidas)
+        valores = [np.nan if valor is NULO else valor for valor in perfil.frecuencias]
+        invalidos = [valor for valor in valores if pd.isna(valor) or valor not in convertidas]
+        categorias.invalidos = sum(veces for valor, veces in perfil.frecuencias.items()
+                                   if valor is NULO or valor not in convertidas)
+        _agregar_primeros(categorias.encontrados, valores, categorias.max_encontrados)
+        _agregar_primeros(categorias.primeros_invalidos, invalidos, categorias.max_invalidos)
+        return categorias
+
+    def _convertir(self, numerico):
+        # Las categorías se convierten al tipo de dato de la columna
+        try:
+            if numerico:
+                return [float(cat) if '.' in cat else int(cat) for cat in self.categorias_str]
+            return self.categorias_str
+        except ValueError:
+            return None
+
+    def update_serie(self, serie):
+        categorias = self._convertir(pd.api.types.is_numeric_dtype(serie))
+        if categorias is None:
+            self.error_conversion = True
+            return
+
+        pertenece = serie.isin(categorias)
+        self.invalidos += int((~pertenece).sum())
+        _agregar_primeros(self.encontrados, serie.unique().tolist(), self.max_encontrados)
+        _agregar_primeros(self.primeros_invalidos, serie[~pertenece].unique().tolist(), self.max_invalidos)
+
+    def merge(self, other):
+        self.error_conversion = self.error_conversion or other.error_conversion
+        self.invalidos += other.invalidos
+        _agregar_primeros(self.encontrados, other.encontrados, self.max_encontrados)
+        _agregar_primeros(self.primeros_invalidos, other.primeros_invalidos, self.max_invalidos)
+
+
+class CaracteresEspeciales(AcumuladorColumna):
+    """
+    Valores con caracteres fuera de la clase permitida. La columna se recorre completa con
+    expresiones regulares vectorizadas (kernels de Arrow si pyarrow está disponible): una para
+    marcar las filas y otra que borra los caracteres permitidos de esas filas, de modo que solo
+    los valores distintos de lo que queda se recorren en Python. En columnas categóricas solo
+    se revisa el diccionario de valores.
+    Params:
+        permitidos (str): Contenido de una clase de caracteres, por ejemplo "A-Za-z0-9 ".
+    """
+
+    def __init__(self, column_name, permitidos=None, max_muestra=10):
+        super().__init__(column_name)
+        self.permitidos = permitidos or CARACTERES_PERMITIDOS
+        self.max_muestra = max_muestra
+        self.infracciones = 0
+        self.caracteres = {}
+        self.muestra = []
+        self.filas = MapaFilas()
+
+    def _marcar(self, texto):
+        """
+        Retorna la máscara de valores con algún carácter no permitido y, para esos valores,
+        solo sus caracteres no permitidos.
+        """
+        mascara = texto.str.contains(f"[^{self.permitidos}]", regex=True).fillna(False).to_numpy(dtype=bool)
+        return mascara, texto[mascara].str.replace(f"[{self.permitidos}]+", "", regex=True).to_numpy()
+
+    def update_serie(self, serie):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            marcadas, residuos = self._marcar(pd.Series(serie.cat.categories).astype(TIPO_TEXTO))
+            codigos = serie.cat.codes.to_numpy()
+            # Cada categoría marcada cuenta tantas veces como filas la tienen (el código -1 es nulo)
+            veces = np.bincount(codigos[codigos >= 0], minlength=len(marcadas))[marcadas]
+            residuos = pd.Series(veces, index=residuos)
+            mascara = (codigos >= 0) & marcadas[codigos]
+        else:
+            mascara, residuos = self._marcar(serie.astype(TIPO_TEXTO))
+            residuos = pd.Series(residuos).value_counts()
+
+        for residuo, veces in residuos.items():
+            for caracter in set(residuo):
+                self.caracteres[caracter] = self.caracteres.get(caracter, 0) + int(veces)
+
+        filas = serie.index.to_numpy()[mascara]
+        self.infracciones += len(filas)
+        self.filas.agregar(filas)
+        faltan = self.max_muestra - len(self.muestra)
+        if faltan > 0:
+            self.muestra.extend(zip(filas[:faltan].tolist(), serie[mascara].iloc[:faltan].tolist()))
+
+    def merge(self, other):
+        self.infracciones += other.infracciones
+        for caracter, veces in other.caracteres.items():
+            self.caracteres[caracter] = self.caracteres.get(caracter, 0) + veces
+        self.muestra = sorted(self.muestra + other.muestra)[:self.max_muestra]
+        self.filas.merge(other.filas)
+
+
+class Comunas(AcumuladorColumna):
+    """
+    Valores de una columna de comunas que no están en la tabla de comunas (IndiceComunas), por
+    código o por nombre. Cada bloque se factoriza y solo sus valores distintos se buscan en el
+    índice. Con nombre_column se revisa además que el nombre de cada fila corresponda a su código
+    (solo cuando ambos se encuentran en la tabla).
+    """
+
+    def __init__(self, column_name, indice, nombre_column=None, max_muestra=10):
+        super().__init__(column_name)
+        self.indice = indice
+        self.nombre_column = nombre_column or None
+        # Sin columna de nombre basta con la serie de la columna
+        self.solo_columna = self.nombre_column is None
+        self.max_muestra = max_muestra
+        self.sin_dato = 0
+        self.desconocidas = {}
+        self.inconsistentes = 0
+        self.pares_inconsistentes = {}
+        self.muestra = []
+        self.filas = MapaFilas()
+
+    @property
+    def infracciones(self):
+        return sum(self.desconocidas.values()) + self.inconsistentes
+
+    def _resolver(self, serie):
+        """
+        Códigos de la serie factorizada, valores distintos y su código de comuna en la tabla.
+        """
+        codigos, unicos = pd.factorize(serie)
+        return codigos, unicos, self.indice.resolver(unicos)
+
+    def _agregar_muestra(self, filas, valores):
+        faltan = self.max_muestra - len(self.muestra)
+        if faltan > 0:
+            self.muestra.extend(zip(filas[:faltan].tolist(), valores[:faltan]))
+
+    def update(self, chunk):
+        if self.column_name not in chunk.columns or (self.nombre_column and self.nombre_column not in chunk.columns):
+            return
+        serie = chunk[self.column_name]
+        codigos, unicos, comunas = self._resolver(serie)
+        self._contar_desconocidas(serie, codigos, unicos, comunas)
+        if self.nombre_column:
+            self._contar_inconsistentes(chunk, codigos, unicos, comunas)
+
+    def update_serie(self, serie):
+        self._contar_desconocidas(serie, *self._resolver(serie))
+
+    def _contar_desconocidas(self, serie, codigos, unicos, comunas):
+        self.sin_dato += int((codigos < 0).sum())
+        desconocidos = np.flatnonzero(comunas < 0)
+        if not len(desconocidos):
+            return
+
+        # Cada valor distinto desconocido cuenta tantas veces como filas lo tienen
+        veces = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+        for posicion in desconocidos:
+            valor = unicos[posicion]
+            self.desconocidas[valor] = self.desconocidas.get(valor, 0) + int(veces[posicion])
+        mascara = (codigos >= 0) & (comunas[codigos] < 0)
+        filas = serie.index.to_numpy()[mascara]
+        self.filas.agregar(filas)
+        self._agregar_muestra(filas, serie[mascara].iloc[:self.max_muestra].tolist())
+
+    def _contar_inconsistentes(self, chunk, codigos, unicos, comunas):
+        codigos_nombre, unicos_nombre, comunas_nombre = self._resolver(chunk[self.nombre_column])
+        if not len(unicos) or not len(unicos_nombre):
+            return
+        # Código de comuna de cada fila según cada columna (DESCONOCIDA si es nulo o no está en la tabla)
+        por_codigo = np.where(codigos >= 0, comunas[codigos], -1)
+        por_nombre = np.where(codigos_nombre >= 0, comunas_nombre[codigos_nombre], -1)
+        distintas = np.flatnonzero((por_codigo >= 0) & (por_nombre >= 0) & (por_codigo != por_nombre))
+        if not len(distintas):
+            return
+
+        self.inconsistentes += len(distintas)
+        pares = list(zip(unicos[codigos[distintas]], unicos_nombre[codigos_nombre[distintas]]))
+        for par, veces in pd.Series(pares).value_counts().items():
+            self.pares_inconsistentes[par] = self.pares_inconsistentes.get(par, 0) + int(veces)
+        filas = chunk.index.to_numpy()[distintas]
+        self.filas.agregar(filas)
+        self._agregar_muestra(filas, [f"{codigo} / {nombre}" for codigo, nombre in pares[:self.max_muestra]])
+
+    def merge(self, other):
+        self.sin_dato += other.sin_dato
+        for valor, veces in other.desconocidas.items():
+            self.desconocidas[valor] = self.desconocidas.get(valor, 0) + veces
+        self.inconsistentes += other.inconsistentes
+        for par, veces in other.pares_inconsistentes.items():
+            self.pares_inconsistentes[par] = self.pares_inconsistentes.get(par, 0) + veces
+        self.muestra = sorted(self.muestra + other.muestra)[:self.max_muestra]
+        self.filas.merge(other.filas)
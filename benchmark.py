@@ -0,0 +1,249 @@
+"""
+Benchmark del validador con entregas sintéticas.
+
+Genera archivos parecidos a las entregas reales (separados por ";", latin1, con BOM en el
+encabezado) y su archivo de validaciones, y mide cada etapa en un proceso nuevo por tamaño:
+FileSelector.load_file, la creación del Validador, cada validate_* del plan y
+Informe.create_informe. Para cada etapa se registra el tiempo y el máximo de memoria
+residente (RSS) del proceso hasta ese momento.
+
+Los resultados se agregan a un CSV junto con el commit de git, de modo que se pueden
+comparar versiones; al terminar se muestra la variación respecto de la última medición
+de otro commit.
+
+Columnas de la entrega sintética:
+    - RUT: entero; una fracción se toma de RUTDEPRUEBAS.csv y algunos se repiten.
+    - DV: dígito verificador, con una fracción incorrecta.
+    - sexo, region: categorías (con valores fuera de categoría).
+    - monto: decimal con nulos y valores negativos.
+    - fecha_ingreso: fecha AAAA-MM-DD con nulos.
+    - glosa: texto con tildes y algunos caracteres especiales.
+Además, una fracción de las filas son copias exactas de otras filas.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from metricas import memoria_maxima_mb
+from rut import DV_K, calcular_dv
+
+
+TAMANOS = (1_000_000, 10_000_000, 50_000_000)
+
+# Filas que se generan en memoria por vez
+BLOQUE_GENERACION = 1_000_000
+
+RESULTADOS_FILENAME = "benchmark_resultados.csv"
+
+COLUMNAS = ["RUT", "DV", "sexo", "region", "monto", "fecha_ingreso", "glosa"]
+
+VALIDACIONES = [
+    ("", "validate_filename(BENCHMARK_N)"),
+    ("", "validate_sin_filas_repetidas()"),
+    ("", "validate_sin_filas_vacias()"),
+    ("", f"validate_column_names({','.join(COLUMNAS)})"),
+    ("RUT", "validate_sin_ruts_falsos()"),
+    ("RUT", "describe_rut()"),
+    ("RUT", "validate_digito_verificador(DV)"),
+    ("RUT", "validate_sin_valores_repetidos()"),
+    ("monto", "validate_sin_valores_nulos()"),
+    ("monto", "validate_mayor_igual_a(0)"),
+    ("monto", "validate_menor_igual_a(900000)"),
+    ("monto", "validate_column_type(decimal)"),
+    ("sexo", "validate_pertenece_a_categorias(M,F)"),
+    ("region", "validate_pertenece_a_categorias(1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16)"),
+]
+
+GLOSAS = np.array(["Atención primaria", "Educación técnica", "Pensión básica", "Subsidio único",
+                   "Bonificación año", "Retención", "Devolución #12", "Asignación (especial)"])
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def generar_bloque(rng, filas, ruts_prueba):
+    """
+    Genera un bloque de la entrega sintética.
+    """
+    ruts = rng.integers(1_000_000, 60_000_000, filas)
+    # 0,1% de RUTs de prueba y 0,5% de RUTs repetidos
+    prueba = rng.random(filas) < 0.001
+    ruts[prueba] = rng.choice(ruts_prueba, int(prueba.sum()))
+    repetidos = rng.random(filas) < 0.005
+    ruts[repetidos] = ruts[rng.integers(0, filas, int(repetidos.sum()))]
+
+    dvs = calcular_dv(ruts)
+    incorrectos = rng.random(filas) < 0.001
+    dvs[incorrectos] = (dvs[incorrectos] + 1) % 11
+
+    montos = np.round(rng.gamma(2.0, 50_000, filas), 2)
+    montos[rng.random(filas) < 0.001] *= -1
+    fechas = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1_500, filas), unit="D")
+
+    df = pd.DataFrame({
+        "RUT": ruts,
+        "DV": np.where(dvs == DV_K, "K", dvs.astype(str)),
+        "sexo": rng.choice(np.array(["M", "F", "X"]), filas, p=[0.49, 0.49, 0.02]),
+        "region": rng.integers(1, 18, filas),
+        "monto": montos,
+        "fecha_ingreso": fechas.strftime("%Y-%m-%d"),
+        "glosa": rng.choice(GLOSAS, filas),
+    })
+
+    # Nulos en monto y fecha
+    df.loc[rng.random(filas) < 0.01, "monto"] = np.nan
+    df.loc[rng.random(filas) < 0.005, "fecha_ingreso"] = None
+
+    # 0,2% de filas copiadas de otra fila del bloque
+    indice = np.arange(filas)
+    copias = rng.random(filas) < 0.002
+    indice[copias] = rng.integers(0, filas, int(copias.sum()))
+    return df.iloc[indice]
+
+
+def generar_entrega(file_path, filas, ruts_prueba_path, semilla=0):
+    """
+    Escribe una entrega sintética de `filas` filas por bloques (no se mantiene completa en memoria).
+    """
+    rng = np.random.default_rng(semilla)
+    ruts_prueba = pd.read_csv(ruts_prueba_path, sep=";", encoding="latin1").iloc[:, 0]
+    ruts_prueba = pd.to_numeric(ruts_prueba, errors="coerce").dropna().astype(np.int64).to_numpy()
+
+    print(f"🛠️  Generando {file_path} ({filas:,} filas)...".replace(",", "."))
+    with open(file_path, "wb") as f:
+        # BOM de UTF-8 como lo dejan algunas planillas; el validador lo limpia del encabezado
+        f.write(b"\xef\xbb\xbf")
+        for inicio in range(0, filas, BLOQUE_GENERACION):
+            df = generar_bloque(rng, min(BLOQUE_GENERACION, filas - inicio), ruts_prueba)
+            f.write(df.to_csv(sep=";", index=False, header=inicio == 0).encode("latin1"))
+
+
+def generar_validaciones(file_path, filas):
+    df = pd.DataFrame(VALIDACIONES, columns=["campo", "validacion"])
+    df["validacion"] = df["validacion"].str.replace("BENCHMARK_N", f"benchmark_{filas}")
+    df.to_csv(file_path, sep=";", index=False, encoding="latin1")
+
+
+def _medir(resultados, paso, funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    valor = funcion(*args, **kwargs)
+    resultados.append({"paso": paso, "segundos": round(time.perf_counter() - inicio, 4), "rss_max_mb": round(memoria_maxima_mb(), 1)})
+    print(f"   {paso}: {resultados[-1]['segundos']:.2f} s, RSS máx. {resultados[-1]['rss_max_mb']:,.0f} MB")
+    return valor
+
+
+def medir_entrega(file_path, validations_path, ruts_prueba_path, chunksize=None):
+    """
+    Mide cada etapa de la validación de una entrega. Se ejecuta en un proceso propio (ver
+    __main__) para que el máximo de memoria corresponda solo a esta entrega.
+    Returns:
+        list: Diccionarios con paso, segundos y rss_max_mb.
+    """
+    from file_selector import FileSelector
+    from validaciones import Validador
+
+    resultados = []
+    output_folder = os.path.dirname(os.path.abspath(file_path))
+    if not chunksize:
+        _medir(resultados, "FileSelector.load_file", FileSelector().load_file, file_path, use_cache=False)
+    validador = _medir(resultados, "Validador.__init__", Validador, file_path, validations_path, ruts_prueba_path,
+                       chunksize=chunksize, use_cache=False, gabinete="", output_folder=output_folder)
+    for regla in validador.plan:
+        _medir(resultados, f"{regla.funcion}({regla.campo or ''})",
+               validador.validations_availables[regla.funcion], regla.campo, regla.param)
+    _medir(resultados, "Informe.create_informe", validador.informe.create_informe)
+    return resultados
+
+
+def guardar_resultados(resultados_path, filas, resultados, commit, modo):
+    df = pd.DataFrame(resultados)
+    df.insert(0, "fecha", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"))
+    df.insert(1, "commit", commit)
+    df.insert(2, "modo", modo)
+    df.insert(3, "filas", filas)
+    df.to_csv(resultados_path, sep=";", index=False, mode="a", header=not os.path.exists(resultados_path))
+
+
+def comparar_con_anterior(resultados_path, filas, commit, modo):
+    """
+    Muestra la variación de tiempo de cada paso respecto de la última medición de otro commit.
+    """
+    historial = pd.read_csv(resultados_path, sep=";", dtype={"commit": str})
+    historial = historial[(historial["filas"] == filas) & (historial["modo"] == modo)]
+    anteriores = historial[historial["commit"] != commit]
+    if anteriores.empty:
+        return
+    ultimo = anteriores[anteriores["fecha"] == anteriores["fecha"].max()]
+    actual = historial[historial["fecha"] == historial["fecha"].max()]
+    comparacion = actual.merge(ultimo, on="paso", suffixes=("", "_anterior"))
+    print(f"📈 Variación respecto del commit {ultimo['commit'].iloc[0]}:")
+    for _, fila in comparacion.iterrows():
+        variacion = (fila["segundos"] / fila["segundos_anterior"] - 1) if fila["segundos_anterior"] else float("nan")
+        print(f"   {fila['paso']}: {fila['segundos_anterior']:.2f} s -> {fila['segundos']:.2f} s ({variacion:+.1%})")
+
+
+if __name__ == "__main__":
+    # Opciones: --filas=1000000,10000000 --carpeta=CARPETA --bloques=N --resultados=ARCHIVO --regenerar
+    # Uso interno: --medir <archivo> <validaciones> <ruts_prueba> [--bloques=N] ejecuta la medición de una entrega
+    carpeta_base = os.path.dirname(os.path.abspath(__file__))
+    opciones = {"filas": ",".join(str(filas) for filas in TAMANOS), "carpeta": os.path.join(carpeta_base, "benchmark_datos"),
+                "bloques": None, "resultados": None, "ruts": os.path.join(carpeta_base, "RUTDEPRUEBAS.csv")}
+    regenerar = False
+    argumentos = []
+    for arg in sys.argv[1:]:
+        if arg == "--regenerar":
+            regenerar = True
+        elif arg.startswith("--") and "=" in arg and arg[2:].split("=", 1)[0] in opciones:
+            nombre, valor = arg[2:].split("=", 1)
+            opciones[nombre] = valor
+        else:
+            argumentos.append(arg)
+    chunksize = int(opciones["bloques"]) if opciones["bloques"] else None
+
+    if argumentos[:1] == ["--medir"] and len(argumentos) == 4:
+        print(json.dumps(medir_entrega(argumentos[1], argumentos[2], argumentos[3], chunksize)))
+        sys.exit(0)
+    if argumentos:
+        print("Uso del programa:")
+        print("  python benchmark.py [--filas=1000000,10000000,50000000] [--carpeta=CARPETA] [--bloques=N] "
+              "[--resultados=ARCHIVO] [--ruts=RUTDEPRUEBAS.csv] [--regenerar]")
+        sys.exit(1)
+
+    os.makedirs(opciones["carpeta"], exist_ok=True)
+    resultados_path = opciones["resultados"] or os.path.join(opciones["carpeta"], RESULTADOS_FILENAME)
+    commit = _commit()
+    modo = f"bloques_{chunksize}" if chunksize else "memoria"
+
+    for filas in (int(valor) for valor in opciones["filas"].split(",")):
+        file_path = os.path.join(opciones["carpeta"], f"benchmark_{filas}.csv")
+        validations_path = os.path.join(opciones["carpeta"], f"validaciones_benchmark_{filas}.csv")
+        if regenerar or not os.path.exists(file_path):
+            generar_entrega(file_path, filas, opciones["ruts"])
+        generar_validaciones(validations_path, filas)
+
+        print(f"⏱️  Midiendo entrega de {filas:,} filas ({modo})...".replace(",", "."))
+        comando = [sys.executable, os.path.abspath(__file__), "--medir", file_path, validations_path, opciones["ruts"]]
+        if chunksize:
+            comando.append(f"--bloques={chunksize}")
+        proceso = subprocess.run(comando, cwd=carpeta_base, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            print(f"❌ Error al medir la entrega de {filas:,} filas:".replace(",", "."))
+            print(proceso.stderr[-2000:])
+            continue
+        resultados = json.loads(proceso.stdout.strip().splitlines()[-1])
+        for resultado in resultados:
+            print(f"   {resultado['paso']}: {resultado['segundos']:.2f} s, RSS máx. {resultado['rss_max_mb']:,.0f} MB")
+        guardar_resultados(resultados_path, filas, resultados, commit, modo)
+        comparar_con_anterior(resultados_path, filas, commit, modo)
+
+    print(f"✅ Resultados guardados en {resultados_path}")
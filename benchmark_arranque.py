@@ -0,0 +1,76 @@
+"""
+Benchmark del tiempo de arranque del validador.
+
+Mide en procesos nuevos (como los lanza un programador de tareas) cuánto tarda importar
+validaciones.py y verifica que no se carguen tkinter ni reportlab al importarlo. Termina con
+código 1 si la mediana supera el límite o si se cargó algún módulo pesado, para usarlo como
+control de regresiones.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+# Módulos que solo deben cargarse cuando se usan (diálogos y PDF)
+MODULOS_DIFERIDOS = ("tkinter", "reportlab")
+
+CODIGO_IMPORTACION = (
+    "import sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import validaciones\n"
+    "print(time.perf_counter() - inicio)\n"
+    f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules if m.startswith({MODULOS_DIFERIDOS!r})}})))\n"
+)
+
+
+def medir_arranque(repeticiones=10):
+    """
+    Importa validaciones.py en procesos nuevos.
+    Returns:
+        tuple: (segundos de importación, segundos del proceso completo, módulos diferidos cargados)
+    """
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    importaciones = []
+    procesos = []
+    cargados = set()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, "-c", CODIGO_IMPORTACION], cwd=carpeta, capture_output=True,
+                                text=True, check=True).stdout.splitlines()
+        procesos.append(time.perf_counter() - inicio)
+        importaciones.append(float(salida[0]))
+        if len(salida) > 1 and salida[1]:
+            cargados.update(salida[1].split(","))
+    return importaciones, procesos, cargados
+
+
+if __name__ == "__main__":
+    # Opciones: --repeticiones=N, --limite=SEGUNDOS (mediana máxima de importación)
+    opciones = {"repeticiones": "10", "limite": "1.5"}
+    for arg in sys.argv[1:]:
+        if arg.startswith("--") and "=" in arg and arg[2:].split("=", 1)[0] in opciones:
+            nombre, valor = arg[2:].split("=", 1)
+            opciones[nombre] = valor
+        else:
+            print("Uso del programa:")
+            print("  python benchmark_arranque.py [--repeticiones=N] [--limite=SEGUNDOS]")
+            sys.exit(1)
+
+    limite = float(opciones["limite"])
+    importaciones, procesos, cargados = medir_arranque(int(opciones["repeticiones"]))
+    mediana = statistics.median(importaciones)
+    print(f"⏱️  Importación de validaciones: mediana {mediana:.3f} s (mín {min(importaciones):.3f} s, máx {max(importaciones):.3f} s)")
+    print(f"⏱️  Proceso completo: mediana {statistics.median(procesos):.3f} s")
+
+    errores = []
+    if cargados:
+        errores.append(f"se cargaron módulos que deberían importarse solo al usarlos: {', '.join(sorted(cargados))}")
+    if mediana > limite:
+        errores.append(f"la mediana de importación ({mediana:.3f} s) supera el límite de {limite:.3f} s")
+    for error in errores:
+        print(f"❌ Regresión de arranque: {error}")
+    if errores:
+        sys.exit(1)
+    print("✅ Arranque dentro del límite")
@@ -0,0 +1,157 @@
+"""
+Caché columnar persistente de archivos ya parseados.
+
+Cada columna parseada (incluida la conversión de fechas) se guarda como un archivo Feather
+dentro de una entrada identificada por el hash del contenido y el tamaño del archivo original.
+Las ejecuciones siguientes leen esas columnas con memory-map en lugar de volver a parsear el CSV.
+El hash de cada ruta se recuerda junto a su tamaño y fecha de modificación, por lo que solo
+se recalcula cuando el archivo cambia. Cada ruta tiene su propio archivo en la carpeta indice,
+así dos ejecuciones simultáneas no se pisan al registrar archivos distintos.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+
+CACHE_DIR = os.environ.get("VALIDADOR_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "validador"))
+
+# Tamaño máximo de la caché; al superarlo se eliminan las entradas usadas hace más tiempo
+MAX_BYTES = int(os.environ.get("VALIDADOR_CACHE_MAX_MB", "5120")) * 1024 * 1024
+
+# Carpeta con el registro de hash de cada ruta; no es una entrada de la caché
+INDICE = "indice"
+
+
+class CacheArchivos:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.indice_dir = os.path.join(cache_dir, INDICE)
+
+    @property
+    def disponible(self):
+        return pa is not None
+
+    def _hash_contenido(self, file_path):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            for bloque in iter(lambda: f.read(8 * 1024 * 1024), b""):
+                digest.update(bloque)
+        return digest.hexdigest()
+
+    def _registro_path(self, ruta):
+        nombre = hashlib.sha1(ruta.encode("utf-8")).hexdigest()
+        return os.path.join(self.indice_dir, f"{nombre}.json")
+
+    def _leer_registro(self, ruta):
+        try:
+            with open(self._registro_path(ruta), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def clave(self, file_path):
+        """
+        Clave de la entrada de caché: hash del contenido y tamaño. El hash se reutiliza
+        mientras el tamaño y la fecha de modificación de la ruta no cambien.
+        """
+        ruta = os.path.abspath(file_path)
+        stat = os.stat(ruta)
+        registro = self._leer_registro(ruta)
+        if registro and registro["size"] == stat.st_size and registro["mtime_ns"] == stat.st_mtime_ns:
+            return f"{registro['hash']}_{stat.st_size}"
+
+        hash_contenido = self._hash_contenido(ruta)
+        registro = {"ruta": ruta, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": hash_contenido}
+        os.makedirs(self.indice_dir, exist_ok=True)
+        registro_path = self._registro_path(ruta)
+        tmp_path = f"{registro_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(registro, f)
+        os.replace(tmp_path, registro_path)
+        return f"{hash_contenido}_{stat.st_size}"
+
+    def _columna_path(self, clave, column, variante):
+        nombre = hashlib.sha1(f"{column}|{variante}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, clave, f"{nombre}.feather")
+
+    def leer(self, clave, columns, variantes):
+        """
+        Retorna un diccionario columna -> Series con las columnas presentes en la caché.
+        """
+        encontradas = {}
+        for column in columns:
+            path = self._columna_path(clave, column, variantes.get(column, ""))
+            if not os.path.exists(path):
+                continue
+            try:
+                serie = feather.read_table(path, memory_map=True).to_pandas().iloc[:, 0]
+            except Exception:
+                continue
+            # Arrow devuelve None como nulo de texto; pandas usa NaN al leer el CSV
+            if serie.dtype == object:
+                serie = serie.where(serie.notna(), np.nan)
+            encontradas[column] = serie.rename(column)
+
+        if encontradas:
+            os.utime(os.path.join(self.cache_dir, clave))
+        return encontradas
+
+    def guardar(self, clave, df, variantes):
+        os.makedirs(os.path.join(self.cache_dir, clave), exist_ok=True)
+        for column in df.columns:
+            path = self._columna_path(clave, column, variantes.get(column, ""))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                tabla = pa.Table.from_pandas(df[[column]].rename(columns=str), preserve_index=False)
+                feather.write_feather(tabla, tmp_path, compression="uncompressed")
+                os.replace(tmp_path, path)
+            except Exception:
+                # Columnas con tipos mezclados no se pueden guardar en formato columnar
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self.desalojar()
+
+    def desalojar(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta que la caché quede bajo max_bytes.
+        """
+        entradas = []
+        for nombre in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, nombre)
+            if nombre == INDICE or not os.path.isdir(path):
+                continue
+            tamano = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entradas.append((os.path.getmtime(path), tamano, path))
+
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, path in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= tamano
+
+    def limpiar(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def variantes_de(columns, dtype, motor="pandas", categorias=None):
+    """
+    Variante de parseo de cada columna, parte de la clave de caché: una misma columna
+    leída con otro dtype, otro motor u otros límites de categorías se guarda por separado.
+    Params:
+        motor (str): Lector del archivo ("pandas" o "arrow"), que puede inferir otros tipos.
+        categorias (tuple): Límites con que se codifican las columnas categóricas.
+    """
+    dtype = dtype or {}
+    return {column: f"{motor}|{categorias!r}|{dtype.get(column, '')!r}" for column in columns}
+
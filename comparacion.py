@@ -0,0 +1,283 @@
+"""
+Comparación fila a fila entre el archivo validado y el del período anterior.
+
+Ambos archivos se recorren por bloques. Cada fila se resume en su clave (el valor entero de la
+columna clave o, si no es un entero, un hash de 64 bits), su número de fila y un hash por cada
+columna común. Claves y valores se llevan antes a una forma normal que no depende del tipo que
+pandas infirió para cada bloque de cada archivo. Los registros se reparten en particiones según la
+clave y se vuelcan a disco cuando superan el presupuesto de memoria. Al final cada partición se
+cruza por separado (hash join con arreglos NumPy ordenados), en paralelo en un pool de hilos.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+PARTICIONES = 16
+
+# Memoria máxima para registros antes de volcarlos a disco
+MEMORIA_MAX = 512 * 1024 * 1024
+
+ACTUAL = 0
+ANTERIOR = 1
+
+
+# Enteros que caben en una clave int64, escritos como texto
+_ENTERO = r"[+-]?\d{1,19}"
+
+_INICIO_NUMERO = list("+-.0123456789")
+
+
+def _normalizar(valores):
+    """
+    Forma normal de cada valor: los números se comparan por su valor, vengan como número o como
+    texto ("5101", " 5101", "5101.0" y 5101.0 son el mismo valor), y el resto por su texto sin
+    espacios en los extremos. Como la forma depende solo del valor, una clave da lo mismo en todos
+    los bloques de ambos archivos aunque pandas infiera int64 en uno y object en otro.
+    Params:
+        valores (np.ndarray): Valores numéricos o de cualquier tipo (object).
+    Returns:
+        tuple: (hash uint64 de cada valor, clave uint64 (el entero o el hash), True si es entero,
+                True si es nulo o vacío)
+    """
+    valores = np.asarray(valores)
+    if valores.dtype.kind in "iub":
+        enteros = valores.astype(np.int64)
+        return (pd.util.hash_array(enteros), enteros.view(np.uint64), np.ones(len(valores), dtype=bool),
+                np.zeros(len(valores), dtype=bool))
+
+    texto = None
+    if valores.dtype.kind == "f":
+        numeros = valores.astype(np.float64)
+        nulos = np.isnan(numeros)
+    else:
+        serie = pd.Series(valores, dtype=object)
+        vacios = serie.isna().to_numpy()
+        texto = serie.astype(str).str.strip().to_numpy(dtype=object)
+        nulos = vacios | (texto == "")
+        if not nulos.any():
+            try:
+                # Caso común: una columna de enteros leída como texto
+                return _normalizar(texto.astype(np.int64))
+            except (ValueError, OverflowError):
+                pass
+        # Solo se intenta leer como número el texto que empieza como uno
+        candidatos = pd.Series(texto).str[:1].isin(_INICIO_NUMERO).to_numpy(dtype=bool)
+        numeros = np.full(len(texto), np.nan)
+        numeros[candidatos] = pd.to_numeric(pd.Series(texto[candidatos]), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+    with np.errstate(invalid="ignore"):
+        es_entero = np.isfinite(numeros) & (np.mod(numeros, 1) == 0) & (np.abs(numeros) < 2.0 ** 63)
+    enteros = np.zeros(len(valores), dtype=np.int64)
+    enteros[es_entero] = numeros[es_entero]
+    if texto is not None:
+        # Los enteros que no caben exactos en un float se leen desde el texto
+        grandes = es_entero & (np.abs(numeros) >= 2.0 ** 53)
+        grandes[grandes] = pd.Series(texto[grandes], dtype=object).str.fullmatch(_ENTERO).to_numpy(dtype=bool)
+        enteros[grandes] = texto[grandes].astype(np.int64)
+    decimales = ~es_entero & ~np.isnan(numeros)
+    hashes = np.zeros(len(valores), dtype=np.uint64)
+    hashes[es_entero] = pd.util.hash_array(enteros[es_entero])
+    hashes[decimales] = pd.util.hash_array(numeros[decimales])
+    if texto is not None:
+        otros = ~es_entero & ~decimales & ~nulos
+        hashes[otros] = pd.util.hash_array(texto[otros])
+    return hashes, np.where(es_entero, enteros.view(np.uint64), hashes), es_entero, nulos
+
+
+def _normalizar_serie(serie):
+    """
+    _normalizar por fila. Las columnas que no son numéricas se factorizan y cada valor distinto
+    se normaliza una sola vez.
+    """
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "iufb":
+        return _normalizar(serie.to_numpy())
+    codigos, unicos = pd.factorize(serie)
+    formas = _normalizar(np.asarray(unicos, dtype=object))
+    # Los nulos (código -1) toman el último elemento
+    return tuple(np.append(forma, np.array([nulo], dtype=forma.dtype))[codigos]
+                 for forma, nulo in zip(formas, (0, 0, False, True)))
+
+
+def _hash_serie(serie):
+    return _normalizar_serie(serie)[0]
+
+
+def claves_de(serie):
+    """
+    Claves de comparación. Las claves enteras se guardan por su valor (se puede mostrar en el
+    informe) y las demás como un hash de 64 bits de su forma normal (ver _normalizar).
+    Returns:
+        tuple: (claves uint64, máscara de claves no nulas, True si todas las claves son enteras)
+    """
+    _, claves, enteras, nulas = _normalizar_serie(serie)
+    return claves, ~nulas, bool(enteras[~nulas].all())
+
+
+class ResultadoComparacion:
+    __slots__ = ("filas_actual", "filas_anterior", "claves_nulas", "claves_repetidas", "nuevas", "eliminadas",
+                 "modificadas", "cambios_por_columna", "comunes", "muestra_nuevas", "muestra_eliminadas",
+                 "muestra_modificadas", "claves_enteras")
+
+    def __init__(self, **valores):
+        for nombre in self.__slots__:
+            setattr(self, nombre, valores.get(nombre))
+
+
+class ComparadorArchivos:
+    """
+    Params:
+        key_column (str): Columna que identifica cada fila en ambos archivos.
+        columns (list): Columnas comunes a comparar (sin la clave).
+    """
+
+    def __init__(self, key_column, columns, memoria_max=MEMORIA_MAX, workers=None, max_muestra=10):
+        self.key_column = key_column
+        self.columns = list(columns)
+        self.workers = workers
+        self.max_muestra = max_muestra
+        self.registro = np.dtype([("clave", "<u8"), ("fila", "<i8")] + [(f"c{i}", "<u8") for i in range(len(self.columns))])
+        self.max_registros = max(memoria_max // self.registro.itemsize, 1)
+        self.buffers = {ACTUAL: [], ANTERIOR: []}
+        self.en_buffer = 0
+        self.filas = {ACTUAL: 0, ANTERIOR: 0}
+        self.claves_nulas = {ACTUAL: 0, ANTERIOR: 0}
+        self.claves_enteras = True
+        self.carpeta = None
+
+    def agregar(self, lado, chunk):
+        self.filas[lado] += len(chunk)
+        claves, no_nulas, enteras = claves_de(chunk[self.key_column])
+        self.claves_enteras &= enteras
+        self.claves_nulas[lado] += int((~no_nulas).sum())
+
+        registros = np.empty(int(no_nulas.sum()), dtype=self.registro)
+        registros["clave"] = claves[no_nulas]
+        registros["fila"] = chunk.index.to_numpy()[no_nulas]
+        for i, column in enumerate(self.columns):
+            registros[f"c{i}"] = _hash_serie(chunk[column])[no_nulas]
+        self.buffers[lado].append(registros)
+        self.en_buffer += len(registros)
+        if self.en_buffer > self.max_registros:
+            self._volcar()
+
+    def _particion_path(self, lado, particion):
+        return os.path.join(self.carpeta, f"lado{lado}_particion_{particion:02d}.bin")
+
+    def _particiones(self, registros):
+        # Las claves enteras no están repartidas uniformemente en los bits altos
+        mezcla = registros["clave"] * np.uint64(0x9E3779B97F4A7C15)
+        return (mezcla >> np.uint64(60)).astype(np.int64)
+
+    def _volcar(self):
+        if self.carpeta is None:
+            self.carpeta = tempfile.mkdtemp(prefix="validador_comparacion_")
+        for lado, buffer in self.buffers.items():
+            if not buffer:
+                continue
+            registros = np.concatenate(buffer)
+            particiones = self._particiones(registros)
+            for particion in range(PARTICIONES):
+                with open(self._particion_path(lado, particion), "ab") as f:
+                    registros[particiones == particion].tofile(f)
+            self.buffers[lado] = []
+        self.en_buffer = 0
+
+    def _ordenar_buffers(self):
+        # Los registros en memoria se ordenan una sola vez por partición antes de cruzar en paralelo
+        self._en_memoria = {}
+        for lado, buffer in self.buffers.items():
+            registros = np.concatenate(buffer) if buffer else np.empty(0, dtype=self.registro)
+            particiones = self._particiones(registros)
+            orden = np.argsort(particiones, kind="stable")
+            limites = np.searchsorted(particiones[orden], np.arange(PARTICIONES + 1))
+            self._en_memoria[lado] = (registros[orden], limites)
+        self.buffers = {ACTUAL: [], ANTERIOR: []}
+
+    def _leer_particion(self, lado, particion):
+        partes = []
+        if self.carpeta is not None and os.path.exists(self._particion_path(lado, particion)):
+            partes.append(np.fromfile(self._particion_path(lado, particion), dtype=self.registro))
+        registros, limites = self._en_memoria[lado]
+        partes.append(registros[limites[particion]:limites[particion + 1]])
+        return np.concatenate(partes)
+
+    def _primera_aparicion(self, registros):
+        registros = registros[np.lexsort((registros["fila"], registros["clave"]))]
+        _, primeros = np.unique(registros["clave"], return_index=True)
+        return registros[primeros], len(registros) - len(primeros)
+
+    def _cruzar(self, particion):
+        actual, repetidas_actual = self._primera_aparicion(self._leer_particion(ACTUAL, particion))
+        anterior, repetidas_anterior = self._primera_aparicion(self._leer_particion(ANTERIOR, particion))
+
+        _, i_actual, i_anterior = np.intersect1d(actual["clave"], anterior["clave"], assume_unique=True, return_indices=True)
+        nuevas = np.ones(len(actual), dtype=bool)
+        nuevas[i_actual] = False
+        eliminadas = np.ones(len(anterior), dtype=bool)
+        eliminadas[i_anterior] = False
+
+        cambios = np.zeros(len(i_actual), dtype=bool)
+        cambios_por_columna = []
+        for i in range(len(self.columns)):
+            distinto = actual[f"c{i}"][i_actual] != anterior[f"c{i}"][i_anterior]
+            cambios |= distinto
+            cambios_por_columna.append(int(distinto.sum()))
+
+        def muestra(registros):
+            registros = registros[np.argsort(registros["fila"], kind="stable")[:self.max_muestra]]
+            return list(zip(registros["fila"].tolist(), registros["clave"].view(np.int64).tolist()))
+
+        return {
+            "repetidas": (repetidas_actual, repetidas_anterior),
+            "nuevas": int(nuevas.sum()),
+            "eliminadas": int(eliminadas.sum()),
+            "modificadas": int(cambios.sum()),
+            "comunes": len(i_actual),
+            "cambios_por_columna": cambios_por_columna,
+            "muestra_nuevas": muestra(actual[nuevas]),
+            "muestra_eliminadas": muestra(anterior[eliminadas]),
+            "muestra_modificadas": muestra(actual[i_actual][cambios]),
+        }
+
+    def resultado(self):
+        self._ordenar_buffers()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            parciales = list(executor.map(self._cruzar, range(PARTICIONES)))
+        self.cerrar()
+
+        def muestra(nombre):
+            return heapq.nsmallest(self.max_muestra, (item for parcial in parciales for item in parcial[nombre]))
+
+        return ResultadoComparacion(
+            filas_actual=self.filas[ACTUAL],
+            filas_anterior=self.filas[ANTERIOR],
+            claves_nulas=(self.claves_nulas[ACTUAL], self.claves_nulas[ANTERIOR]),
+            claves_repetidas=tuple(sum(parcial["repetidas"][lado] for parcial in parciales) for lado in (ACTUAL, ANTERIOR)),
+            nuevas=sum(parcial["nuevas"] for parcial in parciales),
+            eliminadas=sum(parcial["eliminadas"] for parcial in parciales),
+            modificadas=sum(parcial["modificadas"] for parcial in parciales),
+            comunes=sum(parcial["comunes"] for parcial in parciales),
+            cambios_por_columna={column: sum(parcial["cambios_por_columna"][i] for parcial in parciales)
+                                 for i, column in enumerate(self.columns)},
+            muestra_nuevas=muestra("muestra_nuevas"),
+            muestra_eliminadas=muestra("muestra_eliminadas"),
+            muestra_modificadas=muestra("muestra_modificadas"),
+            claves_enteras=self.claves_enteras,
+        )
+
+    def cerrar(self):
+        if self.carpeta is not None:
+            shutil.rmtree(self.carpeta, ignore_errors=True)
+            self.carpeta = None
+        self.buffers = {ACTUAL: [], ANTERIOR: []}
+        self._en_memoria = None
+        self.en_buffer = 0
+
+    def __del__(self):
+        self.cerrar()
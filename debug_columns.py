@@ -15,19 +15,17 @@ def debug_columns():
         print("No se seleccionó ningún archivo")
         return
     
-    # Cargar archivo
+    # Cargar archivo (FileSelector entrega los nombres de columna ya limpios)
     print(f"Cargando archivo: {file_path}")
     df = file_selector.load_file(file_path)
     
-    # Mostrar información del archivo ANTES de limpiar
+    # Mostrar el encabezado tal como viene en el archivo, ANTES de limpiar
+    originales = pd.read_csv(file_path, encoding="latin1", sep=";", nrows=0).columns
     print(f"\n📁 Archivo: {file_path.split('/')[-1]}")
     print(f"📊 Dimensiones: {df.shape[0]} filas, {df.shape[1]} columnas")
     print(f"\n📋 Columnas ORIGINALES:")
-    for i, col in enumerate(df.columns, 1):
-        print(f"  {i}. '{col}' (tipo: {df[col].dtype})")
-    
-    # Limpiar nombres de columnas (como hace el validador)
-    df.columns = [col.strip().lstrip('\ufeff').lstrip('ï»¿') for col in df.columns]
+    for i, (original, col) in enumerate(zip(originales, df.columns), 1):
+        print(f"  {i}. '{original}' (tipo: {df[col].dtype})")
     
     # Mostrar información del archivo DESPUÉS de limpiar
     print(f"\n📋 Columnas DESPUÉS DE LIMPIAR:")
@@ -0,0 +1,156 @@
+"""
+Detección de duplicados con memoria acotada.
+
+Cada fila (o valor) se resume en dos hashes de 64 bits calculados con claves distintas y en su
+número de fila. Los registros se acumulan en memoria y, cuando superan el límite, se vuelcan a
+disco repartidos en particiones según los bits altos del primer hash. Al final cada partición se
+procesa por separado: dos filas son duplicadas si coinciden en el primer hash y, para descartar
+colisiones de ese hash, también en el segundo.
+"""
+import heapq
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from resultados import MapaFilas
+
+
+REGISTRO = np.dtype([("h1", "<u8"), ("h2", "<u8"), ("fila", "<i8")])
+
+PARTICIONES = 16
+
+# Registros (24 bytes cada uno) que se mantienen en memoria antes de volcar a disco
+MAX_REGISTROS_MEMORIA = 4_000_000
+
+# hash_pandas_object exige claves de 16 caracteres
+CLAVE_SECUNDARIA = "validador.dup.h2"
+
+
+def hashes_de(datos):
+    """
+    Calcula los dos hashes de cada fila de un DataFrame o de cada valor de una Series.
+    Los enteros se llevan a float para que un bloque con nulos (float) y otro sin nulos (int)
+    entreguen el mismo hash para el mismo valor.
+    """
+    if isinstance(datos, pd.DataFrame):
+        datos = datos.astype({col: "float64" for col in datos.columns if pd.api.types.is_integer_dtype(datos[col])})
+    elif pd.api.types.is_integer_dtype(datos):
+        datos = datos.astype("float64")
+    h1 = pd.util.hash_pandas_object(datos, index=False).to_numpy()
+    h2 = pd.util.hash_pandas_object(datos, index=False, hash_key=CLAVE_SECUNDARIA).to_numpy()
+    return h1, h2
+
+
+class ResultadoDuplicados:
+    __slots__ = ("repetidas", "grupos", "muestra", "filas")
+
+    def __init__(self, repetidas, grupos, muestra, filas):
+        # repetidas: filas que repiten una fila anterior (equivalente a duplicated().sum())
+        # grupos: conjuntos distintos de filas idénticas
+        # muestra: lista de (filas del grupo, veces) de los primeros grupos según su primera fila
+        # filas: MapaFilas con las filas repetidas (las marcadas por duplicated())
+        self.repetidas = repetidas
+        self.grupos = grupos
+        self.muestra = muestra
+        self.filas = filas
+
+
+class DetectorDuplicados:
+    def __init__(self, max_registros=MAX_REGISTROS_MEMORIA, max_muestra=10, max_filas_grupo=5):
+        self.max_registros = max_registros
+        self.max_muestra = max_muestra
+        self.max_filas_grupo = max_filas_grupo
+        self.buffer = []
+        self.en_buffer = 0
+        self.carpeta = None
+        self._resultado = None
+
+    def agregar(self, h1, h2, filas):
+        registros = np.empty(len(h1), dtype=REGISTRO)
+        registros["h1"] = h1
+        registros["h2"] = h2
+        registros["fila"] = filas
+        self.buffer.append(registros)
+        self.en_buffer += len(registros)
+        self._resultado = None
+        if self.en_buffer > self.max_registros:
+            self._volcar()
+
+    def _particion_path(self, particion):
+        return os.path.join(self.carpeta, f"particion_{particion:02d}.bin")
+
+    def _volcar(self):
+        if self.carpeta is None:
+            self.carpeta = tempfile.mkdtemp(prefix="validador_duplicados_")
+        registros = np.concatenate(self.buffer)
+        particiones = (registros["h1"] >> np.uint64(60)).astype(np.int64)
+        for particion in range(PARTICIONES):
+            with open(self._particion_path(particion), "ab") as f:
+                registros[particiones == particion].tofile(f)
+        self.buffer = []
+        self.en_buffer = 0
+
+    def _particion(self, particion, en_memoria):
+        partes = []
+        if self.carpeta is not None and os.path.exists(self._particion_path(particion)):
+            partes.append(np.fromfile(self._particion_path(particion), dtype=REGISTRO))
+        if len(en_memoria):
+            partes.append(en_memoria[(en_memoria["h1"] >> np.uint64(60)).astype(np.int64) == particion])
+        return np.concatenate(partes) if partes else np.empty(0, dtype=REGISTRO)
+
+    def merge(self, other):
+        for registros in other.buffer:
+            self.agregar(registros["h1"], registros["h2"], registros["fila"])
+        if other.carpeta is not None:
+            for particion in range(PARTICIONES):
+                registros = other._particion(particion, np.empty(0, dtype=REGISTRO))
+                if len(registros):
+                    self.agregar(registros["h1"], registros["h2"], registros["fila"])
+
+    def resultado(self):
+        if self._resultado is not None:
+            return self._resultado
+
+        en_memoria = np.concatenate(self.buffer) if self.buffer else np.empty(0, dtype=REGISTRO)
+        repetidas = 0
+        grupos = 0
+        muestra = []
+        filas_repetidas = MapaFilas()
+        for particion in range(PARTICIONES):
+            registros = self._particion(particion, en_memoria)
+            if len(registros) == 0:
+                continue
+            registros = registros[np.lexsort((registros["fila"], registros["h2"], registros["h1"]))]
+            nuevo = np.ones(len(registros), dtype=bool)
+            nuevo[1:] = (registros["h1"][1:] != registros["h1"][:-1]) | (registros["h2"][1:] != registros["h2"][:-1])
+            inicios = np.flatnonzero(nuevo)
+            veces = np.diff(np.append(inicios, len(registros)))
+
+            repetidas += int(len(registros) - len(inicios))
+            filas_repetidas.agregar(registros["fila"][~nuevo])
+            con_repetidos = veces > 1
+            grupos += int(con_repetidos.sum())
+
+            # Solo se guardan los primeros grupos (según su primera fila) de cada partición
+            inicios, veces = inicios[con_repetidos], veces[con_repetidos]
+            primeros = np.argsort(registros["fila"][inicios], kind="stable")[:self.max_muestra]
+            for i in primeros:
+                filas = registros["fila"][inicios[i]:inicios[i] + min(veces[i], self.max_filas_grupo)].tolist()
+                muestra.append((filas, int(veces[i])))
+
+        self._resultado = ResultadoDuplicados(repetidas, grupos, heapq.nsmallest(self.max_muestra, muestra), filas_repetidas)
+        self.cerrar()
+        return self._resultado
+
+    def cerrar(self):
+        if self.carpeta is not None:
+            shutil.rmtree(self.carpeta, ignore_errors=True)
+            self.carpeta = None
+        self.buffer = []
+        self.en_buffer = 0
+
+    def __del__(self):
+        self.cerrar()
@@ -0,0 +1,218 @@
+"""
+Pre-escaneo estructural del archivo a nivel de bytes.
+
+Lee el archivo en bloques pequeños sobre un buffer reutilizado y cuenta en cada bloque (con NumPy)
+separadores, comillas y saltos de línea, sin construir un DataFrame. Entrega el número de filas, las filas vacías y las líneas
+cuyo número de campos no coincide con el encabezado, con la misma numeración de filas que pandas
+(las líneas en blanco se omiten). Los separadores entre comillas no cuentan como separadores; si
+algún campo entre comillas contiene un salto de línea se lee el archivo completo con el módulo csv.
+"""
+import csv
+import os
+
+import numpy as np
+
+from file_selector import limpiar_columnas
+
+
+# Bytes que se leen de una vez; cada bloque se procesa hasta su último salto de línea y el resto pasa
+# al bloque siguiente. Los arreglos de trabajo se reservan una vez y se reutilizan en cada bloque
+BLOQUE_BYTES = 4 * 1024 * 1024
+
+MAX_MUESTRA = 10
+
+SALTO, RETORNO, COMILLA, ESPACIO, TAB, SEPARADOR = (ord(c) for c in "\n\r\" \t;")
+
+
+class EstructuraArchivo:
+    """
+    Resultado del pre-escaneo.
+    Params:
+        encabezado (list): Nombres de columna limpios.
+        campos (int): Número de campos del encabezado.
+        filas (int): Filas de datos (sin el encabezado ni las líneas en blanco).
+        vacias (list): Filas (desde 0) sin ningún valor, por ejemplo ';;;'.
+        irregulares (int): Filas cuyo número de campos no coincide con el encabezado.
+        muestra_irregulares (list): Primeras filas irregulares como tuplas (fila, línea del archivo, campos).
+        max_campos (int): Mayor número de campos encontrado en una fila.
+    """
+    __slots__ = ("encabezado", "campos", "filas", "vacias", "irregulares", "muestra_irregulares", "max_campos")
+
+    def __init__(self, encabezado=None, filas=0):
+        self.encabezado = encabezado or []
+        self.campos = len(self.encabezado)
+        self.filas = filas
+        self.vacias = []
+        self.irregulares = 0
+        self.muestra_irregulares = []
+        self.max_campos = self.campos
+
+    def _agregar_irregulares(self, filas, lineas, campos):
+        self.irregulares += len(filas)
+        faltan = MAX_MUESTRA - len(self.muestra_irregulares)
+        if faltan > 0:
+            self.muestra_irregulares.extend(zip(filas[:faltan], lineas[:faltan], campos[:faltan]))
+
+
+class _Contador:
+    """
+    Cuenta por línea de un bloque (que termina en salto de línea) sus bytes, separadores fuera de
+    comillas, comillas, retornos de carro y espacios. Las máscaras de bytes se reservan una sola
+    vez; de cada una solo se guardan las posiciones marcadas, que se asignan a su línea con una
+    búsqueda binaria. Cada segmento incluye su salto de línea, así ninguno queda vacío.
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.mascara = np.empty(capacidad, dtype=bool)
+        self.auxiliar = np.empty(capacidad, dtype=bool)
+
+    def _posiciones(self, bloque, byte):
+        return np.flatnonzero(np.equal(bloque, byte, out=self.mascara[:len(bloque)]))
+
+    def contar(self, bloque):
+        fines = self._posiciones(bloque, SALTO)
+        inicios = np.concatenate(([0], fines[:-1] + 1))
+
+        def por_linea(posiciones):
+            return np.diff(np.searchsorted(posiciones, fines, side="right"), prepend=0)
+
+        comillas = self._posiciones(bloque, COMILLA)
+        separadores = self._posiciones(bloque, SEPARADOR)
+        if len(comillas):
+            # Un separador está dentro de un campo entre comillas si lo precede un número impar de comillas
+            separadores = separadores[np.searchsorted(comillas, separadores) % 2 == 0]
+        n = len(bloque)
+        espacios = np.logical_or(np.equal(bloque, ESPACIO, out=self.mascara[:n]),
+                                 np.equal(bloque, TAB, out=self.auxiliar[:n]), out=self.mascara[:n])
+        return {
+            "inicio": inicios,
+            "largo": fines - inicios,
+            "separadores": por_linea(separadores),
+            "comillas": por_linea(comillas),
+            "espacios": por_linea(np.flatnonzero(espacios)),
+            "retornos": por_linea(self._posiciones(bloque, RETORNO)),
+        }
+
+
+def _bloques(f):
+    """
+    Lee el archivo en bloques de a lo más BLOQUE_BYTES que terminan en salto de línea, sobre un
+    único buffer. Una línea más larga que el buffer lo agranda. Si el archivo no termina en salto
+    de línea, se agrega uno al último bloque. Entrega los bloques como arreglos de bytes.
+    """
+    buffer = bytearray(BLOQUE_BYTES + 1)
+    pendiente = 0
+    while True:
+        leidos = f.readinto(memoryview(buffer)[pendiente:len(buffer) - 1])
+        total = pendiente + leidos
+        if total == 0:
+            return
+        if leidos == 0:
+            # Fin del archivo: el resto es la última línea
+            if buffer[total - 1] != SALTO:
+                buffer[total] = SALTO
+                total += 1
+            fin = total
+        else:
+            fin = buffer.rfind(b"\n", 0, total) + 1
+            if fin == 0:
+                # Ninguna línea completa cabe en el buffer: se agranda al doble (en uno nuevo, el
+                # bloque anterior puede seguir apuntando al actual)
+                buffer = buffer + bytes(len(buffer))
+                pendiente = total
+                continue
+        yield np.frombuffer(buffer, dtype=np.uint8, count=fin)
+        if fin == total and leidos == 0:
+            return
+        buffer[:total - fin] = buffer[fin:total]
+        pendiente = total - fin
+
+
+def escanear_estructura(file_path):
+    """
+    Pre-escanea el archivo y retorna su EstructuraArchivo.
+    """
+    if os.path.getsize(file_path) == 0:
+        return EstructuraArchivo()
+
+    with open(file_path, "rb") as f:
+        estructura = _escanear_bloques(f)
+    return estructura if estructura is not None else _escanear_con_csv(file_path)
+
+
+def _escanear_bloques(f):
+    """
+    Escaneo por bloques con NumPy. Retorna None si hay campos entre comillas que
+    continúan en la línea siguiente.
+    """
+    estructura = None
+    contador = None
+    fila = 0
+    linea = 0
+    for bloque in _bloques(f):
+        if contador is None or contador.capacidad < len(bloque):
+            contador = _Contador(max(len(bloque), BLOQUE_BYTES + 1))
+        conteo = contador.contar(bloque)
+        if (conteo["comillas"] % 2).any():
+            return None
+        en_blanco = conteo["retornos"] + conteo["espacios"] == conteo["largo"]
+        vacia = ~en_blanco & (conteo["separadores"] + conteo["comillas"] + conteo["retornos"] == conteo["largo"])
+
+        # Número de fila de pandas de cada línea (las líneas en blanco no cuentan)
+        filas_linea = fila + np.cumsum(~en_blanco) - 1
+        if estructura is None:
+            no_blancas = np.flatnonzero(~en_blanco)
+            if not len(no_blancas):
+                linea += len(en_blanco)
+                continue
+            i = int(no_blancas[0])
+            inicio = int(conteo["inicio"][i])
+            texto = bloque[inicio:inicio + int(conteo["largo"][i])].tobytes().decode("latin1")
+            estructura = EstructuraArchivo(limpiar_columnas(_campos(texto)))
+            # El encabezado no es una fila de datos
+            filas_linea -= 1
+            en_blanco[:i + 1] = True
+            vacia[:i + 1] = False
+
+        con_datos = ~en_blanco
+        campos = conteo["separadores"] + 1
+        estructura.vacias.extend(filas_linea[vacia].tolist())
+        irregulares = np.flatnonzero(con_datos & ~vacia & (campos != estructura.campos))
+        estructura._agregar_irregulares(filas_linea[irregulares].tolist(), (linea + irregulares + 1).tolist(),
+                                        campos[irregulares].tolist())
+        if con_datos.any():
+            estructura.max_campos = max(estructura.max_campos, int(campos[con_datos].max()))
+        fila = int(filas_linea[-1]) + 1
+        estructura.filas = fila
+        linea += len(en_blanco)
+
+    return estructura or EstructuraArchivo()
+
+
+def _campos(texto):
+    return next(csv.reader([texto.rstrip("\r")], delimiter=";"), [])
+
+
+def _escanear_con_csv(file_path):
+    """
+    Camino lento para archivos con saltos de línea dentro de campos entre comillas.
+    """
+    estructura = None
+    with open(file_path, encoding="latin1", newline="") as f:
+        lector = csv.reader(f, delimiter=";")
+        for campos in lector:
+            # Líneas en blanco (pandas las omite); '""' en cambio es una fila vacía
+            if not campos or (len(campos) == 1 and campos[0] and not campos[0].strip(" \t\r")):
+                continue
+            if estructura is None:
+                estructura = EstructuraArchivo(limpiar_columnas(campos))
+                continue
+            fila = estructura.filas
+            estructura.filas += 1
+            if all(campo == "" for campo in campos):
+                estructura.vacias.append(fila)
+            elif len(campos) != estructura.campos:
+                estructura._agregar_irregulares([fila], [lector.line_num], [len(campos)])
+            estructura.max_campos = max(estructura.max_campos, len(campos))
+    return estructura or EstructuraArchivo()
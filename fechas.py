@@ -0,0 +1,57 @@
+"""
+Conversión de columnas de fecha.
+
+Las entregas tienen pocas fechas distintas repetidas en millones de filas, por lo que cada
+valor distinto se convierte una sola vez y el resultado se expande a todas las filas.
+El formato se puede declarar en el archivo de validaciones (validate_formato_fecha); sin
+formato declarado pandas lo deduce del primer valor.
+"""
+import pandas as pd
+
+
+# Prefijo con que el formato de fecha viaja en el dtype de una columna ("fecha:%d/%m/%Y")
+PREFIJO_DTYPE = "fecha:"
+
+# Notación de los archivos de validaciones (igual que en validate_filename)
+TOKENS = (("AAAA", "%Y"), ("aaaa", "%Y"), ("MM", "%m"), ("mm", "%m"), ("DD", "%d"), ("dd", "%d"))
+
+
+def formato_strftime(patron):
+    """
+    Convierte un patrón como DD/MM/AAAA al formato de strftime (%d/%m/%Y). Los patrones
+    que ya usan % se dejan tal cual.
+    """
+    patron = patron.strip()
+    if "%" in patron:
+        return patron
+    for token, codigo in TOKENS:
+        patron = patron.replace(token, codigo)
+    return patron
+
+
+def convertir_fechas(serie, formato=None):
+    """
+    Convierte una columna a datetime convirtiendo cada valor distinto una sola vez.
+    Los valores que no calzan con el formato quedan como NaT.
+    """
+    codigos, unicos = pd.factorize(serie)
+    if formato:
+        fechas = pd.to_datetime(unicos, format=formato, errors="coerce")
+    else:
+        fechas = pd.to_datetime(unicos, errors="coerce")
+    fechas = pd.DatetimeIndex(fechas).take(codigos, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(fechas, index=serie.index, name=serie.name)
+
+
+def convertir_limite(fecha, formato=None):
+    """
+    Convierte la fecha límite de una validación, en el formato indicado (de strftime) o como
+    AAAA-MM-DD. Retorna NaT si no es una fecha válida.
+    """
+    fecha = (fecha or "").strip()
+    for formato in (formato, "%Y-%m-%d"):
+        if formato:
+            limite = pd.to_datetime(fecha, format=formato, errors="coerce")
+            if not pd.isna(limite):
+                return limite
+    return pd.NaT
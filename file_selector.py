@@ -1,11 +1,70 @@
-import tkinter as tk
-from tkinter import filedialog
 import pandas as pd
+from cache_archivos import CacheArchivos, variantes_de
+from fechas import PREFIJO_DTYPE, convertir_fechas
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+
+# Motores de lectura: "pandas" (lector C de pandas, un hilo) y "arrow" (lector CSV multihilo de pyarrow)
+MOTORES = ("pandas", "arrow")
+
+# Valores que se leen como nulos, los mismos que usa pandas por defecto, para que ambos motores coincidan
+VALORES_NULOS = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                 "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+# dtype de las columnas que el plan valida como categorías: se codifican como categóricas si son de texto
+CATEGORIA = "categoria"
+
+# Valores distintos hasta los que una columna de texto se guarda como categórica
+MAX_CATEGORIAS = 1_000
+
+# Filas con que se estima la cardinalidad de las columnas de texto que el plan no marcó como categorías
+MUESTRA_CATEGORIAS = 10_000
+
+
+def es_columna_texto(serie):
+    """
+    True si la columna es de texto. En columnas de objetos los nulos no cuentan (is_string_dtype
+    las descarta si tienen algún NaN); en las categóricas se mira el tipo de sus categorías.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.cat.categories
+    if pd.api.types.is_object_dtype(serie):
+        return pd.api.types.infer_dtype(serie, skipna=True) == "string"
+    return pd.api.types.is_string_dtype(serie)
+
+
+def limpiar_columnas(columns):
+    # Limpiar nombres de columnas (quitar BOM y espacios)
+    return [col.strip().lstrip('\ufeff').lstrip('ï»¿') for col in columns]
 
 
 class FileSelector:
+    """
+    Lectura de los archivos de datos (CSV separados por ';' en latin1). Los nombres de columna
+    se entregan siempre limpios (sin BOM ni espacios) y usecols y dtype se indican con esos nombres.
+    Params:
+        motor (str): "pandas" (por defecto) o "arrow". Con "arrow" el archivo completo se lee con el
+                     lector multihilo de pyarrow y las columnas de texto quedan respaldadas por Arrow
+                     en lugar de objetos de Python. Si pyarrow no está instalado o no puede leer el
+                     archivo, se usa el lector de pandas.
+    """
+
+    def __init__(self, motor=None):
+        motor = motor or "pandas"
+        if motor not in MOTORES:
+            raise ValueError(f"Motor de lectura desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+        self.motor = motor
 
     def select_file(self, title="Select a file"):
+        # tkinter se importa solo al abrir un diálogo; en modo consola no se carga
+        import tkinter as tk
+        from tkinter import filedialog
+
         root = tk.Tk()
         root.withdraw()
         file_path = filedialog.askopenfilename(title=title)
@@ -19,6 +78,9 @@ class FileSelector:
         return file_path
     
     def select_folder(self, title="Select a folder"):
+        import tkinter as tk
+        from tkinter import filedialog
+
         root = tk.Tk()
         root.withdraw()
         folder_path = filedialog.askdirectory(title=title)
@@ -29,22 +91,181 @@ class FileSelector:
         return folder_path
         
 
-    def load_file(self, file_path):
+    def _parse_dates(self, df, date_formats=None):
+        """
+        Convierte a fecha las columnas con formato declarado y las que tienen 'fecha' en el nombre
+        (deduciendo el formato). Cada fecha distinta se convierte una sola vez.
+        """
+        date_formats = date_formats or {}
+        for column in df.columns:
+            if column in date_formats or 'fecha' in column.lower():
+                df[column] = convertir_fechas(df[column], date_formats.get(column) or None)
+        return df
+
+    def _split_dtype(self, dtype):
+        """
+        Separa los tipos que el lector puede aplicar sin riesgo (texto) de los numéricos,
+        que se aplican después de leer y se descartan si los datos no calzan. Las columnas
+        con dtype "fecha:<formato>" se leen como texto y se convierten con ese formato; las
+        con dtype "categoria" se leen con el tipo inferido.
+        Returns:
+            tuple: (dtype del lector, dtype posterior, formatos de fecha por columna, columnas categóricas)
+        """
+        dtype = dtype or {}
+        date_formats = {column: kind[len(PREFIJO_DTYPE):] for column, kind in dtype.items()
+                        if isinstance(kind, str) and kind.startswith(PREFIJO_DTYPE)}
+        categories = [column for column, kind in dtype.items() if kind == CATEGORIA]
+        parser_dtype = {column: str for column, kind in dtype.items() if kind is str or column in date_formats}
+        cast_dtype = {column: kind for column, kind in dtype.items()
+                      if kind is not str and kind != CATEGORIA and column not in date_formats}
+        return parser_dtype or None, cast_dtype, date_formats, categories
+
+    def _cast(self, df, cast_dtype):
+        for column, kind in cast_dtype.items():
+            if column in df.columns:
+                try:
+                    df[column] = df[column].astype(kind)
+                except (ValueError, TypeError):
+                    # Se conserva el tipo inferido por pandas; la validación informará el problema
+                    pass
+        return df
+
+    def _read_pandas(self, file_path, header, usecols=None, parser_dtype=None, **kwargs):
+        # names reemplaza el encabezado del archivo por los nombres limpios
+        return pd.read_csv(file_path, encoding="latin1", sep=";", header=0, names=header, usecols=usecols,
+                           dtype=parser_dtype, **kwargs)
+
+    def _read_arrow(self, file_path, header, usecols=None, parser_dtype=None):
+        """
+        Lee el archivo con el lector CSV multihilo de pyarrow, transcodificando latin1 al vuelo.
+        Las columnas de texto se entregan como string[pyarrow].
+        """
+        tabla = pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(encoding="latin1", use_threads=True, column_names=header, skip_rows=1),
+            parse_options=pa_csv.ParseOptions(delimiter=";", newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types={column: pa.string() for column in parser_dtype or {}},
+                null_values=VALORES_NULOS,
+                strings_can_be_null=True,
+            ),
+        )
+        # pandas no deduce fechas por su cuenta: se dejan como texto y se convierten en _parse_dates
+        for i, campo in enumerate(tabla.schema):
+            if pa.types.is_temporal(campo.type):
+                tabla = tabla.set_column(i, campo.name, tabla.column(i).cast(pa.string()))
+        return tabla.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+    def _categorize(self, df, categories=()):
+        """
+        Guarda como categóricas (códigos enteros más el diccionario de valores) las columnas de
+        texto con hasta MAX_CATEGORIAS valores distintos. Para las columnas que no están en
+        categories la cardinalidad se estima primero con las primeras filas.
+        """
+        for column in df.columns:
+            serie = df[column]
+            if isinstance(serie.dtype, pd.CategoricalDtype) or not es_columna_texto(serie):
+                continue
+            if column not in categories:
+                muestra = serie.iloc[:MUESTRA_CATEGORIAS]
+                if len(pd.unique(muestra)) > min(MAX_CATEGORIAS, len(muestra) // 2):
+                    continue
+            codigos, valores = pd.factorize(serie)
+            if len(valores) <= MAX_CATEGORIAS:
+                df[column] = pd.Categorical.from_codes(codigos, categories=valores)
+        return df
+
+    def _parse_file(self, file_path, usecols=None, dtype=None):
+        parser_dtype, cast_dtype, date_formats, categories = self._split_dtype(dtype)
+        header = self.read_header(file_path)
+        df = None
+        if self.motor == "arrow":
+            if pa is None:
+                print("⚠️  pyarrow no está instalado; se usa el lector de pandas")
+            else:
+                try:
+                    df = self._read_arrow(file_path, header, usecols, parser_dtype)
+                except (pa.ArrowException, ValueError, UnicodeDecodeError) as e:
+                    print(f"⚠️  El lector de Arrow no pudo leer el archivo ({e}); se usa el lector de pandas")
+        if df is None:
+            df = self._read_pandas(file_path, header, usecols, parser_dtype)
+        df = self._cast(df, cast_dtype)
+        return self._categorize(self._parse_dates(df, date_formats), categories)
+
+    def _load_cached(self, file_path, usecols, dtype, cache):
+        """
+        Toma de la caché las columnas ya parseadas y parsea (y guarda) solo las que faltan.
+        """
+        header = self.read_header(file_path)
+        columns = [col for col in header if usecols is None or col in usecols]
+        variantes = variantes_de(columns, dtype, self.motor, (MAX_CATEGORIAS, MUESTRA_CATEGORIAS))
+        clave = cache.clave(file_path)
+
+        encontradas = cache.leer(clave, columns, variantes)
+        faltantes = [col for col in columns if col not in encontradas]
+        if faltantes:
+            parseadas = self._parse_file(file_path, usecols if len(faltantes) == len(columns) else faltantes, dtype)
+            cache.guardar(clave, parseadas, variantes)
+            if not encontradas:
+                return parseadas
+            encontradas.update({col: parseadas[col] for col in parseadas.columns})
+        else:
+            print(f"📦 Archivo leído desde caché: {file_path.split('/')[-1]}")
+
+        return pd.DataFrame({col: encontradas[col] for col in columns})
+
+    def load_file(self, file_path, usecols=None, dtype=None, use_cache=True):
+        """
+        Carga el archivo completo. Con usecols solo se leen las columnas indicadas y con
+        dtype se fijan sus tipos en lugar de inferirlos. Si use_cache es True y pyarrow está
+        disponible, las columnas parseadas se guardan y se reutilizan en ejecuciones posteriores.
+        El archivo se parsea con el motor del FileSelector y las columnas de texto con pocos
+        valores distintos se entregan como categóricas.
+        """
         try:
-            df = pd.read_csv(file_path, encoding="latin1", sep=";")
-            for column in df.columns:
-                if 'fecha' in column.lower():
-                    df[column] = pd.to_datetime(df[column], errors='coerce', infer_datetime_format=True)
+            cache = CacheArchivos()
+            if use_cache and cache.disponible:
+                df = self._load_cached(file_path, usecols, dtype, cache)
+            else:
+                df = self._parse_file(file_path, usecols, dtype)
         
         except Exception as e:
             raise ValueError(f"Error loading file: {e}")
         return df
+
+    def read_header(self, file_path):
+        """
+        Nombres de las columnas del archivo, ya limpios.
+        """
+        try:
+            header = pd.read_csv(file_path, encoding="latin1", sep=";", nrows=0).columns.tolist()
+        except Exception as e:
+            raise ValueError(f"Error loading file: {e}")
+        return limpiar_columnas(header)
+
+    def iter_chunks(self, file_path, chunksize, usecols=None, dtype=None):
+        """
+        Lee el archivo en bloques de a lo más chunksize filas, de modo que la memoria
+        usada no depende del tamaño del archivo. El índice de cada bloque continúa
+        el del bloque anterior. Los bloques se leen siempre con el lector de pandas y sin
+        codificar categorías.
+        """
+        parser_dtype, cast_dtype, date_formats, _ = self._split_dtype(dtype)
+        header = self.read_header(file_path)
+        try:
+            reader = self._read_pandas(file_path, header, usecols, parser_dtype, chunksize=chunksize)
+        except Exception as e:
+            raise ValueError(f"Error loading file: {e}")
+        with reader:
+            for chunk in reader:
+                yield self._parse_dates(self._cast(chunk, cast_dtype), date_formats)
     
 
     def load_validations(self, file_path):
         try:
-            df_validations = pd.read_csv(file_path, encoding="latin1", sep=";")
-            validations_dict = [(row[0], row[1]) for _, row in df_validations.iterrows()]
+            df_validations = pd.read_csv(file_path, encoding="latin1", sep=";", dtype=str)
+            validations_dict = list(df_validations.iloc[:, :2].itertuples(index=False, name=None))
         except Exception as e:
             raise ValueError(f"Error loading validations: {e}")
         return validations_dict
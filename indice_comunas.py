@@ -0,0 +1,117 @@
+"""
+Índice compilado de la tabla de comunas.
+
+La tabla oficial de códigos territoriales (un CSV separado por ";" con el código y el nombre de
+cada comuna) se compila una vez en la carpeta de caché: los códigos ordenados
+con su nombre y los nombres normalizados (sin tildes, sin mayúsculas y con los espacios
+compactados) ordenados con su código. Una columna completa se resuelve buscando solo sus valores
+distintos con búsquedas binarias vectorizadas (np.searchsorted). La compilación y la caché son
+las del índice de RUTs de prueba (indice_ruts.arreglos_compilados).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_archivos import CACHE_DIR
+from indice_ruts import arreglos_compilados, buscar
+
+
+# Tabla de comunas por defecto: la variable de entorno o COMUNAS.csv junto al programa
+COMUNAS_PATH = os.environ.get("VALIDADOR_COMUNAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "COMUNAS.csv"))
+
+# Código de los valores que no están en la tabla
+DESCONOCIDA = -1
+
+
+def _texto(valores):
+    """
+    Valores como texto, con los nulos como "". Se pasa por el tipo string de pandas para no
+    rellenar nulos en una serie object (fillna sobre object está en desuso en pandas 2.2).
+    """
+    return pd.Series(valores, dtype=object).astype("string").fillna("").astype(str)
+
+
+def normalizar_nombres(nombres):
+    """
+    Normaliza nombres de comuna para compararlos: sin tildes ni diéresis (la ñ queda como n),
+    en minúsculas y con los espacios compactados. Retorna un arreglo de str (los nulos quedan como "").
+    """
+    nombres = _texto(nombres)
+    return (nombres.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+            .str.casefold().str.split().str.join(" ").to_numpy(dtype=str))
+
+
+class IndiceComunas:
+    def __init__(self, codigos, nombres):
+        codigos = pd.to_numeric(pd.Series(codigos), errors="coerce")
+        validas = codigos.notna().to_numpy()
+        codigos = codigos[validas].to_numpy(dtype=np.int64)
+        nombres = _texto(nombres)[validas].str.strip().to_numpy(dtype=str)
+
+        orden = np.argsort(codigos, kind="stable")
+        self.codigos = codigos[orden]
+        self.nombres = nombres[orden]
+        claves = normalizar_nombres(self.nombres)
+        orden = np.argsort(claves, kind="stable")
+        self.claves_nombre = claves[orden]
+        self.codigos_nombre = self.codigos[orden]
+
+    @classmethod
+    def desde_arreglos(cls, codigos, nombres, claves_nombre, codigos_nombre):
+        indice = cls.__new__(cls)
+        indice.codigos = codigos
+        indice.nombres = nombres
+        indice.claves_nombre = claves_nombre
+        indice.codigos_nombre = codigos_nombre
+        return indice
+
+    @classmethod
+    def desde_csv(cls, file_path=COMUNAS_PATH, use_cache=True, cache_dir=CACHE_DIR):
+        """
+        Abre el índice compilado del CSV o lo compila si no existe o si el CSV cambió.
+        El CSV tiene el código de comuna en la primera columna y el nombre en la segunda.
+        """
+        def compilar(df):
+            if df.shape[1] < 2:
+                raise ValueError(f"La tabla de comunas {file_path} debe tener el código y el nombre de la comuna")
+            indice = cls(df.iloc[:, 0], df.iloc[:, 1])
+            return {"codigos": indice.codigos, "nombres": indice.nombres,
+                    "claves_nombre": indice.claves_nombre, "codigos_nombre": indice.codigos_nombre}
+
+        arreglos = arreglos_compilados(file_path, "comunas", "comunas", compilar, use_cache=use_cache, cache_dir=cache_dir)
+        return cls.desde_arreglos(arreglos["codigos"], arreglos["nombres"], arreglos["claves_nombre"],
+                                  arreglos["codigos_nombre"])
+
+    def resolver(self, valores):
+        """
+        Código de comuna de cada valor: los valores numéricos se buscan como código y el resto
+        como nombre normalizado. Retorna un arreglo int64 con DESCONOCIDA para los que no están.
+        """
+        valores = pd.Series(valores, dtype=object)
+        texto = _texto(valores).str.strip()
+        # Los códigos pueden venir con ceros a la izquierda ("05101") o como decimales de Excel ("5101.0")
+        numeros = pd.to_numeric(texto.where(texto.str.fullmatch(r"\d+(\.0+)?"), None), errors="coerce")
+        es_codigo = numeros.notna().to_numpy()
+
+        codigos = np.full(len(valores), DESCONOCIDA, dtype=np.int64)
+        if es_codigo.any():
+            buscados = numeros[es_codigo].to_numpy(dtype=np.int64)
+            posiciones = buscar(self.codigos, buscados)
+            codigos[es_codigo] = np.where(posiciones >= 0, buscados, DESCONOCIDA)
+        if not es_codigo.all():
+            posiciones = buscar(self.claves_nombre, normalizar_nombres(texto[~es_codigo]))
+            codigos[~es_codigo] = np.where(posiciones >= 0, self.codigos_nombre[posiciones], DESCONOCIDA)
+        return codigos
+
+    def nombre(self, codigo):
+        posicion = buscar(self.codigos, np.array([codigo], dtype=np.int64))[0]
+        return self.nombres[posicion] if posicion >= 0 else None
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __reduce__(self):
+        # Igual que IndiceRuts: al enviarlo a otro proceso se copian los arreglos abiertos con memory-map
+        return IndiceComunas.desde_arreglos, tuple(np.array(arreglo) for arreglo in
+                                                   (self.codigos, self.nombres, self.claves_nombre, self.codigos_nombre))
@@ -0,0 +1,113 @@
+"""
+Índice compilado de RUTs de prueba.
+
+Los RUTs del archivo de RUTs de prueba se guardan como un arreglo NumPy ordenado en la
+carpeta de caché y se abren con memory-map. La pertenencia de una columna completa se
+resuelve con una búsqueda binaria vectorizada (np.searchsorted), sin construir sets de Python.
+El índice se vuelve a compilar automáticamente cuando cambia el tamaño o la fecha de
+modificación del CSV de origen. La compilación con caché (arreglos_compilados) y la búsqueda
+binaria (buscar) se comparten con el índice de comunas.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cache_archivos import CACHE_DIR
+from file_selector import FileSelector
+
+
+def buscar(claves, valores):
+    """
+    Posición de cada valor en el arreglo ordenado claves, o -1 si no está.
+    """
+    valores = np.asarray(valores)
+    if len(claves) == 0 or len(valores) == 0:
+        return np.full(len(valores), -1, dtype=np.int64)
+    posiciones = np.searchsorted(claves, valores)
+    posiciones[posiciones == len(claves)] = 0
+    return np.where(claves[posiciones] == valores, posiciones, -1)
+
+
+def arreglos_compilados(file_path, tipo, descripcion, compilar, use_cache=True, cache_dir=CACHE_DIR):
+    """
+    Arreglos de un índice compilado desde un CSV. Se guardan en la carpeta de caché (un .npy por
+    arreglo, que se abre con memory-map) y se vuelven a compilar si el CSV cambió de tamaño o de
+    fecha de modificación.
+    Params:
+        file_path (str): CSV de origen.
+        tipo (str): Nombre del índice en los archivos de la caché.
+        descripcion (str): Qué se indexa, para el mensaje al compilar.
+        compilar (callable): Recibe el DataFrame del CSV y retorna un dict nombre -> arreglo.
+    Returns:
+        dict: Arreglos del índice por nombre.
+    """
+    ruta = os.path.abspath(file_path)
+    stat = os.stat(ruta)
+    base = os.path.join(cache_dir, f"indice_{tipo}_{hashlib.sha1(ruta.encode('utf-8')).hexdigest()}")
+    meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if use_cache:
+        try:
+            with open(f"{base}.json", encoding="utf-8") as f:
+                guardado = json.load(f)
+            if {clave: guardado.get(clave) for clave in meta} == meta:
+                return {nombre: np.load(f"{base}_{nombre}.npy", mmap_mode="r") for nombre in guardado["arreglos"]}
+        except (OSError, ValueError, KeyError):
+            pass
+
+    print(f"📋 Compilando índice de {descripcion} desde {file_path.split('/')[-1]}...")
+    arreglos = compilar(FileSelector().load_file(file_path, use_cache=False))
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for nombre, arreglo in arreglos.items():
+                tmp_path = f"{base}_{nombre}.{os.getpid()}.tmp.npy"
+                np.save(tmp_path, arreglo)
+                os.replace(tmp_path, f"{base}_{nombre}.npy")
+            with open(f"{base}.json", "w", encoding="utf-8") as f:
+                json.dump(dict(meta, arreglos=list(arreglos)), f)
+        except OSError:
+            # Sin carpeta de caché escribible el índice se usa solo en memoria
+            pass
+    return arreglos
+
+
+class IndiceRuts:
+    def __init__(self, ruts):
+        ruts = pd.to_numeric(pd.Series(ruts), errors="coerce").dropna()
+        self.ruts = np.unique(ruts.to_numpy(dtype=np.int64))
+
+    @classmethod
+    def desde_arreglo(cls, ruts):
+        indice = cls.__new__(cls)
+        indice.ruts = ruts
+        return indice
+
+    @classmethod
+    def desde_csv(cls, file_path, use_cache=True, cache_dir=CACHE_DIR):
+        """
+        Abre el índice compilado del CSV o lo compila si no existe o si el CSV cambió.
+        """
+        arreglos = arreglos_compilados(file_path, "ruts", "RUTs de prueba",
+                                       lambda df: {"ruts": cls(df.iloc[:, 0]).ruts},
+                                       use_cache=use_cache, cache_dir=cache_dir)
+        return cls.desde_arreglo(arreglos["ruts"])
+
+    def contiene(self, valores):
+        """
+        Retorna un arreglo booleano indicando qué valores son RUTs de prueba.
+        """
+        return buscar(self.ruts, valores) >= 0
+
+    def __len__(self):
+        return len(self.ruts)
+
+    def __iter__(self):
+        return iter(self.ruts.tolist())
+
+    def __reduce__(self):
+        # Al enviarlo a otro proceso se copia el arreglo (un memory-map no se puede serializar)
+        return IndiceRuts.desde_arreglo, (np.array(self.ruts),)
@@ -1,133 +1,97 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer, HRFlowable, ListFlowable, ListItem
-from reportlab.lib.units import inch
+import html
+import json
+import time
 
-# Crear estilos modernos y atractivos
-styles = getSampleStyleSheet()
+# Límites del resumen con que se generan los formatos de lectura (PDF, HTML, Markdown).
+# El detalle completo queda solo en el informe JSONL, que se escribe a medida que se agrega.
+MAX_CARACTERES_FRASE = 1000
+MAX_ELEMENTOS_LISTA = 100
+MAX_FILAS_TABLA = 200
 
-# Estilo para título principal - moderno y elegante
-title_style = ParagraphStyle(
-    'ModernTitle',
-    parent=styles['Title'],
-    fontSize=24,
-    spaceAfter=20,
-    textColor=colors.HexColor('#2C3E50'),  # Azul oscuro elegante
-    alignment=1,  # Centrado
-    fontName='Helvetica-Bold',
-    borderWidth=2,
-    borderColor=colors.HexColor('#3498DB'),  # Azul moderno
-    borderPadding=10
-)
 
-# Estilo para encabezados - con color y espaciado mejorado
-heading_style = ParagraphStyle(
-    'ModernHeading',
-    parent=styles['Heading2'],
-    fontSize=16,
-    spaceAfter=12,
-    spaceBefore=18,
-    textColor=colors.HexColor('#34495E'),  # Gris azulado
-    fontName='Helvetica-Bold',
-    leftIndent=0,
-    borderWidth=0,
-    borderColor=colors.HexColor('#E74C3C'),  # Rojo elegante
-    borderPadding=8
-)
+def _miles(numero):
+    return f"{numero:,}".replace(",", ".")
 
-# Estilo para texto normal - mejorado
-normal_style = ParagraphStyle(
-    'ModernBody',
-    parent=styles['BodyText'],
-    fontSize=11,
-    spaceAfter=6,
-    textColor=colors.HexColor('#2C3E50'),
-    fontName='Helvetica',
-    alignment=4,  # Justificado
-    lineHeight=1.4
-)
 
-# Estilo para texto destacado
-highlight_style = ParagraphStyle(
-    'Highlight',
-    parent=normal_style,
-    fontSize=12,
-    textColor=colors.HexColor('#E74C3C'),  # Rojo elegante
-    fontName='Helvetica-Bold',
-    spaceAfter=8,
-    spaceBefore=8
-)
+def _recortar_texto(text):
+    if len(text) <= MAX_CARACTERES_FRASE:
+        return text
+    return f"{text[:MAX_CARACTERES_FRASE]}... ({_miles(len(text) - MAX_CARACTERES_FRASE)} caracteres omitidos)"
 
-# Estilo para texto de éxito
-success_style = ParagraphStyle(
-    'Success',
-    parent=normal_style,
-    fontSize=12,
-    textColor=colors.HexColor('#27AE60'),  # Verde elegante
-    fontName='Helvetica-Bold',
-    spaceAfter=8,
-    spaceBefore=8
-)
 
 class Informe():
-    def __init__(self, filename, folder_path, pagesize=A4):
+    """
+    Informe de validaciones. Los métodos add_* registran elementos livianos (diccionarios) y
+    create_informe los entrega a cada formato pedido:
+        - pdf, html, md: se generan desde un resumen acotado (frases, listas y tablas recortadas).
+        - jsonl: un elemento por línea con el detalle completo, escrito a medida que se agrega.
+        - json: solo los resultados de las validaciones (add_resultado), para leerlos con otros programas.
+    """
+
+    def __init__(self, filename, folder_path, pagesize=None, formatos=("pdf",)):
         self.filename = filename
         self.folder_path = folder_path
-        self.doc = SimpleDocTemplate(f"{folder_path}/{filename}.pdf", pagesize=pagesize)
-        self.content = []
-
-        
+        self.pagesize = pagesize
+        self.elementos = []
+        self.resultados = []
+        self.tiempos = {}
+        self._jsonl = None
+
+        # Formatos disponibles: cada uno recibe el título y el autor del documento
+        self.renderizadores = {
+            "pdf": self._crear_pdf,
+            "html": self._crear_html,
+            "md": self._crear_markdown,
+            "json": self._crear_json,
+        }
+        self.formatos = [formato.strip().lower() for formato in formatos if formato.strip()]
+        for formato in self.formatos:
+            if formato != "jsonl" and formato not in self.renderizadores:
+                raise ValueError(f"Formato de informe no válido: {formato}")
+
+    def ruta(self, formato):
+        return f"{self.folder_path}/{self.filename}.{formato}"
+
+    def _escribir_jsonl(self, elemento):
+        if "jsonl" in self.formatos:
+            if self._jsonl is None:
+                self._jsonl = open(self.ruta("jsonl"), "w", encoding="utf-8")
+            self._jsonl.write(json.dumps(elemento, ensure_ascii=False, default=str) + "\n")
+
+    def _agregar(self, elemento, resumen=None):
+        """
+        Registra un elemento en el resumen y, si se pidió el formato jsonl, escribe el elemento
+        completo en el archivo.
+        """
+        self._escribir_jsonl(elemento)
+        self.elementos.append(resumen if resumen is not None else elemento)
 
     def add_title(self, title):
         if not title or len(title) <= 3:
-            self.content.append(Paragraph("Sin título", title_style))
-            self.content.append(Spacer(1, 12))
-            return
-
-        self.content.append(Paragraph(title, title_style))
-        self.content.append(Spacer(1, 12))
+            title = "Sin título"
+        self._agregar({"tipo": "titulo", "texto": title})
 
     def add_heading(self, heading):
         if not heading or len(heading) <= 3:
-            self.content.append(Paragraph("Sin encabezado", heading_style))
-            return
+            heading = "Sin encabezado"
+        self._agregar({"tipo": "encabezado", "texto": heading})
 
-        self.content.append(Paragraph(heading, heading_style))
+    def _agregar_frase(self, text, red, style_type, espaciada):
+        elemento = {"tipo": "frase", "texto": text, "rojo": bool(red), "estilo": style_type, "espaciada": espaciada}
+        self._agregar(elemento, dict(elemento, texto=_recortar_texto(text)))
 
     def add_sentence(self, text, red=False, style_type="normal"):
         if not text or len(text) <= 3:
-            self.content.append(Paragraph("Sin mensaje", normal_style))
-            return
-
-        # Seleccionar el estilo según el tipo
-        if style_type == "highlight" or red:
-            selected_style = highlight_style
-        elif style_type == "success":
-            selected_style = success_style
-        else:
-            selected_style = normal_style
-            
-        self.content.append(Paragraph(text, selected_style))
+            return self._agregar_frase("Sin mensaje", False, "normal", False)
+        self._agregar_frase(text, red, style_type, False)
 
     def add_spaced_sentence(self, text, red=False, style_type="normal"):
         if not text or len(text) <= 5:
-            self.content.append(Paragraph("Sin mensaje", normal_style))
-            return
-
-        # Seleccionar el estilo según el tipo
-        if style_type == "highlight" or red:
-            selected_style = highlight_style
-        elif style_type == "success":
-            selected_style = success_style
-        else:
-            selected_style = normal_style
-            
-        self.content.append(Paragraph(text, selected_style))
-        self.content.append(Spacer(1, 12))
+            return self._agregar_frase("Sin mensaje", False, "normal", False)
+        self._agregar_frase(text, red, style_type, True)
 
     def add_spacer(self, height=12):
-        self.content.append(Spacer(1, height))
+        self._agregar({"tipo": "espacio", "alto": height})
 
     def add_separator(self, style="modern"):
         """
@@ -136,51 +100,14 @@ class Informe():
         Args:
             style: Tipo de separador ("modern", "simple", "thick")
         """
-        if style == "modern":
-            # Separador moderno con gradiente visual
-            separator = HRFlowable(
-                width="80%", 
-                thickness=2, 
-                color=colors.HexColor('#3498DB'), 
-                spaceBefore=15, 
-                spaceAfter=15,
-                hAlign='CENTER'
-            )
-        elif style == "thick":
-            # Separador grueso
-            separator = HRFlowable(
-                width="100%", 
-                thickness=3, 
-                color=colors.HexColor('#2C3E50'), 
-                spaceBefore=10, 
-                spaceAfter=10
-            )
-        else:
-            # Separador simple
-            separator = HRFlowable(
-                width="100%", 
-                thickness=1, 
-                color=colors.HexColor('#BDC3C7'), 
-                spaceBefore=8, 
-                spaceAfter=8
-            )
-        
-        self.content.append(separator)
+        self._agregar({"tipo": "separador", "estilo": style})
 
     def add_list(self, items):
-        if not items:
-            self.content.append(Paragraph("Sin lista", normal_style))
-            return
-
-        table_data = [
-            Paragraph(item, normal_style) for item in items
-        ]
-        table = ListFlowable(
-            table_data,
-            bulletType='bullet'
-        )   
-        self.content.append(table)
-        self.content.append(Spacer(1, 12))
+        items = list(items) if items else []
+        resumen = [_recortar_texto(str(item)) for item in items[:MAX_ELEMENTOS_LISTA]]
+        if len(items) > MAX_ELEMENTOS_LISTA:
+            resumen.append(f"... y {_miles(len(items) - MAX_ELEMENTOS_LISTA)} elementos más")
+        self._agregar({"tipo": "lista", "items": items}, {"tipo": "lista", "items": resumen})
 
     def add_table(self, data, headers=None, col_widths=None):
         """
@@ -191,98 +118,122 @@ class Informe():
             headers: Lista con los encabezados (opcional)
             col_widths: Lista con los anchos de columnas (opcional)
         """
-        if not data:
-            self.content.append(Paragraph("Sin datos para mostrar en la tabla", normal_style))
-            return
-
-        # Preparar los datos
-        table_data = []
-        
-        # Agregar encabezados si existen
-        if headers:
-            table_data.append(headers)
-        
-        # Agregar datos
-        for row in data:
-            table_data.append(row)
-
-        # Crear la tabla con anchos personalizados o por defecto
-        if col_widths:
-            table = Table(table_data, colWidths=col_widths)
-        else:
-            # Calcular anchos automáticamente
-            num_cols = len(table_data[0]) if table_data else 1
-            auto_width = (7 * inch) / num_cols  # Distribuir en 7 pulgadas
-            table = Table(table_data, colWidths=[auto_width] * num_cols)
-
-        # Estilo moderno para la tabla
-        table_style = [
-            # Estilo para encabezados (si existen)
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Estilo para el cuerpo de la tabla
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ECF0F1')),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#2C3E50')),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-            
-            # Alternating row colors para mejor legibilidad
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#ECF0F1'), colors.HexColor('#F8F9FA')]),
-            
-            # Padding para mejor espaciado
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        data = [list(row) for row in data] if data else []
+        resumen = data[:MAX_FILAS_TABLA]
+        if len(data) > MAX_FILAS_TABLA:
+            resumen = resumen + [[f"... y {_miles(len(data) - MAX_FILAS_TABLA)} filas más"] + [""] * (len(data[0]) - 1)]
+        elemento = {"tipo": "tabla", "filas": data, "encabezados": headers, "anchos": col_widths}
+        self._agregar(elemento, dict(elemento, filas=resumen))
+
+    def add_resultado(self, resultado):
+        """
+        Registra el resultado de una validación (un diccionario) para los formatos legibles por máquinas.
+        """
+        self.resultados.append(resultado)
+        self._escribir_jsonl({"tipo": "resultado", **resultado})
+
+    # Formatos de salida
+    def _crear_pdf(self, title, author):
+        # reportlab se importa solo al generar un PDF
+        from informe_pdf import crear_pdf
+
+        crear_pdf(self.elementos, self.ruta("pdf"), title, author, pagesize=self.pagesize)
+
+    def _crear_html(self, title, author):
+        partes = [
+            "<!DOCTYPE html>",
+            "<html lang=\"es\"><head><meta charset=\"utf-8\">",
+            f"<title>{html.escape(title)}</title><meta name=\"author\" content=\"{html.escape(author)}\">",
+            "<style>body{font-family:Helvetica,Arial,sans-serif;color:#2C3E50;max-width:60em;margin:2em auto}"
+            "h1{text-align:center;border:2px solid #3498DB;padding:10px}h2{color:#34495E}"
+            ".rojo{color:#E74C3C;font-weight:bold}.exito{color:#27AE60;font-weight:bold}"
+            "table{border-collapse:collapse}th{background:#34495E;color:white}"
+            "td,th{border:1px solid #BDC3C7;padding:6px 8px;text-align:center}</style>",
+            "</head><body>",
         ]
-        
-        # Si no hay encabezados, ajustar el estilo
-        if not headers:
-            table_style = [
-                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ECF0F1')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2C3E50')),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-                ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor('#ECF0F1'), colors.HexColor('#F8F9FA')]),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]
-
-        table.setStyle(TableStyle(table_style))
-        self.content.append(table)
-        self.content.append(Spacer(1, 12))
-
+        for elemento in self.elementos:
+            tipo = elemento["tipo"]
+            if tipo == "titulo":
+                partes.append(f"<h1>{html.escape(elemento['texto'])}</h1>")
+            elif tipo == "encabezado":
+                partes.append(f"<h2>{html.escape(elemento['texto'])}</h2>")
+            elif tipo == "frase":
+                clase = "rojo" if elemento["rojo"] or elemento["estilo"] == "highlight" else "exito" if elemento["estilo"] == "success" else ""
+                partes.append(f"<p class=\"{clase}\">{html.escape(elemento['texto'])}</p>" if clase else f"<p>{html.escape(elemento['texto'])}</p>")
+            elif tipo == "separador":
+                partes.append("<hr>")
+            elif tipo == "lista":
+                partes.append("<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in elemento["items"]) + "</ul>")
+            elif tipo == "tabla":
+                filas = []
+                if elemento["encabezados"]:
+                    filas.append("<tr>" + "".join(f"<th>{html.escape(str(celda))}</th>" for celda in elemento["encabezados"]) + "</tr>")
+                filas.extend("<tr>" + "".join(f"<td>{html.escape(str(celda))}</td>" for celda in fila) + "</tr>" for fila in elemento["filas"])
+                partes.append("<table>" + "".join(filas) + "</table>")
+        partes.append("</body></html>")
+        with open(self.ruta("html"), "w", encoding="utf-8") as f:
+            f.write("\n".join(partes))
+
+    def _crear_markdown(self, title, author):
+        def _celda(valor):
+            return str(valor).replace("|", "\\|").replace("\n", " ")
+
+        partes = []
+        for elemento in self.elementos:
+            tipo = elemento["tipo"]
+            if tipo == "titulo":
+                partes.append(f"# {elemento['texto']}")
+            elif tipo == "encabezado":
+                partes.append(f"## {elemento['texto']}")
+            elif tipo == "frase":
+                destacada = elemento["rojo"] or elemento["estilo"] in ("highlight", "success")
+                partes.append(f"**{elemento['texto']}**" if destacada else elemento["texto"])
+            elif tipo == "separador":
+                partes.append("---")
+            elif tipo == "lista":
+                partes.append("\n".join(f"- {item}" for item in elemento["items"]))
+            elif tipo == "tabla" and elemento["filas"]:
+                encabezados = elemento["encabezados"] or [""] * len(elemento["filas"][0])
+                filas = [encabezados, ["---"] * len(encabezados)] + elemento["filas"]
+                partes.append("\n".join("| " + " | ".join(_celda(celda) for celda in fila) + " |" for fila in filas))
+        with open(self.ruta("md"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(partes) + "\n")
+
+    def _crear_json(self, title, author):
+        with open(self.ruta("json"), "w", encoding="utf-8") as f:
+            json.dump({"informe": self.filename, "titulo": title, "autor": author, "resultados": self.resultados},
+                      f, ensure_ascii=False, indent=2, default=str)
+
+    def cerrar(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
 
     def create_informe(self, title="Informe Generado", author="Sistema Validador"):
         """
-        Crear el informe PDF con metadatos y configuración mejorada
+        Crear el informe en cada formato pedido e informar cuánto tardó cada uno
         
         Args:
             title: Título del documento para metadatos
             author: Autor del documento para metadatos
+        Returns:
+            bool: True si se crearon todos los formatos.
         """
-        try:
-            # Configurar metadatos del documento
-            self.doc.title = title
-            self.doc.author = author
-            self.doc.subject = "Informe generado automáticamente"
-            self.doc.creator = "Sistema Validador Python"
-            
-            # Construir el documento
-            self.doc.build(self.content)
-            
-            return True
-        except Exception as e:
-            print(f"Error al crear el informe: {e}")
-            return False
+        creado = True
+        for formato in self.formatos:
+            inicio = time.perf_counter()
+            try:
+                if formato == "jsonl":
+                    # El detalle ya se escribió a medida que se agregó; un informe vacío deja el archivo vacío
+                    if self._jsonl is None:
+                        open(self.ruta("jsonl"), "w", encoding="utf-8").close()
+                    self.cerrar()
+                else:
+                    self.renderizadores[formato](title, author)
+            except Exception as e:
+                print(f"Error al crear el informe: {e}")
+                creado = False
+                continue
+            self.tiempos[formato] = time.perf_counter() - inicio
+            print(f"🕒 Informe {formato.upper()} generado en {self.tiempos[formato]:.2f} s ({self.ruta(formato)})")
+        return creado
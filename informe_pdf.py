@@ -0,0 +1,232 @@
+"""
+Generación del informe en PDF con reportlab.
+
+Se importa solo al crear un PDF: cargar reportlab y construir los estilos toma una fracción
+importante del arranque, que no se paga al validar sin informe PDF.
+"""
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer, HRFlowable, ListFlowable
+from reportlab.lib.units import inch
+
+# Crear estilos modernos y atractivos
+styles = getSampleStyleSheet()
+
+# Estilo para título principal - moderno y elegante
+title_style = ParagraphStyle(
+    'ModernTitle',
+    parent=styles['Title'],
+    fontSize=24,
+    spaceAfter=20,
+    textColor=colors.HexColor('#2C3E50'),  # Azul oscuro elegante
+    alignment=1,  # Centrado
+    fontName='Helvetica-Bold',
+    borderWidth=2,
+    borderColor=colors.HexColor('#3498DB'),  # Azul moderno
+    borderPadding=10
+)
+
+# Estilo para encabezados - con color y espaciado mejorado
+heading_style = ParagraphStyle(
+    'ModernHeading',
+    parent=styles['Heading2'],
+    fontSize=16,
+    spaceAfter=12,
+    spaceBefore=18,
+    textColor=colors.HexColor('#34495E'),  # Gris azulado
+    fontName='Helvetica-Bold',
+    leftIndent=0,
+    borderWidth=0,
+    borderColor=colors.HexColor('#E74C3C'),  # Rojo elegante
+    borderPadding=8
+)
+
+# Estilo para texto normal - mejorado
+normal_style = ParagraphStyle(
+    'ModernBody',
+    parent=styles['BodyText'],
+    fontSize=11,
+    spaceAfter=6,
+    textColor=colors.HexColor('#2C3E50'),
+    fontName='Helvetica',
+    alignment=4,  # Justificado
+    lineHeight=1.4
+)
+
+# Estilo para texto destacado
+highlight_style = ParagraphStyle(
+    'Highlight',
+    parent=normal_style,
+    fontSize=12,
+    textColor=colors.HexColor('#E74C3C'),  # Rojo elegante
+    fontName='Helvetica-Bold',
+    spaceAfter=8,
+    spaceBefore=8
+)
+
+# Estilo para texto de éxito
+success_style = ParagraphStyle(
+    'Success',
+    parent=normal_style,
+    fontSize=12,
+    textColor=colors.HexColor('#27AE60'),  # Verde elegante
+    fontName='Helvetica-Bold',
+    spaceAfter=8,
+    spaceBefore=8
+)
+
+
+def crear_pdf(elementos, ruta, title, author, pagesize=None):
+    """
+    Genera el PDF de un informe a partir de sus elementos (ver Informe).
+    """
+    content = []
+    for elemento in elementos:
+        tipo = elemento["tipo"]
+        if tipo == "titulo":
+            content.append(_parrafo(elemento["texto"], title_style))
+            content.append(Spacer(1, 12))
+        elif tipo == "encabezado":
+            content.append(_parrafo(elemento["texto"], heading_style))
+        elif tipo == "frase":
+            # Seleccionar el estilo según el tipo
+            if elemento["estilo"] == "highlight" or elemento["rojo"]:
+                selected_style = highlight_style
+            elif elemento["estilo"] == "success":
+                selected_style = success_style
+            else:
+                selected_style = normal_style
+            content.append(_parrafo(elemento["texto"], selected_style))
+            if elemento["espaciada"]:
+                content.append(Spacer(1, 12))
+        elif tipo == "espacio":
+            content.append(Spacer(1, elemento["alto"]))
+        elif tipo == "separador":
+            content.append(_separador(elemento["estilo"]))
+        elif tipo == "lista":
+            if not elemento["items"]:
+                content.append(Paragraph("Sin lista", normal_style))
+                continue
+            content.append(ListFlowable([_parrafo(item, normal_style) for item in elemento["items"]], bulletType='bullet'))
+            content.append(Spacer(1, 12))
+        elif tipo == "tabla":
+            if not elemento["filas"]:
+                content.append(Paragraph("Sin datos para mostrar en la tabla", normal_style))
+                continue
+            content.append(_tabla(elemento["filas"], elemento["encabezados"], elemento["anchos"]))
+            content.append(Spacer(1, 12))
+
+    doc = SimpleDocTemplate(ruta, pagesize=pagesize or A4)
+    # Configurar metadatos del documento
+    doc.title = title
+    doc.author = author
+    doc.subject = "Informe generado automáticamente"
+    doc.creator = "Sistema Validador Python"
+    doc.build(content)
+
+
+def _parrafo(texto, style):
+    # Paragraph interpreta su texto como marcado XML: un valor del archivo con '<' o '&' lo rompería
+    return Paragraph(escape(str(texto)), style)
+
+
+def _separador(style):
+    if style == "modern":
+        # Separador moderno con gradiente visual
+        return HRFlowable(
+            width="80%", 
+            thickness=2, 
+            color=colors.HexColor('#3498DB'), 
+            spaceBefore=15, 
+            spaceAfter=15,
+            hAlign='CENTER'
+        )
+    elif style == "thick":
+        # Separador grueso
+        return HRFlowable(
+            width="100%", 
+            thickness=3, 
+            color=colors.HexColor('#2C3E50'), 
+            spaceBefore=10, 
+            spaceAfter=10
+        )
+    # Separador simple
+    return HRFlowable(
+        width="100%", 
+        thickness=1, 
+        color=colors.HexColor('#BDC3C7'), 
+        spaceBefore=8, 
+        spaceAfter=8
+    )
+
+
+def _tabla(data, headers, col_widths):
+    # Preparar los datos
+    table_data = []
+    
+    # Agregar encabezados si existen
+    if headers:
+        table_data.append(headers)
+    
+    # Agregar datos
+    for row in data:
+        table_data.append(row)
+
+    # Crear la tabla con anchos personalizados o por defecto
+    if col_widths:
+        table = Table(table_data, colWidths=col_widths)
+    else:
+        # Calcular anchos automáticamente
+        num_cols = len(table_data[0]) if table_data else 1
+        auto_width = (7 * inch) / num_cols  # Distribuir en 7 pulgadas
+        table = Table(table_data, colWidths=[auto_width] * num_cols)
+
+    # Estilo moderno para la tabla
+    table_style = [
+        # Estilo para encabezados (si existen)
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495E')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('TOPPADDING', (0, 0), (-1, 0), 12),
+        
+        # Estilo para el cuerpo de la tabla
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ECF0F1')),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#2C3E50')),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+        
+        # Alternating row colors para mejor legibilidad
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#ECF0F1'), colors.HexColor('#F8F9FA')]),
+        
+        # Padding para mejor espaciado
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ]
+    
+    # Si no hay encabezados, ajustar el estilo
+    if not headers:
+        table_style = [
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#ECF0F1')),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2C3E50')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor('#ECF0F1'), colors.HexColor('#F8F9FA')]),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]
+
+    table.setStyle(TableStyle(table_style))
+    return table
@@ -0,0 +1,339 @@
+"""
+Instantáneas estadísticas de cada entrega.
+
+Al terminar las validaciones se guarda un JSON pequeño con el resumen del archivo: número de filas
+y, por cada columna validada, nulos, mínimo, máximo, valores distintos, un bosquejo HyperLogLog de
+los valores distintos, el histograma de las categorías más frecuentes y, en columnas de RUT, los RUT
+distintos por tramo de un millón. Todo se deriva del perfil de columna que ya calculan las
+validaciones, sin volver a recorrer el archivo.
+
+Las entregas siguientes se comparan con la instantánea del período anterior (deriva de nulos, de
+valores distintos y de la distribución de categorías y de tramos, medida con el índice de
+estabilidad poblacional, PSI), sin leer el CSV anterior.
+"""
+import base64
+import datetime
+import json
+import math
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+# Carpeta de las instantáneas; por defecto la subcarpeta "instantaneas" de la carpeta de los informes
+CARPETA_INSTANTANEAS = os.environ.get("VALIDADOR_INSTANTANEAS")
+
+# Registros del bosquejo HyperLogLog: 2^12 = 4.096 registros de un byte (error típico de 1,6 %)
+PRECISION_HLL = 12
+
+# Categorías que se guardan por columna; el resto se agrupa como OTRAS
+MAX_CATEGORIAS = 50
+OTRAS = "(otras)"
+
+# Ancho de los tramos de RUT; una columna de enteros cuyo máximo no llega al primer tramo no es de RUT
+ANCHO_TRAMO = 1_000_000
+MIN_RUT_TRAMOS = ANCHO_TRAMO
+
+# Bytes del mapa de bits de distintos que se desempaquetan de una vez
+BLOQUE_BITS = 1 << 20
+
+# Valores que se hashean de una vez al agregarlos al bosquejo
+BLOQUE_HASH = 1 << 18
+
+# Umbrales de deriva: PSI sobre 0,2 es un cambio importante de distribución; los nulos se comparan
+# como diferencia absoluta de proporción y las filas y los distintos como cambio relativo
+UMBRAL_PSI = 0.2
+UMBRAL_NULOS = 0.05
+UMBRAL_DISTINTOS = 0.2
+UMBRAL_FILAS = 0.2
+
+# Bits en uno de cada byte, para contar los distintos de un tramo sin desempaquetar el mapa de bits
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def _son_enteros(valores):
+    if valores.dtype.kind in "iu":
+        return True
+    if valores.dtype.kind == "f":
+        return bool(np.all(np.mod(valores, 1) == 0))
+    return valores.dtype.kind == "O" and all(isinstance(valor, (int, np.integer)) for valor in valores)
+
+
+def _hashes(valores, enteros):
+    """
+    Hash de 64 bits de cada valor. Los enteros (también los float enteros) se hashean como int64,
+    así una columna da los mismos hashes aunque un mes se lea como entero y otro como decimal.
+    """
+    if enteros:
+        return pd.util.hash_array(valores.astype(np.int64))
+    return pd.util.hash_array(valores.astype(str).astype(object))
+
+
+class BosquejoDistintos:
+    """
+    Bosquejo HyperLogLog de los valores distintos de una columna. Dos bosquejos se combinan con el
+    máximo de sus registros, lo que permite estimar cuántos valores comparten dos entregas.
+    """
+    __slots__ = ("registros",)
+
+    def __init__(self, registros=None):
+        self.registros = registros if registros is not None else np.zeros(1 << PRECISION_HLL, dtype=np.uint8)
+
+    def agregar(self, valores):
+        valores = np.asarray(valores)
+        if len(valores) == 0:
+            return
+        # El tipo de hash se decide sobre todos los valores; el texto se hashea por tramos acotados
+        enteros = _son_enteros(valores)
+        for inicio in range(0, len(valores), BLOQUE_HASH):
+            self._agregar_hashes(_hashes(valores[inicio:inicio + BLOQUE_HASH], enteros))
+
+    def _agregar_hashes(self, hashes):
+        indices = (hashes >> np.uint64(64 - PRECISION_HLL)).astype(np.int64)
+        # Los 64 - PRECISION_HLL bits restantes caben exactos en un float64: frexp entrega su largo en bits
+        resto = (hashes & np.uint64((1 << (64 - PRECISION_HLL)) - 1)).astype(np.float64)
+        _, largo = np.frexp(resto)
+        rangos = (64 - PRECISION_HLL + 1 - largo).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def union(self, other):
+        return BosquejoDistintos(np.maximum(self.registros, other.registros))
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        ceros = int((self.registros == 0).sum())
+        if estimacion <= 2.5 * m and ceros:
+            # Corrección para pocos valores: conteo lineal de registros vacíos
+            estimacion = m * math.log(m / ceros)
+        return float(estimacion)
+
+    def a_texto(self):
+        return base64.b64encode(zlib.compress(self.registros.tobytes())).decode("ascii")
+
+    @classmethod
+    def desde_texto(cls, texto):
+        return cls(np.frombuffer(zlib.decompress(base64.b64decode(texto)), dtype=np.uint8).copy())
+
+
+def _bloques_distintos(distintos):
+    """
+    Valores de un ConjuntoDistintos por bloques, sin desempaquetar todo el mapa de bits de una vez.
+    """
+    if distintos.bits is not None:
+        for inicio in range(0, len(distintos.bits), BLOQUE_BITS):
+            bloque = np.unpackbits(distintos.bits[inicio:inicio + BLOQUE_BITS], bitorder="little")
+            yield np.flatnonzero(bloque) + inicio * 8
+    elif distintos.valores is not None and len(distintos.valores):
+        yield distintos.valores
+
+
+def _tramos(distintos, maximo):
+    """
+    RUT distintos por tramo de ANCHO_TRAMO, contados sobre el mapa de bits. None si la columna
+    no es de enteros acotados o si sus valores no llegan al primer tramo (no son RUT).
+    """
+    if distintos.bits is None or maximo is None or pd.isna(maximo) or maximo < MIN_RUT_TRAMOS:
+        return None
+    bytes_tramo = ANCHO_TRAMO // 8
+    tramos = {}
+    for tramo, inicio in enumerate(range(0, len(distintos.bits), bytes_tramo)):
+        veces = int(_BITS_POR_BYTE[distintos.bits[inicio:inicio + bytes_tramo]].sum())
+        if veces:
+            tramos[str(tramo)] = veces
+    return tramos
+
+
+def _json(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (pd.Timestamp, datetime.date)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor if isinstance(valor, (int, float, str, bool)) else str(valor)
+
+
+def resumen_columna(perfil, tipo=None):
+    """
+    Resumen de una columna a partir de su PerfilColumna.
+    """
+    bosquejo = BosquejoDistintos()
+    for valores in _bloques_distintos(perfil.distintos):
+        bosquejo.agregar(valores)
+
+    categorias = None
+    if perfil.frecuencias is not None:
+        frecuentes = perfil.mas_frecuentes(MAX_CATEGORIAS)
+        categorias = {str(_json(valor)): veces for valor, veces in frecuentes}
+        otras = perfil.filas - perfil.nulos - sum(categorias.values())
+        if otras:
+            categorias[OTRAS] = otras
+
+    return {
+        "tipo": tipo,
+        "filas": perfil.filas,
+        "nulos": perfil.nulos,
+        "minimo": _json(perfil.minimo),
+        "maximo": _json(perfil.maximo),
+        "distintos": len(perfil.distintos),
+        "bosquejo": bosquejo.a_texto(),
+        "categorias": categorias,
+        "tramos": _tramos(perfil.distintos, perfil.maximo),
+    }
+
+
+def crear_instantanea(file_path, filas, columnas):
+    """
+    Instantánea del archivo. columnas es un diccionario columna -> resumen_columna.
+    El tamaño y la fecha de modificación permiten reconocer el archivo sin volver a leerlo.
+    """
+    stat = os.stat(file_path)
+    return {
+        "archivo": os.path.basename(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "filas": int(filas),
+        "columnas": columnas,
+    }
+
+
+def ruta_instantanea(carpeta, nombre):
+    return os.path.join(carpeta, f"{nombre}.json")
+
+
+def guardar_instantanea(carpeta, nombre, instantanea):
+    os.makedirs(carpeta, exist_ok=True)
+    path = ruta_instantanea(carpeta, nombre)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(instantanea, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def cargar_instantanea(path):
+    """
+    Carga una instantánea; None si no existe o no se puede leer.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def corresponde_a(instantanea, file_path):
+    """
+    True si la instantánea fue tomada de este archivo tal como está ahora (mismo tamaño y fecha).
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+    return instantanea is not None and (instantanea["size"], instantanea["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns)
+
+
+def periodo_anterior(nombre, patron):
+    """
+    Nombre del archivo del período anterior según el patrón de validate_filename: con AAAA y MM
+    se resta un mes, solo con AAAA un año. Retorna None si el patrón no tiene período o el nombre
+    no calza con él.
+    """
+    usados = set()
+
+    def reemplazar(coincidencia):
+        # Solo la primera aparición del año y del mes se captura; el día no cambia de un período a otro
+        token = coincidencia.group(0).upper()
+        grupo = {"AAAA": "anio", "MM": "mes"}.get(token)
+        if grupo is None or grupo in usados:
+            return r"\d{4}" if token == "AAAA" else r"\d{2}"
+        usados.add(grupo)
+        return rf"(?P<{grupo}>\d{{{len(token)}}})"
+
+    coincidencia = re.match(f"^{re.sub(r'AAAA|aaaa|MM|mm|DD|dd', reemplazar, patron)}$", nombre)
+    if coincidencia is None or "anio" not in usados:
+        return None
+
+    anio = int(coincidencia.group("anio"))
+    if "mes" in usados:
+        mes = int(coincidencia.group("mes")) - 1
+        anio, mes = (anio - 1, 12) if mes == 0 else (anio, mes)
+        valores = {"anio": f"{anio:04d}", "mes": f"{mes:02d}"}
+    else:
+        valores = {"anio": f"{anio - 1:04d}"}
+
+    # Se reemplazan los grupos de atrás hacia adelante para no mover las posiciones
+    partes = list(nombre)
+    for grupo in sorted(valores, key=coincidencia.start, reverse=True):
+        partes[coincidencia.start(grupo):coincidencia.end(grupo)] = valores[grupo]
+    return "".join(partes)
+
+
+def psi(actual, anterior):
+    """
+    Índice de estabilidad poblacional entre dos histogramas (diccionarios categoría -> veces).
+    None si alguno está vacío.
+    """
+    total_actual, total_anterior = sum(actual.values()), sum(anterior.values())
+    if not total_actual or not total_anterior:
+        return None
+    indice = 0.0
+    for categoria in set(actual) | set(anterior):
+        # Proporción mínima para que las categorías nuevas o desaparecidas no den infinito
+        a = max(actual.get(categoria, 0) / total_actual, 1e-4)
+        b = max(anterior.get(categoria, 0) / total_anterior, 1e-4)
+        indice += (a - b) * math.log(a / b)
+    return indice
+
+
+class DerivaColumna:
+    """
+    Comparación de una columna con la misma columna de la instantánea anterior.
+    Params:
+        nulos (tuple): Proporción de nulos (anterior, actual).
+        distintos (tuple): Valores distintos (anterior, actual).
+        psi_categorias (float): PSI de las categorías, None si alguna entrega no tiene histograma.
+        psi_tramos (float): PSI de los RUT por tramo, None si la columna no tiene tramos.
+        continuidad (float): Proporción estimada de los valores distintos anteriores que siguen presentes.
+        motivos (list): Estadísticas con deriva sobre los umbrales.
+    """
+    __slots__ = ("columna", "nulos", "distintos", "psi_categorias", "psi_tramos", "continuidad", "motivos")
+
+    def __init__(self, columna, actual, anterior):
+        self.columna = columna
+        self.nulos = tuple(resumen["nulos"] / resumen["filas"] if resumen["filas"] else 0.0 for resumen in (anterior, actual))
+        self.distintos = (anterior["distintos"], actual["distintos"])
+        self.psi_categorias = psi(actual["categorias"], anterior["categorias"]) if actual["categorias"] and anterior["categorias"] else None
+        self.psi_tramos = psi(actual["tramos"], anterior["tramos"]) if actual["tramos"] and anterior["tramos"] else None
+
+        bosquejo_actual = BosquejoDistintos.desde_texto(actual["bosquejo"])
+        bosquejo_anterior = BosquejoDistintos.desde_texto(anterior["bosquejo"])
+        estimado_anterior = bosquejo_anterior.estimar()
+        comunes = bosquejo_actual.estimar() + estimado_anterior - bosquejo_actual.union(bosquejo_anterior).estimar()
+        self.continuidad = min(max(comunes / estimado_anterior, 0.0), 1.0) if estimado_anterior >= 1 else None
+
+        self.motivos = []
+        if abs(self.nulos[1] - self.nulos[0]) > UMBRAL_NULOS:
+            self.motivos.append("nulos")
+        if self.distintos[0] and abs(self.distintos[1] - self.distintos[0]) / self.distintos[0] > UMBRAL_DISTINTOS:
+            self.motivos.append("distintos")
+        if self.psi_categorias is not None and self.psi_categorias > UMBRAL_PSI:
+            self.motivos.append("categorías")
+        if self.psi_tramos is not None and self.psi_tramos > UMBRAL_PSI:
+            self.motivos.append("tramos de RUT")
+
+
+def comparar_instantaneas(actual, anterior):
+    """
+    Deriva de cada columna presente en ambas instantáneas.
+    Returns:
+        list: DerivaColumna en el orden de las columnas de la instantánea actual.
+    """
+    return [DerivaColumna(columna, resumen, anterior["columnas"][columna])
+            for columna, resumen in actual["columnas"].items() if columna in anterior["columnas"]]
@@ -0,0 +1,173 @@
+"""
+Validación por lotes: valida todos los archivos de una carpeta (o de un patrón glob)
+en un pool de procesos, sin diálogos ni preguntas por consola.
+
+El archivo de mapeo es un CSV separado por ";" con dos columnas: un patrón de nombre
+de archivo (estilo glob, por ejemplo ANEXO_6_A_BTE_*.csv) y la ruta del archivo de
+validaciones que le corresponde. Las rutas relativas se toman desde la carpeta del mapeo.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import fnmatch
+import glob
+import os
+import sys
+
+import pandas as pd
+
+from indice_comunas import IndiceComunas
+from indice_ruts import IndiceRuts
+from validaciones import Validador
+
+
+RESUMEN_FILENAME = "resumen_validaciones.csv"
+
+# RUTs de prueba y tabla de comunas del proceso worker, cargados una sola vez al iniciar el pool
+_ruts_prueba = None
+_comunas = None
+
+
+def _inicializar_worker(ruts_prueba, comunas=None):
+    global _ruts_prueba, _comunas
+    _ruts_prueba = ruts_prueba
+    _comunas = comunas
+
+
+def cargar_mapeo(mapeo_path):
+    """
+    Carga el mapeo patrón -> archivo de validaciones.
+    Returns:
+        list: Lista de tuplas (patrón, ruta de validaciones) en el orden del archivo.
+    """
+    try:
+        df_mapeo = pd.read_csv(mapeo_path, encoding="latin1", sep=";")
+    except Exception as e:
+        raise ValueError(f"Error loading mapping: {e}")
+
+    base = os.path.dirname(os.path.abspath(mapeo_path))
+    mapeo = []
+    for patron, validations in zip(df_mapeo.iloc[:, 0], df_mapeo.iloc[:, 1]):
+        validations = validations.strip()
+        mapeo.append((patron.strip(), validations if os.path.isabs(validations) else os.path.join(base, validations)))
+    return mapeo
+
+
+def buscar_archivos(entrada):
+    """
+    Retorna los CSV de una carpeta o los archivos que calzan con un patrón glob.
+    """
+    if os.path.isdir(entrada):
+        entrada = os.path.join(entrada, "*.csv")
+    return sorted(os.path.abspath(path) for path in glob.glob(entrada) if os.path.isfile(path))
+
+
+def asignar_validaciones(file_path, mapeo):
+    nombre = os.path.basename(file_path)
+    for patron, validations_path in mapeo:
+        if fnmatch.fnmatch(nombre, patron):
+            return validations_path
+    return None
+
+
+def _validar_archivo(file_path, validations_path, gabinete, output_folder, chunksize, use_cache, formatos):
+    resumen = {"archivo": os.path.basename(file_path), "validaciones": os.path.basename(validations_path),
+               "estado": "", "filas": None, "informe": "", "error": ""}
+    try:
+        validador = Validador(file_path, validations_path, _ruts_prueba, chunksize=chunksize, use_cache=use_cache,
+                              workers=1, gabinete=gabinete, output_folder=output_folder, formatos=formatos,
+                              comunas=_comunas)
+        creado = validador.run_validations()
+        resumen["filas"] = validador.num_filas
+        resumen["informe"] = validador.informe.ruta(validador.informe.formatos[0])
+        resumen["estado"] = "ok" if creado else "error"
+        if not creado:
+            resumen["error"] = "No se pudo crear el informe"
+    except Exception as e:
+        resumen["estado"] = "error"
+        resumen["error"] = str(e)
+    return resumen
+
+
+def validar_lote(entrada, mapeo_path, ruts_prueba_path, gabinete="", output_folder=None, procesos=None,
+                 chunksize=None, use_cache=True, formatos=None, comunas_path=None):
+    """
+    Valida todos los archivos de la entrada y escribe un informe por archivo más un resumen.
+    Params:
+        entrada (str): Carpeta con los archivos a validar o patrón glob.
+        mapeo_path (str): CSV con el mapeo patrón de nombre -> archivo de validaciones.
+        ruts_prueba_path (str): Archivo de RUTs de prueba, se carga una sola vez para todo el lote.
+        gabinete (str): Número de gabinete que se informa en cada informe.
+        output_folder (str): Carpeta donde se escriben los informes y el resumen.
+        procesos (int): Número de procesos del pool (por defecto, uno por núcleo).
+        formatos (list): Formatos de cada informe (pdf, html, md, jsonl); por defecto pdf.
+        comunas_path (str): Tabla de comunas para validate_comuna, se carga una sola vez para todo el lote.
+    Returns:
+        pd.DataFrame: Resumen con el estado de cada archivo.
+    """
+    mapeo = cargar_mapeo(mapeo_path)
+    if output_folder is None:
+        output_folder = entrada if os.path.isdir(entrada) else os.path.dirname(os.path.abspath(entrada))
+    output_folder = os.path.abspath(output_folder)
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Los archivos de configuración pueden estar en la misma carpeta que las entregas
+    excluidos = {os.path.abspath(path) for path in [mapeo_path, ruts_prueba_path, os.path.join(output_folder, RESUMEN_FILENAME)]
+                 + ([comunas_path] if comunas_path else [])}
+    excluidos.update(os.path.abspath(validations) for _, validations in mapeo)
+    archivos = [path for path in buscar_archivos(entrada) if path not in excluidos]
+    print(f"📁 {len(archivos)} archivos encontrados para validar")
+
+    ruts_prueba = IndiceRuts.desde_csv(ruts_prueba_path, use_cache=use_cache)
+    comunas = IndiceComunas.desde_csv(comunas_path, use_cache=use_cache) if comunas_path else None
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker, initargs=(ruts_prueba, comunas)) as executor:
+        futuros = []
+        for file_path in archivos:
+            validations_path = asignar_validaciones(file_path, mapeo)
+            if validations_path is None:
+                resultados.append({"archivo": os.path.basename(file_path), "validaciones": "", "estado": "sin validaciones",
+                                   "filas": None, "informe": "", "error": "Ningún patrón del mapeo calza con el nombre"})
+                continue
+            futuros.append(executor.submit(_validar_archivo, file_path, validations_path, gabinete, output_folder,
+                                           chunksize, use_cache, formatos))
+        resultados.extend(futuro.result() for futuro in futuros)
+
+    resumen = pd.DataFrame(resultados, columns=["archivo", "validaciones", "estado", "filas", "informe", "error"])
+    resumen = resumen.sort_values("archivo", kind="stable").reset_index(drop=True)
+    resumen["filas"] = resumen["filas"].astype("Int64")
+    resumen_path = os.path.join(output_folder, RESUMEN_FILENAME)
+    resumen.to_csv(resumen_path, sep=";", index=False, encoding="latin1", errors="replace")
+
+    errores = (resumen["estado"] != "ok").sum()
+    print(f"✅ {len(resumen) - errores} archivos validados, ❌ {errores} con problemas. Resumen: {resumen_path}")
+    return resumen
+
+
+if __name__ == "__main__":
+    # Opciones: --gabinete=N, --salida=CARPETA, --procesos=N, --bloques=N, --formatos=pdf,html, --comunas=ARCHIVO, --sin-cache
+    opciones = {"gabinete": "", "salida": None, "procesos": None, "bloques": None, "formatos": None, "comunas": None}
+    use_cache = True
+    argumentos = []
+    for arg in sys.argv[1:]:
+        if arg == "--sin-cache":
+            use_cache = False
+        elif arg.startswith("--") and "=" in arg and arg[2:].split("=", 1)[0] in opciones:
+            nombre, valor = arg[2:].split("=", 1)
+            opciones[nombre] = valor
+        else:
+            argumentos.append(arg)
+
+    if len(argumentos) != 3:
+        print("Uso del programa:")
+        print("  python lote.py <carpeta_o_patron> <mapeo_validaciones> <archivo_ruts_prueba> "
+              "[--gabinete=N] [--salida=CARPETA] [--procesos=N] [--bloques=N] [--formatos=pdf,html,md,json,jsonl] [--comunas=ARCHIVO] [--sin-cache]")
+        print("  Ejemplo:  python lote.py entregas/ mapeo.csv RUTDEPRUEBAS.csv --gabinete=3")
+        sys.exit(1)
+
+    validar_lote(argumentos[0], argumentos[1], argumentos[2], gabinete=opciones["gabinete"],
+                 output_folder=opciones["salida"],
+                 procesos=int(opciones["procesos"]) if opciones["procesos"] else None,
+                 chunksize=int(opciones["bloques"]) if opciones["bloques"] else None,
+                 use_cache=use_cache,
+                 formatos=opciones["formatos"].split(",") if opciones["formatos"] else None,
+                 comunas_path=opciones["comunas"])
@@ -0,0 +1,134 @@
+"""
+Métricas de rendimiento de las validaciones: tiempo, memoria máxima de cada paso y filas por segundo.
+"""
+import os
+import threading
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # resource no existe en Windows; sin él no se informa memoria
+    resource = None
+
+
+# En Linux el RSS actual se lee de statm (en páginas); un hilo lo muestrea mientras dura cada paso,
+# así cada paso mide su propio máximo sin reiniciar contadores del proceso ni del sistema
+STATM = "/proc/self/statm"
+INTERVALO_MUESTREO = 0.005
+
+
+def memoria_maxima_mb():
+    """
+    Máximo de memoria residente (RSS) del proceso hasta ahora, en MB. None si no se puede medir.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rss_mb():
+    with open(STATM) as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+class _MuestreoRss(threading.Thread):
+    """
+    Hilo que guarda el máximo de RSS del proceso hasta que se detiene. Los picos más breves que
+    INTERVALO_MUESTREO pueden no quedar registrados.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.maximo = _rss_mb()
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(INTERVALO_MUESTREO):
+            self.maximo = max(self.maximo, _rss_mb())
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+        self.maximo = max(self.maximo, _rss_mb())
+        return self.maximo
+
+
+class MedicionMemoria:
+    """
+    Memoria máxima usada dentro de un bloque with, en MB sobre la memoria al entrar (queda en .mb).
+    En Linux es el máximo de RSS que muestrea un hilo durante el bloque. En otros sistemas, con
+    trazar=True se usa el máximo de tracemalloc (asignaciones de Python y NumPy; hace más lento el
+    bloque) y si no el incremento de ru_maxrss, que es 0 si el bloque no supera el máximo anterior.
+    """
+
+    def __init__(self, trazar=False):
+        self.trazar = trazar
+        self.mb = None
+        self._modo = None
+        self._base = None
+        self._muestreo = None
+
+    def __enter__(self):
+        try:
+            self._muestreo = _MuestreoRss()
+        except (OSError, ValueError, AttributeError):
+            # Sin /proc (o sin sysconf en Windows) no se puede muestrear el RSS
+            self._muestreo = None
+        if self._muestreo is not None:
+            self._modo = "rss"
+            self._base = self._muestreo.maximo
+            self._muestreo.start()
+        elif self.trazar:
+            self._modo = "tracemalloc"
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._modo = "tracemalloc_propio"
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        else:
+            self._modo = "maxrss"
+            self._base = memoria_maxima_mb()
+        return self
+
+    def __exit__(self, *excepcion):
+        if self._modo == "rss":
+            self.mb = max(self._muestreo.detener() - self._base, 0.0)
+        elif self._modo.startswith("tracemalloc"):
+            self.mb = max(tracemalloc.get_traced_memory()[1] - self._base, 0) / 2 ** 20
+            if self._modo == "tracemalloc_propio":
+                tracemalloc.stop()
+        elif self._base is not None:
+            self.mb = memoria_maxima_mb() - self._base
+        return False
+
+
+class MetricaValidacion:
+    """
+    Rendimiento de una validación.
+    Params:
+        segundos (float): Tiempo total: el de la llamada más el de sus acumuladores precalculados.
+        segundos_calculo (float): Parte del tiempo que corresponde a acumuladores precalculados (los
+                                  acumuladores compartidos, como el perfil de columna, se suman en cada
+                                  validación que los usa).
+        memoria_mb (float): Memoria máxima usada durante la llamada, sobre la que había al empezar (ver MedicionMemoria).
+        filas_por_segundo (float): Filas del archivo divididas por el tiempo total.
+        perfil_path (str): Archivo con el perfil de cProfile, si se pidió perfilar.
+    """
+    __slots__ = ("validacion", "columna", "parametro", "segundos", "segundos_calculo", "memoria_mb",
+                 "filas_por_segundo", "perfil_path")
+
+    def __init__(self, validacion, columna, parametro, segundos, segundos_calculo, memoria_mb, filas,
+                 perfil_path=None):
+        self.validacion = validacion
+        self.columna = columna
+        self.parametro = parametro
+        self.segundos = segundos
+        self.segundos_calculo = segundos_calculo
+        self.memoria_mb = memoria_mb
+        self.filas_por_segundo = filas / segundos if segundos > 0 else None
+        self.perfil_path = perfil_path
+
+    def a_dict(self):
+        return {nombre: getattr(self, nombre) for nombre in self.__slots__}
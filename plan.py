@@ -0,0 +1,183 @@
+"""
+Compilación del archivo de validaciones.
+
+Cada fila del archivo (campo;validacion) se interpreta una sola vez como una Regla con su
+función, columna y parámetro. Las funciones desconocidas, las columnas que no existen y las
+validaciones de columna sin columna se rechazan antes de leer los datos, todas juntas en un
+solo error, junto con los parámetros que no se pueden interpretar (un número, un tipo o una fecha).
+"""
+import re
+
+import pandas as pd
+
+from fechas import convertir_limite, formato_strftime
+
+
+# funcion(parametros): el parámetro es todo lo que está entre el primer '(' y el último ')'
+PATRON_REGLA = re.compile(r"^\s*(\w+)\s*\((.*)\)\s*$", re.DOTALL)
+
+# Tipos que acepta validate_column_type
+TIPOS_COLUMNA = ("texto", "entero", "decimal", "fecha")
+
+# Validaciones de fecha cuyo parámetro es una fecha límite (en el formato declarado de la columna o AAAA-MM-DD)
+VALIDACIONES_FECHA_LIMITE = {"validate_fecha_desde", "validate_fecha_hasta"}
+
+
+class PlanInvalido(ValueError):
+    """
+    El archivo de validaciones tiene errores. errores contiene un mensaje por línea con problemas.
+    """
+
+    def __init__(self, errores):
+        self.errores = errores
+        super().__init__("El archivo de validaciones tiene errores:\n" + "\n".join(f"  - {error}" for error in errores))
+
+
+class Regla:
+    """
+    Una fila del archivo de validaciones.
+    Params:
+        numero (int): Número de la regla en el archivo de validaciones (desde 1, sin el encabezado).
+        funcion (str): Nombre de la función de validación.
+        campo (str): Columna validada, None en validaciones del archivo completo.
+        param (str): Texto entre paréntesis ("" si no tiene).
+    """
+    __slots__ = ("numero", "funcion", "campo", "param")
+
+    def __init__(self, numero, funcion, campo, param):
+        self.numero = numero
+        self.funcion = funcion
+        self.campo = campo
+        self.param = param
+
+    def __repr__(self):
+        return f"Regla({self.numero}, {self.campo}; {self.funcion}({self.param}))"
+
+
+class PlanValidaciones:
+    """
+    Reglas del archivo de validaciones en su orden original.
+    """
+
+    def __init__(self, reglas):
+        self.reglas = reglas
+
+    def __iter__(self):
+        return iter(self.reglas)
+
+    def __len__(self):
+        return len(self.reglas)
+
+
+def parsear_validacion(texto):
+    """
+    Separa 'funcion(parametros)' en (funcion, parametros). Lanza ValueError si el texto no tiene esa forma.
+    """
+    coincidencia = PATRON_REGLA.match(texto) if isinstance(texto, str) else None
+    if coincidencia is None:
+        raise ValueError(f"No se pudo interpretar la validación '{texto}' (se espera funcion(parametros))")
+    return coincidencia.group(1), coincidencia.group(2)
+
+
+def _numero(param):
+    try:
+        float(param)
+    except ValueError:
+        return f"'{param.strip()}' no es un número"
+    return None
+
+
+def _tipo(param):
+    if param.strip() not in TIPOS_COLUMNA:
+        return f"el tipo '{param.strip()}' no es válido (use {', '.join(TIPOS_COLUMNA)})"
+    return None
+
+
+def _categorias(param):
+    if not any(categoria.strip() for categoria in param.split(",")):
+        return "requiere al menos una categoría"
+    return None
+
+
+def _clase_caracteres(param):
+    # Vacío usa la clase por defecto
+    if not param.strip():
+        return None
+    try:
+        re.compile(f"[^{param}]")
+    except re.error as e:
+        return f"la clase de caracteres '{param}' no es válida ({e})"
+    return None
+
+
+def _formato_fecha(param):
+    if not param.strip():
+        return "requiere un formato de fecha, por ejemplo DD/MM/AAAA"
+    return None
+
+
+# Verificación del parámetro de cada función: retorna el problema encontrado o None
+VERIFICACIONES_PARAMETRO = {
+    "validate_mayor_igual_a": _numero,
+    "validate_menor_igual_a": _numero,
+    "validate_column_type": _tipo,
+    "validate_pertenece_a_categorias": _categorias,
+    "validate_sin_caracteres_especiales": _clase_caracteres,
+    "validate_formato_fecha": _formato_fecha,
+}
+
+
+def compilar_plan(filas, columnas, funciones, sin_columna=(), columna_en_param=()):
+    """
+    Compila las filas del archivo de validaciones.
+    Params:
+        filas (list): Tuplas (campo, validacion) como las entrega FileSelector.load_validations.
+        columnas (list): Columnas del archivo a validar.
+        funciones (iterable): Nombres de las funciones de validación disponibles.
+        sin_columna (set): Funciones que se pueden usar sin columna (validaciones del archivo completo).
+        columna_en_param (set): Funciones cuyo parámetro es el nombre de otra columna.
+    Returns:
+        PlanValidaciones: El plan compilado.
+    Raises:
+        PlanInvalido: Con todos los errores encontrados.
+    """
+    errores = []
+    reglas = []
+    for numero, (campo, validacion) in enumerate(filas, 1):
+        # Las validaciones de archivo completo tienen el campo vacío (NaN)
+        campo = campo.strip() if isinstance(campo, str) and campo.strip() else None
+        try:
+            funcion, param = parsear_validacion(validacion)
+        except ValueError as e:
+            errores.append((numero, str(e)))
+            continue
+
+        if funcion not in funciones:
+            errores.append((numero, f"la función '{funcion}' no existe"))
+            continue
+        if campo is None and funcion not in sin_columna:
+            errores.append((numero, f"{funcion} requiere una columna"))
+        elif campo is not None and campo not in columnas:
+            errores.append((numero, f"la columna '{campo}' de {funcion} no existe en el archivo"))
+        if funcion in columna_en_param and param.strip() and param.strip() not in columnas:
+            errores.append((numero, f"la columna '{param.strip()}' indicada en {funcion} no existe en el archivo"))
+        verificar = VERIFICACIONES_PARAMETRO.get(funcion)
+        problema = verificar(param) if verificar else None
+        if problema:
+            errores.append((numero, f"{funcion}: {problema}"))
+        reglas.append(Regla(numero, funcion, campo, param))
+
+    # Las fechas límite se interpretan con el formato declarado para su columna (el primero, si hay varios)
+    formatos = {}
+    for regla in reglas:
+        if regla.funcion == "validate_formato_fecha" and regla.param.strip():
+            formatos.setdefault(regla.campo, formato_strftime(regla.param))
+    for regla in reglas:
+        if regla.funcion in VALIDACIONES_FECHA_LIMITE and pd.isna(convertir_limite(regla.param, formatos.get(regla.campo))):
+            errores.append((regla.numero, f"{regla.funcion}: la fecha '{regla.param.strip()}' no es válida "
+                           "(use AAAA-MM-DD o el formato declarado de la columna)"))
+
+    if errores:
+        # Ordenados por línea del archivo; la línea 1 es el encabezado
+        raise PlanInvalido([f"Línea {numero + 1}: {error}" for numero, error in sorted(errores, key=lambda error: error[0])])
+    return PlanValidaciones(reglas)
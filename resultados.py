@@ -0,0 +1,85 @@
+"""
+Resultados compactos de las validaciones.
+
+Una validación no entrega la lista completa de valores que no cumplen: entrega el número de
+infracciones, una muestra acotada (fila, valor) y un mapa de bits con las filas infractoras.
+Las filas completas solo se leen cuando se piden (Validador.filas_infractoras).
+"""
+import numpy as np
+
+
+class MapaFilas:
+    """
+    Conjunto de números de fila (desde 0) como mapa de bits empaquetado: un bit por fila.
+    """
+    __slots__ = ("bits",)
+
+    def __init__(self):
+        self.bits = np.zeros(0, dtype=np.uint8)
+
+    def _reservar(self, necesario):
+        if len(self.bits) < necesario:
+            # Crecer al menos al doble para no copiar el mapa en cada bloque
+            bits = np.zeros(max(necesario, 2 * len(self.bits)), dtype=np.uint8)
+            bits[:len(self.bits)] = self.bits
+            self.bits = bits
+
+    def agregar(self, filas):
+        filas = np.asarray(filas, dtype=np.int64)
+        if len(filas) == 0:
+            return
+        self._reservar(int(filas.max() >> 3) + 1)
+        np.bitwise_or.at(self.bits, filas >> 3, np.left_shift(1, filas & 7).astype(np.uint8))
+
+    def merge(self, other):
+        self._reservar(len(other.bits))
+        self.bits[:len(other.bits)] |= other.bits
+
+    def filas(self):
+        return np.flatnonzero(np.unpackbits(self.bits, bitorder="little"))
+
+    def __len__(self):
+        return int(np.unpackbits(self.bits).sum())
+
+
+class ResultadoValidacion:
+    """
+    Resultado de una validación.
+    Params:
+        validacion (str): Nombre de la función de validación.
+        columna (str): Columna validada (None para validaciones del archivo completo).
+        parametro (str): Parámetro de la validación.
+        cumple (bool): True si la validación se cumple.
+        infracciones (int): Número de valores que no cumplen; None si la validación no se evalúa
+                            valor a valor (por ejemplo, el tipo de dato de la columna).
+        muestra (list): Primeras infracciones como tuplas (fila, valor), con filas desde 0.
+        filas (MapaFilas): Filas con infracciones, o None si no aplica.
+    """
+    __slots__ = ("validacion", "columna", "parametro", "cumple", "infracciones", "muestra", "filas")
+
+    def __init__(self, validacion, columna, parametro, cumple, infracciones=0, muestra=None, filas=None):
+        self.validacion = validacion
+        self.columna = columna
+        self.parametro = parametro
+        self.cumple = cumple
+        self.infracciones = infracciones
+        self.muestra = muestra or []
+        self.filas = filas
+
+    def a_dict(self):
+        """
+        Representación para el informe legible por máquinas. Las filas se numeran desde 1,
+        igual que en el informe.
+        """
+        return {
+            "validacion": self.validacion,
+            "columna": self.columna,
+            "parametro": self.parametro,
+            "cumple": bool(self.cumple),
+            "infracciones": self.infracciones,
+            "muestra": [{"fila": int(fila) + 1, "valor": valor} for fila, valor in self.muestra],
+        }
+
+    def __repr__(self):
+        return (f"ResultadoValidacion({self.validacion}, columna={self.columna!r}, cumple={self.cumple}, "
+                f"infracciones={self.infracciones})")
@@ -0,0 +1,84 @@
+"""
+Funciones vectorizadas para RUTs: cálculo del dígito verificador (módulo 11) y
+normalización de RUTs con formato ("12.345.678-9", "12345678-K") sobre columnas completas.
+
+Los dígitos verificadores se representan como códigos numéricos: 0-9 y 10 para 'K'.
+Los valores que no se pueden interpretar quedan como NaN.
+"""
+import numpy as np
+import pandas as pd
+
+
+DV_K = 10
+
+# Factores del módulo 11 desde el dígito menos significativo; alcanzan para RUTs de hasta 9 dígitos
+FACTORES = (2, 3, 4, 5, 6, 7, 2, 3, 4)
+
+
+def calcular_dv(ruts):
+    """
+    Calcula el dígito verificador de un arreglo de RUTs enteros con aritmética de arreglos.
+    Returns:
+        np.ndarray: Códigos de DV (0-9, 10 para 'K').
+    """
+    cuerpo = np.array(ruts, dtype=np.int64)
+    suma = np.zeros(len(cuerpo), dtype=np.int64)
+    for factor in FACTORES:
+        suma += (cuerpo % 10) * factor
+        cuerpo //= 10
+    dv = 11 - suma % 11
+    dv[dv == 11] = 0
+    return dv
+
+
+def formatear_dv(codigo):
+    return "K" if codigo == DV_K else str(int(codigo))
+
+
+def normalizar_dv(serie):
+    """
+    Convierte una columna de DV (texto '0'-'9' / 'K' o números) a códigos numéricos.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se normaliza solo el diccionario de valores; el código -1 (nulo) toma el NaN agregado al final
+        por_categoria = normalizar_dv(pd.Series(serie.cat.categories))
+        return np.append(por_categoria, np.nan)[serie.cat.codes.to_numpy()]
+
+    if pd.api.types.is_numeric_dtype(serie):
+        valores = serie.to_numpy(dtype=float)
+        return np.where((valores >= 0) & (valores <= 9) & (np.mod(valores, 1) == 0), valores, np.nan)
+
+    if serie.dtype == object:
+        # El DV tiene pocos valores distintos: se normalizan solo esos y no cada fila
+        por_fila, unicos = pd.factorize(serie)
+        if len(unicos) < len(serie):
+            return np.append(normalizar_dv(pd.Series(unicos, dtype=object)), np.nan)[por_fila]
+
+    texto = serie.astype("string").str.strip().str.upper()
+    codigos = pd.to_numeric(texto.where(texto != "K", "10"), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    valido = texto.str.fullmatch(r"[0-9K]").fillna(False).to_numpy(dtype=bool)
+    codigos[~valido] = np.nan
+    return codigos
+
+
+def cuerpo_rut(serie):
+    """
+    Cuerpo numérico de una columna de RUTs sin DV. Acepta enteros o texto con puntos
+    ("12.345.678"); si el texto incluye guion, se descarta lo que sigue.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.to_numpy(dtype=float)
+
+    texto = serie.astype("string").str.split("-").str[0].str.replace(r"\D", "", regex=True)
+    return pd.to_numeric(texto, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def separar_rut(serie):
+    """
+    Separa una columna de RUTs con DV incluido ("12.345.678-9", "12345678K") en cuerpo y DV.
+    Returns:
+        tuple: (cuerpos, códigos de DV) como arreglos float con NaN donde no se pudo interpretar.
+    """
+    texto = serie.astype("string").str.upper().str.replace(r"[^0-9K]", "", regex=True)
+    cuerpos = pd.to_numeric(texto.str[:-1], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return cuerpos, normalizar_dv(texto.str[-1])
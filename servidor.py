@@ -0,0 +1,318 @@
+"""
+Servicio local de validaciones.
+
+Mantiene un pool de procesos ya iniciados (pandas, reportlab y el validador importados, el índice
+de RUTs de prueba y la tabla de comunas cargados) y recibe trabajos de validación por HTTP, de modo
+que los pipelines programados no pagan el arranque en cada archivo. Los trabajos esperan en una
+cola acotada; cuando está llena el servicio responde 503 y el cliente debe reintentar más tarde.
+
+API (JSON):
+    POST /trabajos            {"archivo": ..., "validaciones": ..., "gabinete": "", "salida": ...,
+                               "formatos": ["pdf", "json"], "bloques": null} -> 202 {"id": ..., "estado": "en cola"}
+    GET  /trabajos            Estado de todos los trabajos recordados.
+    GET  /trabajos/<id>       Estado de un trabajo y, al terminar, su resumen (filas, informe, error).
+    GET  /trabajos/<id>/resultados   Resultados de las validaciones (informe JSON) de un trabajo terminado.
+    GET  /estado              Procesos, trabajos en cola y en proceso.
+
+El servicio escucha solo en localhost por defecto: no tiene autenticación.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+
+from indice_comunas import COMUNAS_PATH, IndiceComunas
+from indice_ruts import IndiceRuts
+import lote
+
+
+# Trabajos terminados que se recuerdan; al superarlo se olvidan los más antiguos
+MAX_TRABAJOS = 1_000
+
+EN_COLA, EN_PROCESO, OK, ERROR = "en cola", "en proceso", "ok", "error"
+
+
+def _calentar_worker(ruts_prueba, comunas):
+    # Ctrl+C llega a todo el grupo de procesos; solo el servicio lo atiende y espera a los workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    lote._inicializar_worker(ruts_prueba, comunas)
+    # Importar el validador (y con él pandas, pyarrow y reportlab) antes del primer trabajo
+    import validaciones  # noqa: F401
+
+
+class Trabajo:
+    """
+    Un archivo a validar y su estado.
+    """
+    __slots__ = ("id", "archivo", "validaciones", "gabinete", "salida", "formatos", "bloques", "estado",
+                 "creado", "inicio", "fin", "resumen")
+
+    def __init__(self, archivo, validaciones, gabinete="", salida=None, formatos=None, bloques=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.archivo = os.path.abspath(archivo)
+        self.validaciones = os.path.abspath(validaciones)
+        self.gabinete = gabinete
+        self.salida = os.path.abspath(salida) if salida else os.path.dirname(self.archivo)
+        self.formatos = formatos or ["pdf", "json"]
+        self.bloques = bloques
+        self.estado = EN_COLA
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self.resumen = None
+
+    def a_dict(self):
+        return {
+            "id": self.id,
+            "archivo": self.archivo,
+            "validaciones": self.validaciones,
+            "estado": self.estado,
+            "espera_s": round((self.inicio or time.time()) - self.creado, 3),
+            "duracion_s": round((self.fin or time.time()) - self.inicio, 3) if self.inicio else None,
+            "resumen": self.resumen,
+        }
+
+
+class ServicioValidaciones:
+    """
+    Cola acotada de trabajos y pool de procesos que los valida.
+    Params:
+        ruts_prueba_path (str): Archivo de RUTs de prueba, se carga una sola vez para todos los trabajos.
+        comunas_path (str): Tabla de comunas; si no existe, validate_comuna queda en rojo en los trabajos que la usan.
+        procesos (int): Procesos del pool (por defecto, uno por núcleo).
+        max_cola (int): Trabajos que pueden esperar en la cola, además de los que están en proceso.
+    """
+
+    def __init__(self, ruts_prueba_path, comunas_path=COMUNAS_PATH, procesos=None, max_cola=100, use_cache=True):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.use_cache = use_cache
+        ruts_prueba = IndiceRuts.desde_csv(ruts_prueba_path, use_cache=use_cache)
+        comunas = IndiceComunas.desde_csv(comunas_path, use_cache=use_cache) if comunas_path and os.path.isfile(comunas_path) else None
+        self._initargs = (ruts_prueba, comunas)
+        self.lock_pool = threading.Lock()
+        self.executor = self._crear_pool()
+        # Iniciar los procesos ahora para que el primer trabajo no pague el arranque
+        for futuro in [self.executor.submit(os.getpid) for _ in range(self.procesos)]:
+            futuro.result()
+
+        self.cola = queue.Queue(maxsize=max_cola)
+        self.trabajos = OrderedDict()
+        self.lock = threading.Lock()
+        # Un trabajo pasa al pool solo cuando hay un proceso libre, así su estado "en proceso" es real
+        self.libres = threading.Semaphore(self.procesos)
+        self.despachador = threading.Thread(target=self._despachar, daemon=True)
+        self.despachador.start()
+
+    def enviar(self, trabajo):
+        """
+        Agrega un trabajo a la cola. Lanza queue.Full si la cola está llena.
+        """
+        with self.lock:
+            self.cola.put_nowait(trabajo)
+            self.trabajos[trabajo.id] = trabajo
+            self._olvidar_antiguos()
+        return trabajo
+
+    def _olvidar_antiguos(self):
+        terminados = [id_trabajo for id_trabajo, trabajo in self.trabajos.items() if trabajo.estado in (OK, ERROR)]
+        for id_trabajo in terminados[:max(0, len(self.trabajos) - MAX_TRABAJOS)]:
+            del self.trabajos[id_trabajo]
+
+    def _crear_pool(self):
+        return ProcessPoolExecutor(max_workers=self.procesos, initializer=_calentar_worker, initargs=self._initargs)
+
+    def _reemplazar_pool(self, roto):
+        """
+        Un proceso del pool murió (por ejemplo, sin memoria) y el pool quedó inutilizable: se crea
+        uno nuevo. Todos los trabajos del pool roto fallan a la vez; solo el primero lo reemplaza.
+        """
+        with self.lock_pool:
+            if self.executor is not roto:
+                return
+            print("⚠️ Un proceso del pool terminó inesperadamente; se reinicia el pool")
+            self.executor = self._crear_pool()
+        roto.shutdown(wait=False, cancel_futures=True)
+
+    def _despachar(self):
+        while True:
+            # Se espera un proceso libre antes de sacar el trabajo, así la cola nunca guarda más de max_cola
+            self.libres.acquire()
+            trabajo = self.cola.get()
+            if trabajo is None:
+                return
+            trabajo.estado = EN_PROCESO
+            trabajo.inicio = time.time()
+            executor = self.executor
+            try:
+                futuro = executor.submit(lote._validar_archivo, trabajo.archivo, trabajo.validaciones, trabajo.gabinete,
+                                         trabajo.salida, trabajo.bloques, self.use_cache, trabajo.formatos)
+            except BrokenProcessPool as e:
+                self._reemplazar_pool(executor)
+                self._finalizar(trabajo, self._resumen_error(trabajo, e))
+                continue
+            except Exception as e:
+                # El despachador no debe morir por un trabajo: se marca con error y se sigue con la cola
+                self._finalizar(trabajo, self._resumen_error(trabajo, e))
+                continue
+            futuro.add_done_callback(lambda futuro, trabajo=trabajo, executor=executor:
+                                     self._terminar(trabajo, futuro, executor))
+
+    @staticmethod
+    def _resumen_error(trabajo, error):
+        return {"archivo": os.path.basename(trabajo.archivo), "estado": ERROR, "error": str(error) or type(error).__name__}
+
+    def _terminar(self, trabajo, futuro, executor):
+        try:
+            resumen = futuro.result()
+        except BrokenProcessPool as e:
+            self._reemplazar_pool(executor)
+            resumen = self._resumen_error(trabajo, e)
+        except Exception as e:
+            resumen = self._resumen_error(trabajo, e)
+        self._finalizar(trabajo, resumen)
+
+    def _finalizar(self, trabajo, resumen):
+        trabajo.resumen = resumen
+        trabajo.estado = OK if resumen.get("estado") == "ok" else ERROR
+        trabajo.fin = time.time()
+        self.libres.release()
+
+    def estado(self):
+        with self.lock:
+            estados = [trabajo.estado for trabajo in self.trabajos.values()]
+        return {"procesos": self.procesos, "en_cola": estados.count(EN_COLA), "en_proceso": estados.count(EN_PROCESO),
+                "terminados": estados.count(OK) + estados.count(ERROR), "max_cola": self.cola.maxsize}
+
+    def cerrar(self):
+        """
+        Espera los trabajos en proceso; los que siguen en la cola se descartan.
+        """
+        while True:
+            try:
+                self.cola.get_nowait()
+            except queue.Empty:
+                break
+        self.cola.put(None)
+        self.libres.release()
+        with self.lock_pool:
+            executor = self.executor
+        executor.shutdown(wait=True)
+
+
+class ManejadorHTTP(BaseHTTPRequestHandler):
+    servicio = None
+
+    def _responder(self, codigo, cuerpo):
+        datos = json.dumps(cuerpo, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato, *args):
+        # Sin el registro de cada petición por consola
+        pass
+
+    def do_GET(self):
+        partes = [parte for parte in self.path.split("?", 1)[0].split("/") if parte]
+        if partes == ["estado"]:
+            return self._responder(200, self.servicio.estado())
+        if partes == ["trabajos"]:
+            with self.servicio.lock:
+                trabajos = [trabajo.a_dict() for trabajo in self.servicio.trabajos.values()]
+            return self._responder(200, trabajos)
+        if len(partes) in (2, 3) and partes[0] == "trabajos":
+            trabajo = self.servicio.trabajos.get(partes[1])
+            if trabajo is None:
+                return self._responder(404, {"error": f"No existe el trabajo {partes[1]}"})
+            if len(partes) == 2:
+                return self._responder(200, trabajo.a_dict())
+            if partes[2] == "resultados":
+                return self._resultados(trabajo)
+        self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+
+    def _resultados(self, trabajo):
+        if trabajo.estado in (EN_COLA, EN_PROCESO):
+            return self._responder(409, {"error": "El trabajo aún no termina", "estado": trabajo.estado})
+        informe = (trabajo.resumen or {}).get("informe")
+        json_path = f"{os.path.splitext(informe)[0]}.json" if informe else None
+        if not json_path or not os.path.isfile(json_path):
+            return self._responder(404, {"error": "El trabajo no generó el informe JSON (agregue 'json' a formatos)"})
+        with open(json_path, encoding="utf-8") as f:
+            return self._responder(200, json.load(f))
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/trabajos":
+            return self._responder(404, {"error": f"Ruta desconocida: {self.path}"})
+        try:
+            largo = int(self.headers.get("Content-Length", 0))
+            cuerpo = json.loads(self.rfile.read(largo) or b"{}")
+            faltantes = [campo for campo in ("archivo", "validaciones") if not cuerpo.get(campo)]
+            if faltantes:
+                raise ValueError(f"Faltan los campos {', '.join(faltantes)}")
+            for campo in ("archivo", "validaciones"):
+                if not os.path.isfile(cuerpo[campo]):
+                    raise ValueError(f"No existe el archivo {cuerpo[campo]}")
+            trabajo = Trabajo(cuerpo["archivo"], cuerpo["validaciones"], gabinete=str(cuerpo.get("gabinete", "")),
+                              salida=cuerpo.get("salida"), formatos=cuerpo.get("formatos"),
+                              bloques=int(cuerpo["bloques"]) if cuerpo.get("bloques") else None)
+        except (ValueError, TypeError) as e:
+            return self._responder(400, {"error": str(e)})
+
+        try:
+            self.servicio.enviar(trabajo)
+        except queue.Full:
+            return self._responder(503, {"error": "La cola de trabajos está llena, reintente más tarde"})
+        self._responder(202, {"id": trabajo.id, "estado": trabajo.estado})
+
+
+def iniciar(ruts_prueba_path, host="127.0.0.1", puerto=8765, **opciones):
+    """
+    Inicia el servicio y atiende peticiones hasta Ctrl+C.
+    """
+    servicio = ServicioValidaciones(ruts_prueba_path, **opciones)
+    manejador = type("Manejador", (ManejadorHTTP,), {"servicio": servicio})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    print(f"✅ Servicio de validaciones en http://{host}:{puerto} ({servicio.procesos} procesos, cola de {servicio.cola.maxsize})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Deteniendo el servicio...")
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    # Opciones: --host=H, --puerto=N, --procesos=N, --cola=N, --comunas=ARCHIVO, --sin-cache
+    opciones = {"host": "127.0.0.1", "puerto": "8765", "procesos": None, "cola": "100", "comunas": COMUNAS_PATH}
+    use_cache = True
+    argumentos = []
+    for arg in sys.argv[1:]:
+        if arg == "--sin-cache":
+            use_cache = False
+        elif arg.startswith("--") and "=" in arg and arg[2:].split("=", 1)[0] in opciones:
+            nombre, valor = arg[2:].split("=", 1)
+            opciones[nombre] = valor
+        else:
+            argumentos.append(arg)
+
+    if len(argumentos) != 1:
+        print("Uso del programa:")
+        print("  python servidor.py <archivo_ruts_prueba> [--host=127.0.0.1] [--puerto=8765] [--procesos=N] [--cola=N] "
+              "[--comunas=ARCHIVO] [--sin-cache]")
+        print("  Ejemplo:  python servidor.py RUTDEPRUEBAS.csv --procesos=4")
+        sys.exit(1)
+
+    iniciar(argumentos[0], host=opciones["host"], puerto=int(opciones["puerto"]),
+            comunas_path=opciones["comunas"], procesos=int(opciones["procesos"]) if opciones["procesos"] else None,
+            max_cola=int(opciones["cola"]), use_cache=use_cache)
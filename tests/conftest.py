@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos del validador están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entregas import RUTS_PRUEBA, escribir_comunas, escribir_entrega, escribir_validaciones  # noqa: E402
+from indice_comunas import IndiceComunas  # noqa: E402
+from indice_ruts import IndiceRuts  # noqa: E402
+from validaciones import Validador  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def ruts_prueba():
+    # Ya abierto, así las pruebas no escriben el índice en la caché del usuario
+    return IndiceRuts.desde_csv(RUTS_PRUEBA, use_cache=False)
+
+
+@pytest.fixture
+def entrega(tmp_path):
+    return escribir_entrega(str(tmp_path / "ANEXO_202401.csv"))
+
+
+@pytest.fixture
+def comunas(tmp_path):
+    return IndiceComunas.desde_csv(escribir_comunas(str(tmp_path / "comunas.csv")), use_cache=False)
+
+
+@pytest.fixture
+def validar(tmp_path, entrega, ruts_prueba):
+    def _validar(reglas, archivo=None, **opciones):
+        """
+        Ejecuta las reglas sobre la entrega y retorna el validador.
+        """
+        validaciones = escribir_validaciones(str(tmp_path / "validaciones.csv"), reglas)
+        opciones.setdefault("use_cache", False)
+        opciones.setdefault("formatos", ["json"])
+        validador = Validador(archivo or entrega, validaciones, ruts_prueba, gabinete="",
+                              output_folder=str(tmp_path / "salida"), **opciones)
+        validador.creado = validador.run_validations()
+        return validador
+    return _validar
@@ -0,0 +1,79 @@
+"""
+Entregas, archivos de validaciones y tablas de comunas pequeñas que generan las pruebas.
+"""
+import os
+
+import numpy as np
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTS_PRUEBA = os.path.join(RAIZ, "RUTDEPRUEBAS.csv")
+
+COLUMNAS = ["RUT", "DV", "sexo", "region", "monto", "fecha_ingreso", "glosa"]
+
+GLOSAS = ["Atención primaria", "Pensión básica", "Devolución #12", "Asignación (especial)", "mal;o", "a < b & c"]
+
+
+def escribir_entrega(path, filas=3_000, semilla=7, vacia=500):
+    """
+    Entrega parecida a las reales: ';', latin1 y BOM en el encabezado, con RUT de prueba y repetidos,
+    DV incorrectos, categorías fuera de lista, montos nulos y negativos, filas copiadas y una vacía
+    en la línea vacia (None para no dejarla: con ella el RUT se lee como decimal).
+    """
+    azar = np.random.default_rng(semilla)
+    ruts = azar.integers(1_000_000, 25_000_000, filas)
+    ruts[::97] = 1
+    ruts[5::211] = ruts[4::211][:len(ruts[5::211])]
+    dvs = azar.integers(0, 10, filas)
+    sexos = azar.choice(["M", "F", "X"], filas, p=[0.49, 0.49, 0.02])
+    regiones = azar.integers(1, 18, filas)
+    montos = np.round(azar.normal(400, 300, filas), 1)
+    fechas = np.datetime64("2023-01-01") + azar.integers(0, 730, filas)
+    glosas = azar.choice(GLOSAS, filas)
+    lineas = []
+    for i in range(filas):
+        monto = "" if i % 53 == 0 else str(montos[i])
+        fecha = "" if i % 71 == 0 else str(fechas[i])
+        glosa = f'"{glosas[i]}"' if ";" in glosas[i] else glosas[i]
+        lineas.append(f"{ruts[i]};{dvs[i]};{sexos[i]};{regiones[i]};{monto};{fecha};{glosa}")
+    lineas[10] = lineas[9]
+    if vacia is not None:
+        lineas[vacia] = ";" * (len(COLUMNAS) - 1)
+    with open(path, "wb") as f:
+        # BOM de UTF-8 como lo dejan algunas planillas
+        f.write(b"\xef\xbb\xbf")
+        f.write((";".join(COLUMNAS) + "\n" + "\n".join(lineas) + "\n").encode("latin1"))
+    return path
+
+
+def escribir_validaciones(path, reglas):
+    with open(path, "w", encoding="latin1") as f:
+        f.write("campo;validacion\n")
+        f.writelines(f"{campo};{validacion}\n" for campo, validacion in reglas)
+    return path
+
+
+def escribir_comunas(path):
+    with open(path, "w", encoding="latin1") as f:
+        f.write("codigo;nombre\n")
+        f.writelines(f"{codigo};Comuna {codigo}\n" for codigo in range(1, 16))
+    return path
+
+
+def resultados(validador):
+    return [resultado.a_dict() for resultado in validador.resultados]
+
+
+def frases(validador):
+    """
+    Textos del informe sin los que dependen de la ejecución (fecha y tiempos) ni la sección de rendimiento.
+    """
+    textos = []
+    for elemento in validador.informe.elementos:
+        if elemento["tipo"] == "encabezado" and elemento["texto"] == "Rendimiento de las validaciones":
+            break
+        if elemento["tipo"] in ("titulo", "encabezado", "frase") and not elemento["texto"].startswith("Fecha del informe"):
+            textos.append(elemento["texto"])
+        elif elemento["tipo"] == "tabla":
+            textos.append(elemento["filas"])
+    return textos
@@ -0,0 +1,44 @@
+"""
+Acumuladores que se combinan entre bloques.
+"""
+import numpy as np
+import pandas as pd
+
+import acumuladores
+from acumuladores import ConjuntoDistintos, PerfilColumna
+
+
+def test_distintos_por_bloques():
+    azar = np.random.default_rng(1)
+    distintos = ConjuntoDistintos()
+    enteros = azar.integers(0, 5_000_000, 100_000)
+    for bloque in np.array_split(enteros, 7):
+        distintos.update(bloque)
+    unicos = np.unique(enteros)
+    assert distintos.contar() == len(unicos)
+    assert distintos.contar(1_000_000, 2_000_000) == int(((unicos >= 1_000_000) & (unicos < 2_000_000)).sum())
+
+
+def test_perfil_sin_frecuencias(monkeypatch):
+    azar = np.random.default_rng(1)
+    monkeypatch.setattr(acumuladores, "MAX_FRECUENCIAS", 10)
+    serie = pd.Series(np.where(azar.random(10_000) < 0.1, np.nan, azar.normal(size=10_000)))
+    perfil = PerfilColumna("x")
+    for inicio in range(0, len(serie), 3_000):
+        perfil.update_serie(serie.iloc[inicio:inicio + 3_000])
+    assert perfil.frecuencias is None
+    assert perfil.nulos == int(serie.isna().sum())
+    assert len(perfil.distintos) == serie.nunique()
+    assert perfil.minimo == serie.min() and perfil.maximo == serie.max()
+
+
+def test_perfil_con_bloques_de_tipos_distintos():
+    # Un bloque se lee como entero y otro como texto: da lo mismo que el archivo completo, sin extremos
+    por_bloques = PerfilColumna("x")
+    por_bloques.update_serie(pd.Series([3, 1, 2]))
+    por_bloques.update_serie(pd.Series(["X1", "5"], dtype=object))
+    por_bloques.update_serie(pd.Series([7, 0]))
+    completo = PerfilColumna("x")
+    completo.update_serie(pd.Series([3, 1, 2, "X1", "5", 7, 0], dtype=object))
+    assert (por_bloques.minimo, por_bloques.maximo) == (completo.minimo, completo.maximo) == (None, None)
+    assert por_bloques.nulos == completo.nulos == 0
@@ -0,0 +1,106 @@
+"""
+Validación por bloques: los modos completo, --bloques y --motor=arrow dan los mismos resultados.
+"""
+import json
+import os
+
+import pytest
+
+import file_selector
+from entregas import escribir_entrega, frases, resultados
+
+
+# Reglas de un gabinete que usan todas las validaciones que se pueden calcular sobre la entrega;
+# {anterior} es la entrega del período anterior
+REGLAS_GABINETE = [
+    ("", "validate_filename(ANEXO_AAAAMM)"),
+    ("", "validate_sin_filas_repetidas()"),
+    ("", "validate_sin_filas_vacias()"),
+    ("", "validate_sin_filas_irregulares()"),
+    ("", "validate_column_names(RUT,DV,sexo,region,monto,fecha_ingreso,glosa)"),
+    ("RUT", "validate_sin_ruts_falsos()"),
+    ("RUT", "describe_rut()"),
+    ("RUT", "validate_digito_verificador(DV)"),
+    ("RUT", "validate_sin_valores_repetidos()"),
+    ("monto", "validate_sin_valores_nulos()"),
+    ("monto", "validate_mayor_igual_a(0)"),
+    ("monto", "validate_menor_igual_a(900)"),
+    ("monto", "validate_column_type(decimal)"),
+    ("sexo", "validate_pertenece_a_categorias(M,F)"),
+    ("region", "validate_pertenece_a_categorias(1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16)"),
+    ("fecha_ingreso", "validate_formato_fecha(AAAA-MM-DD)"),
+    ("fecha_ingreso", "validate_fecha_desde(2023-06-01)"),
+    ("fecha_ingreso", "validate_fecha_hasta(2024-06-30)"),
+    ("glosa", "validate_sin_caracteres_especiales()"),
+    ("region", "validate_comuna()"),
+    ("RUT", "comparar_filas_con_otro_archivo({anterior})"),
+]
+
+# Modos de ejecución que deben dar los mismos resultados: archivo completo, --bloques y --motor=arrow
+MODOS = {
+    "completo": {},
+    "bloques": {"chunksize": 700},
+    "arrow": {"motor": "arrow"},
+}
+
+
+@pytest.fixture
+def entrega_entera(tmp_path):
+    # Sin la fila vacía el RUT queda entero, como lo pide validate_sin_ruts_falsos
+    carpeta = tmp_path / "entera"
+    carpeta.mkdir()
+    return escribir_entrega(str(carpeta / "ANEXO_202401.csv"), vacia=None)
+
+
+@pytest.fixture
+def reglas_gabinete(tmp_path):
+    anterior = escribir_entrega(str(tmp_path / "ANEXO_202312.csv"), filas=2_800, semilla=3)
+    return [(campo, validacion.format(anterior=anterior)) for campo, validacion in REGLAS_GABINETE]
+
+
+@pytest.mark.parametrize("modo", ["bloques", "arrow"])
+def test_reglas_del_gabinete_iguales_en_todos_los_modos(validar, entrega_entera, reglas_gabinete, comunas, modo):
+    if modo == "arrow":
+        pytest.importorskip("pyarrow")
+    completo = validar(reglas_gabinete, entrega_entera, comunas=comunas, **MODOS["completo"])
+    otro = validar(reglas_gabinete, entrega_entera, comunas=comunas, **MODOS[modo])
+
+    # Cada regla con resultado estructurado, comparada por separado para que el error diga cuál difiere
+    assert len(resultados(completo)) == len(resultados(otro))
+    for esperado, obtenido in zip(resultados(completo), resultados(otro)):
+        assert obtenido == esperado, f"{esperado['validacion']}({esperado['parametro']}) en {esperado['columna']}"
+    assert frases(otro) == frases(completo)
+    assert otro.num_filas == completo.num_filas == 3_000
+
+
+def test_bloques_leen_el_archivo_una_vez(validar, entrega_entera, reglas_gabinete, comunas, monkeypatch):
+    pasadas = []
+    iter_chunks = file_selector.FileSelector.iter_chunks
+
+    def contar(self, file_path, *args, **kwargs):
+        pasadas.append(os.path.basename(file_path))
+        return iter_chunks(self, file_path, *args, **kwargs)
+
+    monkeypatch.setattr(file_selector.FileSelector, "iter_chunks", contar)
+    validar(reglas_gabinete, entrega_entera, comunas=comunas, chunksize=700)
+    # La entrega se recorre una sola vez; el archivo anterior se lee aparte para compararlo
+    assert pasadas.count("ANEXO_202401.csv") == 1
+
+
+def test_clave_de_parametro_vacio_y_omitido(validar):
+    validador = validar([("monto", "validate_sin_valores_nulos()")])
+    assert validador._clave("validate_sin_valores_repetidos", "RUT", "") == validador._clave("validate_sin_valores_repetidos", "RUT", None)
+    assert validador._clave("validate_filename", float("nan"), "") == ("validate_filename", None, None)
+
+
+def test_json_con_un_resultado_por_regla(validar, entrega_entera, reglas_gabinete, comunas):
+    # Una regla que no se puede evaluar (no hay instantánea del período anterior) también deja su resultado
+    reglas = reglas_gabinete + [("", "comparar_con_instantanea()")]
+    validador = validar(reglas, entrega_entera, comunas=comunas)
+    with open(validador.informe.ruta("json"), encoding="utf-8") as f:
+        salida = json.load(f)
+
+    assert len(salida["resultados"]) == len(validador.plan) == len(reglas)
+    assert [resultado["validacion"] for resultado in salida["resultados"]] == [regla.funcion for regla in validador.plan]
+    assert salida["resultados"][-1] == {"validacion": "comparar_con_instantanea", "columna": None,
+                                        "parametro": None, "cumple": False, "infracciones": None, "muestra": []}
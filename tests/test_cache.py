@@ -0,0 +1,73 @@
+"""
+Caché columnar de los archivos leídos.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cache_archivos
+import file_selector
+from entregas import frases, resultados
+
+
+@pytest.fixture
+def lecturas(tmp_path, monkeypatch):
+    """
+    Columnas de cada lectura del CSV, con la caché en una carpeta de la prueba.
+    """
+    carpeta = str(tmp_path / "cache")
+    monkeypatch.setattr(file_selector, "CacheArchivos", lambda: cache_archivos.CacheArchivos(carpeta))
+    lecturas = []
+    parse_file = file_selector.FileSelector._parse_file
+
+    def contar(self, file_path, usecols=None, dtype=None):
+        lecturas.append(usecols)
+        return parse_file(self, file_path, usecols, dtype)
+
+    monkeypatch.setattr(file_selector.FileSelector, "_parse_file", contar)
+    return lecturas
+
+
+def test_cache_de_columnas(validar, lecturas):
+    pytest.importorskip("pyarrow")
+    reglas = [("monto", "validate_mayor_igual_a(0)"), ("sexo", "validate_pertenece_a_categorias(M,F)")]
+
+    primera = validar(reglas, use_cache=True)
+    assert len(lecturas) == 1
+    segunda = validar(reglas, use_cache=True)
+    assert len(lecturas) == 1
+    assert resultados(segunda) == resultados(primera)
+    assert frases(segunda) == frases(primera)
+
+    # Una columna nueva se parsea sola y se agrega a la caché
+    validar(reglas + [("RUT", "validate_sin_valores_repetidos()")], use_cache=True)
+    assert lecturas[1] == ["RUT"]
+
+
+def test_cache_separa_motores(validar, lecturas):
+    pytest.importorskip("pyarrow")
+    reglas = [("monto", "validate_mayor_igual_a(0)")]
+
+    validar(reglas, use_cache=True)
+    validar(reglas, use_cache=True, motor="arrow")
+    # El lector de Arrow puede inferir otros tipos: no reutiliza las columnas del de pandas
+    assert len(lecturas) == 2
+    validar(reglas, use_cache=True, motor="arrow")
+    assert len(lecturas) == 2
+
+
+def test_claves_simultaneas_no_se_pierden(tmp_path, monkeypatch):
+    cache = cache_archivos.CacheArchivos(str(tmp_path / "cache"))
+    archivos = []
+    for i in range(16):
+        path = tmp_path / f"archivo_{i}.csv"
+        path.write_text(f"a;b\n{i};{i}\n")
+        archivos.append(str(path))
+    with ThreadPoolExecutor(8) as ejecutor:
+        claves = list(ejecutor.map(cache.clave, archivos))
+
+    # Cada ruta quedó registrada: la segunda vez ningún hash se recalcula
+    monkeypatch.setattr(cache, "_hash_contenido", lambda path: pytest.fail(f"se recalculó {path}"))
+    assert [cache.clave(path) for path in archivos] == claves
+    assert len(os.listdir(cache.indice_dir)) == len(archivos)
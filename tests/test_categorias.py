@@ -0,0 +1,23 @@
+"""
+Columnas de texto codificadas como categorías.
+"""
+import pandas as pd
+
+import file_selector
+from entregas import resultados
+
+
+def test_tipo_de_columna_igual_con_y_sin_categorias(validar, monkeypatch):
+    reglas = [(columna, f"validate_column_type({tipo})")
+              for columna in ("RUT", "sexo", "monto", "glosa") for tipo in ("texto", "entero", "decimal")]
+    codificado = validar(reglas)
+    assert isinstance(codificado.df["sexo"].dtype, pd.CategoricalDtype)
+
+    monkeypatch.setattr(file_selector, "MAX_CATEGORIAS", 0)
+    sin_codificar = validar(reglas)
+    assert not isinstance(sin_codificar.df["sexo"].dtype, pd.CategoricalDtype)
+
+    assert resultados(codificado) == resultados(sin_codificar)
+    cumple = {(r["columna"], r["parametro"]) for r in resultados(codificado) if r["cumple"]}
+    # La fila vacía deja nulos en RUT, que se lee como decimal
+    assert cumple == {("RUT", "decimal"), ("sexo", "texto"), ("monto", "decimal"), ("glosa", "texto")}
@@ -0,0 +1,42 @@
+"""
+Comparación fila a fila con el archivo del período anterior.
+"""
+import pytest
+
+from entregas import frases
+from file_selector import FileSelector
+
+
+def _escribir(path, filas):
+    with open(path, "w", encoding="latin1") as f:
+        f.write("id;valor;otra\n")
+        f.writelines(f"{clave};{valor};{otra}\n" for clave, valor, otra in filas)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [None, 700])
+def test_claves_y_valores_con_tipos_distintos_por_bloque(validar, tmp_path, chunksize):
+    filas = [(i, i * 1.5, i) for i in range(1, 2_001)]
+    actual = list(filas)
+    # Un bloque del archivo actual tiene una clave que no es número: pandas lo lee como object
+    actual[1_499] = ("X1", 1_500 * 1.5, 1_500)
+    anterior = list(filas)
+    # Y un bloque del anterior tiene un valor de texto en una columna numérica
+    anterior[99] = (100, 100 * 1.5, "abc")
+    archivo = _escribir(tmp_path / "actual.csv", actual)
+    _escribir(tmp_path / "anterior.csv", anterior)
+
+    validador = validar([("id", "comparar_filas_con_otro_archivo(anterior.csv)")], archivo, chunksize=chunksize)
+    comparacion = validador._acumulado("comparar_filas_con_otro_archivo", "id", "anterior.csv").resultado()[2]
+    assert (comparacion.nuevas, comparacion.eliminadas, comparacion.comunes) == (1, 1, 1_999)
+    assert comparacion.modificadas == 1
+    assert comparacion.cambios_por_columna == {"valor": 0, "otra": 1}
+
+
+def test_sin_archivo_anterior_no_abre_dialogo(validar, monkeypatch):
+    def dialogo(self, title="Select a file"):
+        raise AssertionError("no se debe abrir un diálogo fuera del modo interactivo")
+
+    monkeypatch.setattr(FileSelector, "select_file", dialogo)
+    validador = validar([("RUT", "comparar_filas_con_otro_archivo()")])
+    assert "No se indicó archivo para comparar." in frases(validador)
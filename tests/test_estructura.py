@@ -0,0 +1,30 @@
+"""
+Pre-escaneo de bytes para las validaciones de estructura.
+"""
+import validaciones
+from entregas import COLUMNAS, escribir_entrega, frases
+
+
+def test_pre_escaneo_solo_con_reglas_de_estructura(validar, monkeypatch):
+    escaneos = []
+    escanear = validaciones.escanear_estructura
+    monkeypatch.setattr(validaciones, "escanear_estructura", lambda path: escaneos.append(path) or escanear(path))
+
+    validar([("monto", "validate_sin_valores_nulos()")], chunksize=700)
+    assert escaneos == []
+    validador = validar([("", "validate_sin_filas_vacias()")], chunksize=700)
+    assert len(escaneos) == 1
+    assert validador.estructura.vacias == [500]
+
+
+def test_filas_vacias_se_informan_acotadas(validar, tmp_path):
+    entrega = escribir_entrega(str(tmp_path / "ANEXO_202402.csv"), vacia=None)
+    with open(entrega, "ab") as f:
+        f.write((";" * (len(COLUMNAS) - 1) + "\n").encode("latin1") * 25)
+
+    validador = validar([("", "validate_sin_filas_vacias()")], entrega)
+    resultado, = validador.resultados
+    assert resultado.infracciones == len(resultado.filas) == 25
+    assert len(resultado.muestra) == validaciones.MAX_MUESTRA
+    frase = next(texto for texto in frases(validador) if texto.startswith("Las siguientes filas están vacías"))
+    assert frase == f"Las siguientes filas están vacías: {list(range(3_001, 3_011))}..."
@@ -0,0 +1,36 @@
+"""
+Índices compilados de RUTs de prueba y de comunas.
+"""
+import pickle
+
+import numpy as np
+import pytest
+
+from entregas import RUTS_PRUEBA, escribir_comunas, frases
+from indice_comunas import IndiceComunas
+from indice_ruts import IndiceRuts
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_indices_compilados_en_cache(tmp_path):
+    carpeta = str(tmp_path / "cache")
+    comunas_path = escribir_comunas(str(tmp_path / "comunas.csv"))
+    for _ in range(2):
+        ruts = IndiceRuts.desde_csv(RUTS_PRUEBA, cache_dir=carpeta)
+        comunas = IndiceComunas.desde_csv(comunas_path, cache_dir=carpeta)
+        assert ruts.contiene([1, 2.0, np.nan, 999_999_999]).tolist() == [True, True, False, False]
+        assert comunas.resolver(["5", "05", "comuna 7", "otra", None]).tolist() == [5, 5, 7, -1, -1]
+    # La segunda vez los arreglos se abren desde la caché; al enviarlos a otro proceso se copian
+    assert isinstance(ruts.ruts, np.memmap) and isinstance(comunas.codigos, np.memmap)
+    assert pickle.loads(pickle.dumps(comunas)).nombre(7) == "Comuna 7"
+
+
+def test_sin_tabla_de_comunas_se_informa_en_rojo(validar, tmp_path):
+    faltante = str(tmp_path / "no_existe.csv")
+    validador = validar([("region", "validate_comuna()"), ("monto", "validate_sin_valores_nulos()")], comunas=faltante)
+
+    comuna, nulos = validador.resultados
+    assert not comuna.cumple and comuna.infracciones is None
+    assert nulos.validacion == "validate_sin_valores_nulos"
+    assert any(isinstance(texto, str) and texto.startswith(f"No se encontró la tabla de comunas {faltante}")
+               for texto in frases(validador))
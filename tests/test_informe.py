@@ -0,0 +1,33 @@
+"""
+Formatos del informe.
+"""
+import os
+
+import pytest
+
+import informe_pdf
+import validaciones
+from entregas import frases
+
+
+def test_pdf_escapa_el_texto(validar, tmp_path):
+    pytest.importorskip("reportlab")
+    validador = validar([("glosa", "validate_sin_caracteres_especiales(A-Za-z )")], formatos=["pdf"])
+    assert validador.creado
+    assert any("<" in str(texto) for texto in frases(validador))
+    assert os.path.getsize(validador.informe.ruta("pdf")) > 0
+
+    ruta = str(tmp_path / "escape.pdf")
+    informe_pdf.crear_pdf([{"tipo": "titulo", "texto": "a <b> & c"}, {"tipo": "lista", "items": ["x < y", 3]}],
+                          ruta, "t", "a")
+    assert os.path.getsize(ruta) > 0
+
+
+def test_informe_fallido_se_informa(validar, monkeypatch, capsys):
+    def fallar(self, title, author):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(validaciones.Informe, "_crear_json", fallar)
+    validador = validar([("monto", "validate_sin_valores_nulos()")])
+    assert validador.creado is False
+    assert "Informe generado con éxito." not in capsys.readouterr().out
@@ -0,0 +1,44 @@
+"""
+Métricas de tiempo y memoria de cada validación.
+"""
+import time
+
+import numpy as np
+
+from metricas import INTERVALO_MUESTREO, MedicionMemoria
+
+
+def test_memoria_por_paso():
+    with MedicionMemoria(trazar=True) as medicion:
+        arreglo = np.ones(50 * 2 ** 20 // 8)
+        # En Linux el RSS se muestrea: el pico debe durar más que un intervalo de muestreo
+        time.sleep(10 * INTERVALO_MUESTREO)
+        del arreglo
+    assert medicion.mb is not None and medicion.mb > 30
+
+    # Un paso que usa poca memoria no hereda el máximo del anterior
+    with MedicionMemoria(trazar=True) as medicion:
+        pass
+    assert medicion.mb < 30
+
+
+def test_medicion_no_escribe_en_proc(monkeypatch):
+    # Medir la memoria no debe cambiar contadores del proceso (como clear_refs), solo leerlos
+    abrir = open
+    escritos = []
+
+    def registrar(path, mode="r", *args, **kwargs):
+        if any(letra in mode for letra in "wa+"):
+            escritos.append(path)
+        return abrir(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", registrar)
+    with MedicionMemoria() as medicion:
+        np.ones(2 ** 20)
+    assert escritos == [] and medicion.mb is not None
+
+
+def test_metricas_por_validacion_y_descripcion(validar):
+    validador = validar([("monto", "validate_sin_valores_nulos()"), ("RUT", "validate_sin_valores_repetidos()")])
+    assert validador.segundos_descripcion > 0
+    assert all(metrica.memoria_mb is not None for metrica in validador.metricas)
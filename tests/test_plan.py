@@ -0,0 +1,23 @@
+"""
+Compilación del archivo de validaciones en un plan.
+"""
+import pytest
+
+from plan import PlanInvalido
+
+
+def test_parametros_invalidos_se_informan_al_compilar(validar):
+    reglas = [
+        ("monto", "validate_mayor_igual_a(abc)"),
+        ("monto", "validate_column_type(textos)"),
+        ("fecha_ingreso", "validate_fecha_hasta(2024-13-01)"),
+        ("fecha_ingreso", "validate_fecha_desde(31/12/2023)"),
+        ("fecha_ingreso", "validate_formato_fecha(DD/MM/AAAA)"),
+        ("glosa", "validate_sin_caracteres_especiales(z-a)"),
+        ("sexo", "validate_pertenece_a_categorias(M,F)"),
+    ]
+    with pytest.raises(PlanInvalido) as error:
+        validar(reglas)
+    lineas = [error.split(":", 1)[0] for error in error.value.errores]
+    # La fecha en el formato declarado de su columna es válida
+    assert lineas == ["Línea 2", "Línea 3", "Línea 4", "Línea 7"]
@@ -0,0 +1,59 @@
+"""
+Servicio residente de validaciones.
+"""
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import lote
+import servidor
+from entregas import RUTS_PRUEBA
+
+
+def _validar_o_morir(file_path, *args):
+    # Simula un proceso del pool que muere, por ejemplo por falta de memoria
+    if "morir" in file_path:
+        os._exit(1)
+    return {"archivo": os.path.basename(file_path), "estado": "ok"}
+
+
+def _esperar(trabajos, limite):
+    while any(trabajo.estado in (servidor.EN_COLA, servidor.EN_PROCESO) for trabajo in trabajos):
+        assert time.time() < limite
+        time.sleep(0.05)
+
+
+def test_servicio_sobrevive_a_un_pool_roto(tmp_path, monkeypatch):
+    monkeypatch.setattr(lote, "_validar_archivo", _validar_o_morir)
+    servicio = servidor.ServicioValidaciones(RUTS_PRUEBA, comunas_path=None, procesos=1, use_cache=False)
+    try:
+        trabajos = [servicio.enviar(servidor.Trabajo(str(tmp_path / nombre), str(tmp_path / "v.csv")))
+                    for nombre in ("morir.csv", "a.csv", "b.csv")]
+        _esperar(trabajos, time.time() + 60)
+        assert [trabajo.estado for trabajo in trabajos] == [servidor.ERROR, servidor.OK, servidor.OK]
+        assert servicio.despachador.is_alive()
+    finally:
+        servicio.cerrar()
+
+
+def test_pool_roto_al_enviar(tmp_path, monkeypatch):
+    servicio = servidor.ServicioValidaciones(RUTS_PRUEBA, comunas_path=None, procesos=1, use_cache=False)
+    roto = servicio.executor
+
+    def enviar_roto(*args, **kwargs):
+        raise BrokenProcessPool("pool roto")
+
+    monkeypatch.setattr(roto, "submit", enviar_roto)
+    monkeypatch.setattr(lote, "_validar_archivo", _validar_o_morir)
+    try:
+        limite = time.time() + 60
+        primero = servicio.enviar(servidor.Trabajo(str(tmp_path / "a.csv"), str(tmp_path / "v.csv")))
+        _esperar([primero], limite)
+        assert primero.estado == servidor.ERROR
+        assert servicio.executor is not roto
+
+        segundo = servicio.enviar(servidor.Trabajo(str(tmp_path / "b.csv"), str(tmp_path / "v.csv")))
+        _esperar([segundo], limite)
+        assert segundo.estado == servidor.OK
+    finally:
+        servicio.cerrar()
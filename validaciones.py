@@ -1,34 +1,114 @@
-from file_selector import FileSelector
+from file_selector import CATEGORIA, FileSelector
+from acumuladores import (FilasRepetidas, ValoresRepetidos, FueraDeRango,
+                          TiposColumna, RutsFalsos, DigitoVerificador, PerfilColumna, Categorias, ComparacionArchivos,
+                          CaracteresEspeciales, CARACTERES_PERMITIDOS, Comunas)
 import pandas as pd
+from indice_ruts import IndiceRuts
+from indice_comunas import COMUNAS_PATH, IndiceComunas
 from informe import Informe
-from pprint import pprint
-from tkinter import Tk, filedialog
+from resultados import MapaFilas, ResultadoValidacion
+from metricas import MedicionMemoria, MetricaValidacion
+from fechas import PREFIJO_DTYPE, convertir_limite, formato_strftime
+from estructura import escanear_estructura
+from plan import TIPOS_COLUMNA, PlanInvalido, compilar_plan
+from instantaneas import (CARPETA_INSTANTANEAS, UMBRAL_FILAS, cargar_instantanea, comparar_instantaneas,
+                          corresponde_a, crear_instantanea, guardar_instantanea, periodo_anterior, resumen_columna,
+                          ruta_instantanea)
+from concurrent.futures import ThreadPoolExecutor
+import cProfile
+import json
+import os
 import re
 import sys
+import time
+
+
+# Validaciones del archivo completo, que se usan sin columna (comparar_filas_con_otro_archivo la admite como clave)
+VALIDACIONES_ARCHIVO = {"validate_filename", "validate_sin_filas_repetidas", "validate_sin_filas_vacias",
+                        "validate_sin_filas_irregulares", "validate_column_names", "comparar_filas_con_otro_archivo",
+                        "comparar_con_instantanea"}
+
+# Validaciones que se responden con el pre-escaneo de bytes del archivo (estructura.py)
+VALIDACIONES_ESTRUCTURA = {"validate_sin_filas_vacias", "validate_sin_filas_irregulares"}
+
+# Validaciones que observan filas completas y necesitan todas las columnas
+VALIDACIONES_FILA_COMPLETA = {"validate_sin_filas_repetidas"}
+
+# Validaciones que necesitan todas las columnas cuando se indica una columna clave
+VALIDACIONES_FILA_COMPLETA_CON_CLAVE = {"comparar_filas_con_otro_archivo"}
+
+# Filas por bloque al recorrer un archivo sin chunksize (archivo anterior, filas infractoras)
+BLOQUE_LECTURA = 500_000
+
+# Validaciones que esperan una columna de RUTs enteros
+VALIDACIONES_RUT = {"validate_sin_ruts_falsos", "describe_rut", "validate_digito_verificador"}
+
+# Validaciones que se responden con el perfil de la columna (una sola pasada por columna)
+VALIDACIONES_PERFIL = {"describe_rut", "validate_sin_valores_nulos", "validate_pertenece_a_categorias",
+                       "validate_formato_fecha"}
+
+# Validaciones que leen la columna como fecha (con el formato declarado en validate_formato_fecha, si existe)
+VALIDACIONES_FECHA = {"validate_formato_fecha", "validate_fecha_desde", "validate_fecha_hasta"}
+
+# Validaciones cuyo parámetro es el nombre de otra columna que también se debe leer (como texto)
+VALIDACIONES_COLUMNA_EN_PARAM = {"validate_digito_verificador", "validate_comuna"}
+
+# Filas de muestra en los resultados que arma el validador (las de los acumuladores usan la misma cantidad)
+MAX_MUESTRA = 10
+
+
+def patron_nombre_archivo(expected_pattern):
+    """
+    Convierte el patrón de validate_filename (ANEXO_6_A_BTE_AAAAMM) a una expresión regular
+    anclada que se compara con el nombre del archivo sin extensión.
+    """
+    # Reemplazar los patrones de fecha
+    regex_pattern = expected_pattern
+    regex_pattern = regex_pattern.replace("AAAA", r"\d{4}")  # Año: 4 dígitos
+    regex_pattern = regex_pattern.replace("MM", r"\d{2}")    # Mes: 2 dígitos
+    regex_pattern = regex_pattern.replace("DD", r"\d{2}")    # Día: 2 dígitos
+    regex_pattern = regex_pattern.replace("mm", r"\d{2}")    # Mes alternativo: 2 dígitos
+    regex_pattern = regex_pattern.replace("aaaa", r"\d{4}")  # Año alternativo: 4 dígitos
+    regex_pattern = regex_pattern.replace("dd", r"\d{2}")    # Día alternativo: 2 dígitos
+
+    # Agregar anclas para coincidencia exacta
+    return f"^{regex_pattern}$"
 
 
 class Validador:
-    def __init__(self, file_path=None, validations=None, rut_prueba=None):
+    def __init__(self, file_path=None, validations=None, rut_prueba=None, chunksize=None, use_cache=True, workers=None,
+                 gabinete=None, output_folder=None, formatos=None, perfilar=False, motor=None, comunas=None):
+
+        # Motor de lectura del archivo completo ("pandas" o "arrow"), ver FileSelector
+        file_selector = FileSelector(motor)
+        self.file_selector = file_selector
+
+        # rut_prueba puede ser la ruta del archivo o un IndiceRuts ya abierto (validación por lotes)
+        indice_ruts = rut_prueba if isinstance(rut_prueba, IndiceRuts) else None
 
-        file_selector = FileSelector()
+        # Sin archivo de datos o de validaciones se trabaja con diálogos (modo interactivo); en modo consola,
+        # por lotes, como servicio o vigilando una carpeta no se abre ninguna ventana
+        self.interactivo = not file_path or not validations
 
-        # Solicitar archivos y número de gabinete
+        # Solicitar archivos y número de gabinete (solo los que no se entregaron como argumento)
         self.file_path = file_path if file_path else file_selector.select_file(title="Seleccione archivo a validar")
-        self.ruts_prueba_path = rut_prueba if rut_prueba else file_selector.select_file("Seleccione archivo de ruts de prueba")
+        if indice_ruts is None:
+            self.ruts_prueba_path = rut_prueba if rut_prueba else file_selector.select_file("Seleccione archivo de ruts de prueba")
+        else:
+            self.ruts_prueba_path = None
         self.validation_path = validations if validations else file_selector.select_file("Seleccione archivo de validaciones")
-        self.gabinete = input("Ingrese el número de gabinete: ")
+        self.gabinete = gabinete if gabinete is not None else input("Ingrese el número de gabinete: ")
 
         # Cargar archivos y obtener datos
         self.filename = self.file_path.split("/")[-1].rsplit(".", 1)[0]
         self.folder_path = "/".join(self.file_path.split("/")[:-1])
-        self.df = file_selector.load_file(self.file_path)
-        
-        # Limpiar nombres de columnas (quitar BOM y espacios)
-        self.df.columns = [col.strip().lstrip('\ufeff').lstrip('ï»¿') for col in self.df.columns]
-        
-        self.ruts_prueba = file_selector.load_file(self.ruts_prueba_path)
-        self.validations = file_selector.load_validations(self.validation_path)
-        
+        self.output_folder = output_folder if output_folder else self.folder_path
+        if output_folder:
+            os.makedirs(output_folder, exist_ok=True)
+        # Instantáneas estadísticas de cada entrega, para comparar con el período anterior sin leer su archivo
+        self.carpeta_instantaneas = CARPETA_INSTANTANEAS or os.path.join(self.output_folder, "instantaneas")
+        # El encabezado completo se lee siempre; de los datos solo las columnas que usan las validaciones
+        self.columns = file_selector.read_header(self.file_path)
 
         # Diccionario con validaciones disponibles
         self.validations_availables = {
@@ -36,30 +116,337 @@ class Validador:
             "validate_filename": self.validate_filename,
             "validate_sin_filas_repetidas": self.validate_sin_filas_repetidas,
             "validate_sin_filas_vacias": self.validate_sin_filas_vacias,
+            "validate_sin_filas_irregulares": self.validate_sin_filas_irregulares,
             "validate_column_names": self.validate_column_names,
             "validate_column_type": self.validate_column_type,
             "validate_sin_ruts_falsos": self.validate_sin_ruts_falsos,
+            "validate_digito_verificador": self.validate_digito_verificador,
             "validate_sin_valores_nulos": self.validate_sin_valores_nulos,
             "validate_mayor_igual_a": self.validate_mayor_igual_a,
             "validate_menor_igual_a": self.validate_menor_igual_a,
+            "validate_formato_fecha": self.validate_formato_fecha,
+            "validate_fecha_desde": self.validate_fecha_desde,
+            "validate_fecha_hasta": self.validate_fecha_hasta,
             "validate_sin_valores_repetidos": self.validate_sin_valores_repetidos,
             "validate_pertenece_a_categorias": self.validate_pertenece_a_categorias,
+            "validate_sin_caracteres_especiales": self.validate_sin_caracteres_especiales,
+            "validate_comuna": self.validate_comuna,
             "describe_rut": self.describe_rut,
-            "comparar_filas_con_otro_archivo": self.comparar_filas_con_otro_archivo
+            "comparar_filas_con_otro_archivo": self.comparar_filas_con_otro_archivo,
+            "comparar_con_instantanea": self.comparar_con_instantanea
+        }
+
+        # El archivo de validaciones se compila antes de leer los datos: las funciones o columnas
+        # inexistentes se rechazan de inmediato y las reglas quedan agrupadas por columna
+        # (describir_archivo no recibe campo ni parámetro, no se puede usar en el archivo)
+        self.plan = compilar_plan(file_selector.load_validations(self.validation_path), self.columns,
+                                  [function for function in self.validations_availables if function != "describir_archivo"],
+                                  sin_columna=VALIDACIONES_ARCHIVO, columna_en_param=VALIDACIONES_COLUMNA_EN_PARAM)
+        self.formatos_fecha = self._formatos_fecha()
+
+        # Pre-escaneo de bytes (filas, filas vacías y número de campos por fila) antes de la carga completa,
+        # solo si el plan tiene validaciones de estructura. Una fila con más campos que el encabezado
+        # impide leer el archivo, así que se informa de inmediato
+        self._estructura = None
+        self._filas_leidas = None
+        if any(regla.funcion in VALIDACIONES_ESTRUCTURA for regla in self.plan):
+            estructura = self.estructura
+            if estructura.max_campos > estructura.campos:
+                lineas = [str(linea) for _, linea, campos in estructura.muestra_irregulares if campos > estructura.campos]
+                raise ValueError(f"El archivo tiene filas con más campos ({estructura.max_campos}) que el encabezado "
+                                 f"({estructura.campos}), por ejemplo en las líneas {', '.join(lineas)}.")
+
+        # Con use_cache las columnas parseadas se reutilizan entre ejecuciones sobre el mismo archivo
+        self.use_cache = use_cache
+        if indice_ruts is None:
+            self.ruts_prueba = IndiceRuts.desde_csv(self.ruts_prueba_path, use_cache=self.use_cache)
+        else:
+            self.ruts_prueba = indice_ruts
+        # La tabla de comunas (ruta o IndiceComunas ya abierto) solo se abre si el plan la usa.
+        # Si no se encuentra, validate_comuna lo informa en rojo y el resto del plan se ejecuta igual.
+        self.comunas_no_encontrada = None
+        if isinstance(comunas, IndiceComunas) or not any(regla.funcion == "validate_comuna" for regla in self.plan):
+            self.comunas = comunas
+        else:
+            comunas_path = comunas or COMUNAS_PATH
+            if os.path.isfile(comunas_path):
+                self.comunas = IndiceComunas.desde_csv(comunas_path, use_cache=self.use_cache)
+            else:
+                print(f"⚠️  No se encontró la tabla de comunas {comunas_path}")
+                self.comunas = None
+                self.comunas_no_encontrada = comunas_path
+
+        # Con chunksize el archivo se lee por bloques durante run_validations y no se mantiene en memoria
+        self.chunksize = chunksize
+        # Hilos para calcular validaciones independientes en paralelo (1 = secuencial)
+        self.workers = workers or os.cpu_count() or 1
+        if self.chunksize:
+            self.df = None
+        else:
+            usecols, dtype = self._columnas_requeridas(self._claves_plan())
+            self.df = file_selector.load_file(self.file_path, usecols, dtype, use_cache=self.use_cache)
+        
+
+        # Acumuladores que usa cada validación, alimentados por bloques o con el archivo completo
+        self.acumuladores_disponibles = {
+            "perfil": lambda column_name, param: PerfilColumna(column_name),
+            "validate_sin_filas_repetidas": lambda column_name, param: FilasRepetidas(),
+            "validate_sin_valores_repetidos": lambda column_name, param: ValoresRepetidos(column_name, guardar_valores=bool(self.chunksize)),
+            "validate_mayor_igual_a": lambda column_name, param: FueraDeRango(column_name, param, minimo=True),
+            "validate_menor_igual_a": lambda column_name, param: FueraDeRango(column_name, param, minimo=False),
+            "validate_fecha_desde": lambda column_name, param: FueraDeRango(column_name, self._limite_fecha(column_name, param), minimo=True),
+            "validate_fecha_hasta": lambda column_name, param: FueraDeRango(column_name, self._limite_fecha(column_name, param), minimo=False),
+            "validate_column_type": lambda column_name, param: TiposColumna(column_name),
+            "validate_sin_ruts_falsos": lambda column_name, param: RutsFalsos(column_name, self.ruts_prueba),
+            "validate_digito_verificador": lambda column_name, param: DigitoVerificador(column_name, param.strip() if param else None),
+            "comparar_filas_con_otro_archivo": self._comparacion,
+            "validate_pertenece_a_categorias": lambda column_name, param: Categorias(column_name, [cat.strip() for cat in (param or "").split(",")]),
+            "validate_sin_caracteres_especiales": lambda column_name, param: CaracteresEspeciales(column_name, param),
+            "validate_comuna": lambda column_name, param: Comunas(column_name, self.comunas, param.strip() if param else None),
         }
+        if self.comunas_no_encontrada:
+            # Sin tabla no hay nada que acumular; validate_comuna informa el error
+            del self.acumuladores_disponibles["validate_comuna"]
+        self._acumulados = {}
+
+        # Instrumentación: tiempo de cada acumulador, acumuladores precalculados y los que usa
+        # la validación en curso. Con perfilar, cada validación se ejecuta bajo cProfile.
+        self.perfilar = perfilar
+        self._tiempos_acumuladores = {}
+        self._precalculadas = set()
+        self._claves_usadas = set()
+        self.metricas = []
         
 
         # Inicializar informe y describir archivo 
-        self.informe = Informe(f"validaciones_{self.filename}", self.folder_path)
+        # Formatos del informe (pdf, html, md, json, jsonl); el PDF se genera desde un resumen acotado
+        # y el JSON contiene los resultados de las validaciones para leerlos con otros programas
+        self.informe = Informe(f"validaciones_{self.filename}", self.output_folder, formatos=formatos or ("pdf", "json"))
+        self.resultados = []
         self.informe.add_title("Informe de validaciones")
-        self.describir_archivo()
+        self.segundos_descripcion = 0.0
+        self.memoria_descripcion = None
+        if not self.chunksize:
+            self._describir_medido()
 
-    def get_function_param(self, validation_raw):
-        validation_split = validation_raw.split("(")
-        function = validation_split[0]
-        param = validation_split[1].replace(")", "")
-        
-        return function, param
+    def _clave(self, function, column_name=None, param=None):
+        # Las validaciones de archivo completo no tienen campo (None, o NaN si se llaman directamente)
+        # El parámetro vacío del archivo de validaciones ("") y el omitido (None) son la misma clave
+        column_name = column_name if isinstance(column_name, str) else None
+        param = param if isinstance(param, str) and param else None
+        return function, column_name, param
+
+    def _claves_plan(self):
+        return [self._clave(regla.funcion, regla.campo, regla.param) for regla in self.plan]
+
+    def _columnas_requeridas(self, claves):
+        """
+        Determina a partir de las validaciones qué columnas del archivo leer (usecols) y con
+        qué tipos (dtype). Retorna usecols=None si alguna validación necesita las filas completas.
+        """
+        usecols = []
+        dtype = {}
+        for function, column_name, param in claves:
+            if function in VALIDACIONES_COLUMNA_EN_PARAM and param and param.strip() in self.columns:
+                if param.strip() not in usecols:
+                    usecols.append(param.strip())
+                dtype[param.strip()] = str
+            if column_name not in self.columns:
+                continue
+            if column_name not in usecols:
+                usecols.append(column_name)
+            if column_name in self.formatos_fecha or function in VALIDACIONES_FECHA:
+                dtype[column_name] = PREFIJO_DTYPE + self.formatos_fecha.get(column_name, "")
+            elif function in VALIDACIONES_RUT:
+                dtype[column_name] = "int64"
+            elif function == "perfil" and param:
+                dtype[column_name] = str if param == "texto" else param
+            elif function == "validate_sin_caracteres_especiales":
+                # Los caracteres se revisan sobre el texto tal como viene en el archivo
+                dtype.setdefault(column_name, str)
+            elif function == "validate_comuna":
+                # Los códigos se leen como texto para informarlos tal como vienen (05101, no 5101.0)
+                dtype.setdefault(column_name, str)
+            elif function == "validate_pertenece_a_categorias":
+                # Si la columna es de texto se guarda codificada (categórica); otra regla puede fijar su tipo
+                dtype.setdefault(column_name, CATEGORIA)
+
+        if any(function in VALIDACIONES_FILA_COMPLETA or (function in VALIDACIONES_FILA_COMPLETA_CON_CLAVE and column_name)
+               for function, column_name, _ in claves):
+            usecols = None
+        elif not usecols:
+            # Sin columnas pandas no cuenta filas, basta con leer la primera
+            usecols = self.columns[:1]
+        return usecols, dtype
+
+    def _formatos_fecha(self):
+        """
+        Formatos de fecha declarados en el archivo de validaciones con validate_formato_fecha,
+        por columna. Si una columna tiene más de uno se usa el primero.
+        """
+        formatos = {}
+        for regla in self.plan:
+            if regla.funcion == "validate_formato_fecha" and regla.param.strip():
+                formatos.setdefault(regla.campo, formato_strftime(regla.param))
+        return formatos
+
+    def _limite_fecha(self, column_name, fecha):
+        """
+        Convierte la fecha límite de una validación. Se acepta en el formato declarado para la
+        columna o como AAAA-MM-DD. Retorna NaT si no es una fecha válida.
+        """
+        return convertir_limite(fecha, self.formatos_fecha.get(column_name))
+
+    def _clave_perfil(self, function, column_name):
+        """
+        Clave del perfil de una columna. El perfil se calcula con el mismo tipo de dato con que
+        el plan lee la columna, así todas las validaciones de la columna comparten un único perfil.
+        """
+        _, dtype = self._columnas_requeridas(self._claves_plan() + [self._clave(function, column_name)])
+        tipo = dtype.get(column_name)
+        return self._clave("perfil", column_name, "texto" if tipo is str else tipo)
+
+    def _claves_perfil(self):
+        # Un perfil por cada columna existente que aparece en el archivo de validaciones
+        claves = [self._clave_perfil(function, column_name) for function, column_name, _ in self._claves_plan()
+                  if column_name in self.columns]
+        return list(dict.fromkeys(claves))
+
+    def _perfil(self, function, column_name):
+        return self._acumulado(*self._clave_perfil(function, column_name))
+
+    def _asegurar_columnas(self, clave):
+        """
+        Carga las columnas que una validación necesita y que no se leyeron al inicio
+        (por ejemplo, al llamar una validación que no está en el archivo de validaciones).
+        """
+        usecols, dtype = self._columnas_requeridas([clave])
+        faltantes = [col for col in (usecols or self.columns) if col not in self.df.columns]
+        if not faltantes:
+            return
+
+        extra = self.file_selector.load_file(self.file_path, faltantes, dtype, use_cache=self.use_cache)
+        df = pd.concat([self.df, extra], axis=1)
+        self.df = df[[col for col in self.columns if col in df.columns]]
+
+    def _recorrer_bloques(self, claves):
+        """
+        Lee el archivo por bloques una sola vez y alimenta todos los acumuladores indicados.
+        """
+        acumuladores = {clave: self._nuevo_acumulador(clave) for clave in claves if clave not in self._acumulados}
+        if not acumuladores:
+            return
+
+        usecols, dtype = self._columnas_requeridas(list(acumuladores))
+        print(f"Leyendo archivo por bloques de {self.chunksize:,} filas...".replace(",", "."))
+        grupos = self._grupos_por_columna(acumuladores)
+        filas = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in self.file_selector.iter_chunks(self.file_path, self.chunksize, usecols, dtype):
+                list(executor.map(lambda grupo: self._actualizar_grupo(grupo, chunk), grupos))
+                filas += len(chunk)
+        self._filas_leidas = filas
+        self._acumulados.update(acumuladores)
+
+    def _precalcular(self, claves):
+        """
+        Calcula los acumuladores de las validaciones indicadas antes de escribir el informe.
+        Las columnas se calculan en paralelo en un pool de hilos (las operaciones de pandas y
+        NumPy liberan el GIL); las reglas de una misma columna, una tras otra en el mismo hilo,
+        sobre la columna extraída una sola vez.
+        """
+        claves = [clave for clave in dict.fromkeys(claves) if clave not in self._acumulados]
+        self._precalculadas.update(claves)
+        if self.chunksize:
+            return self._recorrer_bloques(claves)
+
+        for clave in claves:
+            self._asegurar_columnas(clave)
+        acumuladores = {clave: self._nuevo_acumulador(clave) for clave in claves}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(lambda grupo: self._actualizar_grupo(grupo, self.df), self._grupos_por_columna(acumuladores)))
+        self._acumulados.update(acumuladores)
+
+    @staticmethod
+    def _grupos_por_columna(acumuladores):
+        """
+        Agrupa los acumuladores por columna. Los de filas completas (sin columna) quedan
+        cada uno en su propio grupo.
+        """
+        grupos = {}
+        for clave, acumulador in acumuladores.items():
+            grupos.setdefault(clave[1] if clave[1] is not None else clave, []).append((clave, acumulador))
+        return list(grupos.values())
+
+    def _actualizar_grupo(self, grupo, datos):
+        # La columna se extrae una vez por bloque y se entrega a todas las reglas que solo la usan a ella
+        column_name = grupo[0][0][1]
+        serie = datos[column_name] if column_name is not None and column_name in datos.columns else None
+        for clave, acumulador in grupo:
+            self._actualizar(clave, acumulador, datos, serie)
+
+    def _actualizar(self, clave, acumulador, datos, serie=None):
+        # Cada acumulador se actualiza en un solo hilo a la vez, así que sumar su tiempo es seguro
+        inicio = time.perf_counter()
+        if serie is not None and getattr(acumulador, "solo_columna", False):
+            acumulador.update_serie(serie)
+        else:
+            acumulador.update(datos)
+        self._tiempos_acumuladores[clave] = self._tiempos_acumuladores.get(clave, 0) + time.perf_counter() - inicio
+
+    def _nuevo_acumulador(self, clave):
+        function, column_name, param = clave
+        return self.acumuladores_disponibles[function](column_name, param)
+
+    def _acumulado(self, function, column_name=None, param=None):
+        """
+        Entrega el acumulador de una validación. En modo por bloques normalmente ya fue
+        alimentado durante la pasada única de run_validations; en modo normal se
+        alimenta con el DataFrame completo como si fuera un único bloque.
+        """
+        clave = self._clave(function, column_name, param)
+        self._claves_usadas.add(clave)
+        if clave not in self._acumulados:
+            if self.chunksize:
+                self._recorrer_bloques([clave])
+            else:
+                self._asegurar_columnas(clave)
+                acumulador = self._nuevo_acumulador(clave)
+                acumulador.update(self.df)
+                self._acumulados[clave] = acumulador
+        return self._acumulados[clave]
+
+    def _valores_en_filas(self, column_name, filas):
+        """
+        Retorna los valores de una columna en las filas indicadas (pocas filas, por ejemplo
+        una muestra). En modo por bloques se recorre el archivo leyendo solo esa columna.
+        """
+        if self.df is not None:
+            return self.df[column_name].iloc[filas].tolist()
+
+        valores = {}
+        for chunk in self.file_selector.iter_chunks(self.file_path, self.chunksize, [column_name]):
+            encontradas = chunk.index.intersection(filas)
+            valores.update(zip(encontradas, chunk.iloc[:, 0].loc[encontradas].tolist()))
+        return [valores[fila] for fila in filas]
+
+    @property
+    def estructura(self):
+        """
+        Pre-escaneo de bytes del archivo, calculado la primera vez que se usa.
+        """
+        if self._estructura is None:
+            self._estructura = escanear_estructura(self.file_path)
+        return self._estructura
+
+    @property
+    def num_filas(self):
+        if self.df is not None:
+            return len(self.df)
+        # Por bloques las filas se cuentan en la pasada; sin pasada, con el pre-escaneo
+        if self._filas_leidas is not None:
+            return self._filas_leidas
+        return self.estructura.filas
 
     def _check_column_exists(self, column_name, validation_name="validación"):
         """
@@ -67,18 +454,18 @@ class Validador:
         Returns:
             bool: True si la columna existe, False en caso contrario.
         """
-        if column_name not in self.df.columns:
+        if column_name not in self.columns:
             print(f"❌ Error: La columna '{column_name}' no existe en el archivo")
-            print(f"📋 Columnas disponibles: {list(self.df.columns)}")
+            print(f"📋 Columnas disponibles: {list(self.columns)}")
             
             # Buscar columnas similares
-            similares = [col for col in self.df.columns if column_name.lower() in col.lower() or col.lower() in column_name.lower()]
+            similares = [col for col in self.columns if column_name.lower() in col.lower() or col.lower() in column_name.lower()]
             if similares:
                 print(f"🔍 Columnas similares encontradas: {similares}")
                 
             self.informe.add_heading(f"Error en {validation_name}")
             self.informe.add_spaced_sentence(f"La columna '{column_name}' no existe en el archivo.", red=True)
-            self.informe.add_sentence(f"Columnas disponibles: {', '.join(self.df.columns)}")
+            self.informe.add_sentence(f"Columnas disponibles: {', '.join(self.columns)}")
             if similares:
                 self.informe.add_sentence(f"Columnas similares: {', '.join(similares)}")
             return False
@@ -95,14 +482,42 @@ class Validador:
         self.informe.add_sentence(f"Nombre del archivo: {self.file_path.split('/')[-1]}")
         self.informe.add_sentence(f"Fecha del informe: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.informe.add_sentence(f"Gabinete: {self.gabinete}")
-        self.informe.add_sentence(f"Número de filas: {len(self.df):,}".replace(",", "."))
-        self.informe.add_sentence(f"Número de columnas: {len(self.df.columns)}")
+        self.informe.add_sentence(f"Número de filas: {self.num_filas:,}".replace(",", "."))
+        self.informe.add_sentence(f"Número de columnas: {len(self.columns)}")
         self.informe.add_sentence(f"Columnas:")
-        self.informe.add_list(self.df.columns.tolist())
+        self.informe.add_list(list(self.columns))
+
+        # Perfil de las columnas que se validan, calculado una sola vez y compartido con las validaciones
+        claves = self._claves_perfil()
+        if not claves:
+            return
+        self._precalcular(claves)
+
+        def _formatear(valor):
+            if valor is None or pd.isna(valor):
+                return "-"
+            if isinstance(valor, pd.Timestamp):
+                return valor.strftime("%Y-%m-%d")
+            if pd.api.types.is_number(valor) and float(valor).is_integer():
+                return f"{int(valor):,}".replace(",", ".")
+            return str(valor)[:30]
 
-    def describe_rut(self, column_name, _):
+        filas_tabla = []
+        for clave in claves:
+            perfil = self._acumulados[clave]
+            frecuentes = perfil.mas_frecuentes(1)
+            mas_frecuente = f"{_formatear(frecuentes[0][0])} ({frecuentes[0][1]:,})".replace(",", ".") if frecuentes else "-"
+            filas_tabla.append([perfil.column_name, f"{perfil.nulos:,}".replace(",", "."),
+                                f"{len(perfil.distintos):,}".replace(",", "."), _formatear(perfil.minimo),
+                                _formatear(perfil.maximo), mas_frecuente])
+        self.informe.add_sentence("Perfil de las columnas validadas:")
+        self.informe.add_table(filas_tabla, headers=["Columna", "Nulos", "Distintos", "Mínimo", "Máximo", "Más frecuente"])
+
+    def describe_rut(self, column_name, param):
         """
         Describe la columna de RUTs, incluyendo número de RUTs únicos y ejemplos.
+        Returns:
+            ResultadoValidacion: Descripción sin infracciones (siempre se cumple).
         """
 
         print(f"Describiendo columna de RUTs: {column_name}")
@@ -112,12 +527,13 @@ class Validador:
             return
 
         self.informe.add_heading(f"Descripción de la columna de RUTs: {column_name}")
-        num_unique_ruts = self.df[column_name].nunique()
+        descripcion = self._perfil("describe_rut", column_name)
+        num_unique_ruts = len(descripcion.distintos)
         self.informe.add_sentence(f"Número de RUTs únicos: {num_unique_ruts:,}".replace(",", "."))
         
         # Rut máximo y mínimo (formateados con separador de miles)
         def _format_rut(v):
-            if pd.isna(v):
+            if v is None or pd.isna(v):
                 return ""
             try:
                 iv = int(v)
@@ -129,34 +545,230 @@ class Validador:
                     return f"{int(digits):,}".replace(",", ".")
                 return s
 
-        rut_max = self.df[column_name].max()
-        rut_min = self.df[column_name].min()
+        rut_max = descripcion.maximo
+        rut_min = descripcion.minimo
         self.informe.add_sentence(f"RUT máximo: {_format_rut(rut_max)}")
         self.informe.add_sentence(f"RUT mínimo: {_format_rut(rut_min)}")
 
         # Número de ruts persona jurídica (>= 50000000) 
-        num_ruts_juridicos = self.df[self.df[column_name] >= 50000000][column_name].nunique()
+        num_ruts_juridicos = descripcion.distintos.contar(desde=50000000)
         self.informe.add_sentence(f"Número de RUTs de persona jurídica: {num_ruts_juridicos:,}".replace(",", "."))
 
         # RUTs entre [30000000, 40000000]
-        num_ruts_entre_30_40 = self.df[(self.df[column_name] >= 30000000) & (self.df[column_name] < 40000000)][column_name].nunique()
+        num_ruts_entre_30_40 = descripcion.distintos.contar(desde=30000000, hasta=40000000)
         self.informe.add_sentence(f"Número de RUTs entre 30.000.000 y 40.000.000: {num_ruts_entre_30_40:,}".replace(",", "."))
+        return ResultadoValidacion("describe_rut", column_name, param, True, infracciones=None)
 
-    def comparar_filas_con_otro_archivo(self, _, __):
+    def comparar_filas_con_otro_archivo(self, column_name, anterior_path):
+        """
+        Compara el archivo con el del período anterior.
+        Params:
+            column_name (str): Columna clave para comparar fila a fila (por ejemplo RUT). Si se deja
+                               vacío solo se compara el número de filas.
+            anterior_path (str): Ruta del archivo del período anterior (relativa a la carpeta del archivo
+                                 de validaciones o absoluta). Si se deja vacío se solicita con un diálogo
+                                 en modo interactivo; en otro caso se informa que falta.
+        Returns:
+            ResultadoValidacion: Con columna clave, cumple si no hay claves nuevas, eliminadas ni
+            modificadas; las infracciones son su suma y la muestra, las primeras filas nuevas o
+            modificadas del archivo actual. Sin columna clave solo se informa la diferencia de filas.
+            No se cumple si no hay archivo para comparar.
+        """
+        print("Comparando con archivo del período anterior...")
         self.informe.add_heading("Comparación de filas con archivo mes anterior")
 
-        archivo_comparacion_path = FileSelector.select_file(self, title="Seleccione archivo para comparar filas")
+        if not anterior_path:
+            if not self.interactivo:
+                self.informe.add_spaced_sentence("No se indicó archivo para comparar.", red=True)
+                return ResultadoValidacion("comparar_filas_con_otro_archivo", column_name, anterior_path, False, infracciones=None)
+            anterior_path = self.file_selector.select_file(title="Seleccione archivo para comparar filas")
 
-        if not archivo_comparacion_path:
+        if not anterior_path:
             self.informe.add_spaced_sentence("No se seleccionó ningún archivo para comparar filas.", red=True)
-            return
+            return ResultadoValidacion("comparar_filas_con_otro_archivo", column_name, anterior_path, False, infracciones=None)
+
+        if self._ruta_anterior(anterior_path) is None:
+            self.informe.add_spaced_sentence(f"No se encontró el archivo para comparar filas: {anterior_path}.", red=True)
+            return ResultadoValidacion("comparar_filas_con_otro_archivo", column_name, anterior_path, False, infracciones=None)
 
-        df_comparacion = FileSelector.load_file(self, archivo_comparacion_path)
+        resultado = self._acumulado("comparar_filas_con_otro_archivo", column_name, anterior_path).resultado()
+        filas_actual, filas_anterior = resultado[0], resultado[1]
 
-        diferencia_filas = len(self.df) - len(df_comparacion)
-        porcentaje_diferencia = (diferencia_filas / len(df_comparacion))
+        diferencia_filas = filas_actual - filas_anterior
+        porcentaje_diferencia = (diferencia_filas / filas_anterior) if filas_anterior else float("nan")
         self.informe.add_sentence(f"Diferencia de filas respecto al archivo del mes anterior: {diferencia_filas:,} ({porcentaje_diferencia:.2%})".replace(",", "."))
 
+        if len(resultado) == 2:
+            sin_clave = isinstance(column_name, str) and bool(column_name)
+            if sin_clave:
+                self.informe.add_spaced_sentence(f"La columna clave '{column_name}' no existe en ambos archivos, solo se compararon las filas.", red=True)
+            self.informe.add_spacer()
+            return ResultadoValidacion("comparar_filas_con_otro_archivo", column_name, anterior_path, not sin_clave,
+                                       infracciones=None)
+
+        comparacion = resultado[2]
+
+        def _ejemplos(muestra):
+            if comparacion.claves_enteras:
+                return ", ".join(f"{clave:,}".replace(",", ".") for _, clave in muestra)
+            return ", ".join(f"fila {fila + 1}" for fila, _ in muestra)
+
+        self.informe.add_sentence(f"Comparación fila a fila usando la columna clave '{column_name}':")
+        self.informe.add_sentence(f"Claves nuevas: {comparacion.nuevas:,}".replace(",", "."), red=comparacion.nuevas > 0)
+        if comparacion.nuevas:
+            self.informe.add_sentence(f"Ejemplos de claves nuevas: {_ejemplos(comparacion.muestra_nuevas)}{'...' if comparacion.nuevas > len(comparacion.muestra_nuevas) else ''}.")
+        self.informe.add_sentence(f"Claves eliminadas: {comparacion.eliminadas:,}".replace(",", "."), red=comparacion.eliminadas > 0)
+        if comparacion.eliminadas:
+            # Las filas de las claves eliminadas corresponden al archivo anterior
+            self.informe.add_sentence(f"Ejemplos de claves eliminadas: {_ejemplos(comparacion.muestra_eliminadas)}{'...' if comparacion.eliminadas > len(comparacion.muestra_eliminadas) else ''}.")
+        self.informe.add_sentence(f"Claves con cambios: {comparacion.modificadas:,} de {comparacion.comunes:,} claves presentes en ambos archivos".replace(",", "."))
+        if comparacion.modificadas:
+            self.informe.add_sentence(f"Ejemplos de claves con cambios: {_ejemplos(comparacion.muestra_modificadas)}{'...' if comparacion.modificadas > len(comparacion.muestra_modificadas) else ''}.")
+
+        repetidas_actual, repetidas_anterior = comparacion.claves_repetidas
+        if repetidas_actual or repetidas_anterior:
+            self.informe.add_sentence(f"Claves repetidas (se comparó su primera aparición): {repetidas_actual:,} en el archivo actual y {repetidas_anterior:,} en el anterior.".replace(",", "."), red=True)
+        nulas_actual, nulas_anterior = comparacion.claves_nulas
+        if nulas_actual or nulas_anterior:
+            self.informe.add_sentence(f"Filas sin clave (no comparadas): {nulas_actual:,} en el archivo actual y {nulas_anterior:,} en el anterior.".replace(",", "."), red=True)
+
+        if comparacion.cambios_por_columna:
+            filas_tabla = [[column, f"{cambios:,}".replace(",", "."), f"{cambios / comparacion.comunes:.2%}" if comparacion.comunes else "-"]
+                           for column, cambios in comparacion.cambios_por_columna.items()]
+            self.informe.add_table(filas_tabla, headers=["Columna", "Claves con cambios", "Tasa de cambio"])
+        else:
+            self.informe.add_spacer()
+
+        infracciones = comparacion.nuevas + comparacion.eliminadas + comparacion.modificadas
+        muestra = sorted(comparacion.muestra_nuevas + comparacion.muestra_modificadas)[:MAX_MUESTRA]
+        return ResultadoValidacion("comparar_filas_con_otro_archivo", column_name, anterior_path, infracciones == 0,
+                                   infracciones=infracciones, muestra=muestra)
+
+    def _ruta_anterior(self, anterior_path):
+        """
+        Resuelve la ruta del archivo del período anterior; las rutas relativas se buscan también
+        en la carpeta del archivo de validaciones. Retorna None si no existe.
+        """
+        anterior_path = anterior_path.strip()
+        candidatos = [anterior_path]
+        if not os.path.isabs(anterior_path):
+            candidatos.append(os.path.join(os.path.dirname(os.path.abspath(self.validation_path)), anterior_path))
+        for candidato in candidatos:
+            if os.path.isfile(candidato):
+                return candidato
+        return None
+
+    def _comparacion(self, column_name, anterior_path):
+        anterior_path = self._ruta_anterior(anterior_path) if anterior_path else None
+        if anterior_path is None:
+            return ComparacionArchivos(None, [], None)
+
+        columnas_anterior = self.file_selector.read_header(anterior_path)
+        key_column = column_name if column_name in self.columns and column_name in columnas_anterior else None
+        if key_column is None:
+            # Sin columna clave basta con las filas del anterior, que están en su instantánea si no cambió
+            nombre_anterior = os.path.basename(anterior_path).rsplit(".", 1)[0]
+            instantanea = cargar_instantanea(ruta_instantanea(self.carpeta_instantaneas, nombre_anterior))
+            if corresponde_a(instantanea, anterior_path):
+                return ComparacionArchivos(None, [], None, filas_anterior=instantanea["filas"])
+        comunes = [col for col in self.columns if col in columnas_anterior and col != key_column]
+
+        # Las columnas con tipo en el plan (fechas, RUT, categorías) se leen con el mismo tipo que en el
+        # archivo actual y el resto como texto, sin inferir un tipo por bloque; los valores se comparan
+        # en su forma normal, que no depende del tipo leído (ver comparacion._normalizar)
+        _, dtype = self._columnas_requeridas(self._claves_plan())
+        usecols = [key_column] + comunes if key_column else columnas_anterior[:1]
+        dtype_anterior = {col: dtype.get(col, str) for col in usecols} if key_column else {}
+
+        def leer_anterior():
+            yield from self.file_selector.iter_chunks(anterior_path, self.chunksize or BLOQUE_LECTURA, usecols, dtype_anterior)
+
+        return ComparacionArchivos(key_column, comunes, leer_anterior, self.workers)
+
+    def _instantanea(self):
+        """
+        Instantánea estadística del archivo, derivada de los perfiles de las columnas validadas.
+        """
+        columnas = {}
+        for clave in self._claves_perfil():
+            perfil = self._acumulado(*clave)
+            columnas[perfil.column_name] = resumen_columna(perfil, clave[2])
+        return crear_instantanea(self.file_path, self.num_filas, columnas)
+
+    def _ruta_instantanea_anterior(self, anterior):
+        """
+        Ruta de la instantánea con que se compara: la indicada (nombre del archivo o ruta de la
+        instantánea) o, si se deja vacío, la del período anterior según el patrón de validate_filename.
+        Retorna None si no se puede deducir el período anterior.
+        """
+        anterior = (anterior or "").strip()
+        if anterior.lower().endswith(".json"):
+            if os.path.isabs(anterior) or os.path.isfile(anterior):
+                return anterior
+            return os.path.join(os.path.dirname(os.path.abspath(self.validation_path)), anterior)
+        if anterior:
+            return ruta_instantanea(self.carpeta_instantaneas, os.path.basename(anterior).rsplit(".", 1)[0]
+                                    if anterior.lower().endswith(".csv") else anterior)
+
+        patrones = [regla.param.strip() for regla in self.plan if regla.funcion == "validate_filename" and regla.param.strip()]
+        nombre = periodo_anterior(self.filename, patrones[0]) if patrones else None
+        return ruta_instantanea(self.carpeta_instantaneas, nombre) if nombre else None
+
+    def comparar_con_instantanea(self, _, anterior):
+        """
+        Compara las estadísticas del archivo con la instantánea del período anterior, sin leer su archivo.
+        Params:
+            anterior (str): Nombre del archivo anterior (ANEXO_202312) o ruta de su instantánea (.json).
+                            Si se deja vacío, el período anterior se deduce con el patrón de validate_filename.
+        Returns:
+            ResultadoValidacion: Cumple si ninguna columna tiene deriva sobre los umbrales.
+        """
+        print("Comparando con la instantánea del período anterior...")
+        self.informe.add_heading("Comparación con la instantánea del período anterior")
+
+        instantanea_path = self._ruta_instantanea_anterior(anterior)
+        if instantanea_path is None:
+            self.informe.add_spaced_sentence("No se pudo deducir el período anterior: indique el archivo anterior "
+                                             "o agregue validate_filename con AAAA y MM al archivo de validaciones.", red=True)
+            return False
+        anterior_instantanea = cargar_instantanea(instantanea_path)
+        if anterior_instantanea is None:
+            self.informe.add_spaced_sentence(f"No se encontró la instantánea del período anterior: {instantanea_path}.", red=True)
+            return False
+
+        actual = self._instantanea()
+        self.informe.add_sentence(f"Instantánea anterior: {anterior_instantanea['archivo']} ({anterior_instantanea['fecha']}).")
+        filas_actual, filas_anterior = actual["filas"], anterior_instantanea["filas"]
+        cambio_filas = (filas_actual - filas_anterior) / filas_anterior if filas_anterior else float("nan")
+        deriva_filas = not filas_anterior or abs(cambio_filas) > UMBRAL_FILAS
+        self.informe.add_sentence(f"Filas: {filas_anterior:,} en el anterior y {filas_actual:,} en el actual".replace(",", ".")
+                                  + f" ({cambio_filas:+.2%}).", red=deriva_filas)
+
+        derivas = comparar_instantaneas(actual, anterior_instantanea)
+        if not derivas:
+            self.informe.add_spaced_sentence("La instantánea anterior no tiene ninguna de las columnas validadas.", red=True)
+            return ResultadoValidacion("comparar_con_instantanea", None, anterior, not deriva_filas, infracciones=None)
+
+        def _indice(valor):
+            return "-" if valor is None else f"{valor:.3f}"
+
+        filas_tabla = [[deriva.columna, f"{deriva.nulos[0]:.2%} → {deriva.nulos[1]:.2%}",
+                        f"{deriva.distintos[0]:,} → {deriva.distintos[1]:,}".replace(",", "."),
+                        _indice(deriva.psi_categorias), _indice(deriva.psi_tramos),
+                        "-" if deriva.continuidad is None else f"{deriva.continuidad:.1%}",
+                        ", ".join(deriva.motivos) or "-"]
+                       for deriva in derivas]
+        self.informe.add_table(filas_tabla, headers=["Columna", "Nulos", "Distintos", "PSI categorías", "PSI tramos RUT",
+                                                     "Continuidad", "Deriva"])
+
+        con_deriva = [deriva for deriva in derivas if deriva.motivos]
+        if con_deriva:
+            detalle = "; ".join(f"{deriva.columna} ({', '.join(deriva.motivos)})" for deriva in con_deriva)
+            self.informe.add_spaced_sentence(f"✗ Se detectó deriva en {len(con_deriva)} de {len(derivas)} columnas: {detalle}.", red=True)
+        else:
+            self.informe.add_spaced_sentence(f"✓ Ninguna de las {len(derivas)} columnas comparadas tiene deriva sobre los umbrales.")
+        return ResultadoValidacion("comparar_con_instantanea", None, anterior, not con_deriva and not deriva_filas,
+                                   infracciones=None)
 
     def validate_filename(self, _, expected_pattern):
         """
@@ -170,62 +782,98 @@ class Validador:
                                   - ANEXO_1_C_ACTECO
                                   - IPS_entrega_actecos_MM_AAAA
         Returns:
-            Agrega un mensaje al informe indicando si el nombre del archivo coincide con el patrón esperado.
+            ResultadoValidacion: Cumple si el nombre del archivo coincide con el patrón esperado.
         """
 
         self.informe.add_heading("Validación de nombre de archivo")
 
-        # Convertir el patrón a expresión regular
-        regex_pattern = expected_pattern
-        # Reemplazar los patrones de fecha
-        regex_pattern = regex_pattern.replace("AAAA", r"\d{4}")  # Año: 4 dígitos
-        regex_pattern = regex_pattern.replace("MM", r"\d{2}")    # Mes: 2 dígitos  
-        regex_pattern = regex_pattern.replace("DD", r"\d{2}")    # Día: 2 dígitos
-        regex_pattern = regex_pattern.replace("mm", r"\d{2}")    # Mes alternativo: 2 dígitos
-        regex_pattern = regex_pattern.replace("aaaa", r"\d{4}")  # Año alternativo: 4 dígitos
-        regex_pattern = regex_pattern.replace("dd", r"\d{2}")    # Día alternativo: 2 dígitos
-        
-        # Agregar anclas para coincidencia exacta
-        regex_pattern = f"^{regex_pattern}$"
-        
         # Validar el nombre del archivo
-        if re.match(regex_pattern, self.filename):
-            return self.informe.add_spaced_sentence(f"El nombre del archivo [{self.filename}] coincide con el patrón esperado [{expected_pattern}].")
+        cumple = re.match(patron_nombre_archivo(expected_pattern), self.filename) is not None
+        if cumple:
+            self.informe.add_spaced_sentence(f"El nombre del archivo [{self.filename}] coincide con el patrón esperado [{expected_pattern}].")
         else:
-            return self.informe.add_spaced_sentence(f"El nombre del archivo [{self.filename}] no coincide con el patrón esperado [{expected_pattern}].", red=True)
+            self.informe.add_spaced_sentence(f"El nombre del archivo [{self.filename}] no coincide con el patrón esperado [{expected_pattern}].", red=True)
+        return ResultadoValidacion("validate_filename", None, expected_pattern, cumple, infracciones=None)
     
     def validate_sin_filas_repetidas(self, _, __):
         """
         Valida que no existan filas repetidas en el archivo.
         Returns:
-            Agrega un mensaje al informe indicando si existen filas repetidas.
+            ResultadoValidacion: Número de filas que repiten una anterior, muestra con la primera fila
+            de cada grupo de filas idénticas y mapa de filas repetidas.
         """
 
         print("Validando filas repetidas...")
 
         self.informe.add_heading("Validación de filas repetidas en el archivo")
-        if self.df.duplicated().sum() == 0:
-            return self.informe.add_spaced_sentence("No existen filas repetidas en el archivo.")
+        repetidas = self._acumulado("validate_sin_filas_repetidas").resultado()
+        resultado = ResultadoValidacion("validate_sin_filas_repetidas", None, None, repetidas.repetidas == 0,
+                                        infracciones=repetidas.repetidas,
+                                        muestra=[(filas[0], f"{veces} veces") for filas, veces in repetidas.muestra],
+                                        filas=repetidas.filas)
+        if repetidas.repetidas == 0:
+            self.informe.add_spaced_sentence("No existen filas repetidas en el archivo.")
+            return resultado
         
-        return self.informe.add_spaced_sentence(f"Las siguientes filas se encuentran repetidas: {[index + 1 for index in self.df[self.df.duplicated()].index.tolist()]}", red=True)
+        self.informe.add_sentence(f"✗ Se encontraron {repetidas.repetidas:,} filas repetidas en {repetidas.grupos:,} grupos de filas idénticas.".replace(",", "."), red=True)
+        ejemplos = []
+        for filas, veces in repetidas.muestra:
+            numeros = ", ".join(str(fila + 1) for fila in filas)
+            ejemplos.append(f"[{numeros}{', ...' if veces > len(filas) else ''}] ({veces} veces)")
+        self.informe.add_spaced_sentence(f"Ejemplos de grupos (número de fila): {'; '.join(ejemplos)}{'...' if repetidas.grupos > len(ejemplos) else ''}.", red=True)
+        return resultado
     
     def validate_sin_filas_vacias(self, _, __):
         """
         Valida que no existan filas vacías en el archivo.
         Returns:
-            Agrega un mensaje al informe indicando si existen filas vacías.
+            ResultadoValidacion: Número de filas vacías, muestra de filas y mapa de filas. No se cumple
+            si el archivo está vacío.
         """
         print("Validando filas vacías...")
         
         self.informe.add_heading("Validación de filas vacías en el archivo")
-        if self.df.empty:
-            return self.informe.add_spaced_sentence("El archivo está vacío.", red=True)
+        # Las filas vacías se obtienen del pre-escaneo de bytes, sin leer las columnas
+        if self.estructura.filas == 0 or not self.columns:
+            self.informe.add_spaced_sentence("El archivo está vacío.", red=True)
+            return ResultadoValidacion("validate_sin_filas_vacias", None, None, False, infracciones=None)
         
-        empty_rows = self.df[self.df.isnull().all(axis=1)].index.tolist()
+        empty_rows = self.estructura.vacias
+        filas = MapaFilas()
+        filas.agregar(empty_rows)
+        resultado = ResultadoValidacion("validate_sin_filas_vacias", None, None, not empty_rows,
+                                        infracciones=len(empty_rows),
+                                        muestra=[(fila, "") for fila in empty_rows[:MAX_MUESTRA]], filas=filas)
         if not empty_rows:
-            return self.informe.add_spaced_sentence("No existen filas vacías en el archivo.")
+            self.informe.add_spaced_sentence("No existen filas vacías en el archivo.")
+            return resultado
         
-        return self.informe.add_spaced_sentence(f"Las siguientes filas están vacías: {[index + 1 for index in empty_rows]}", red=True)
+        # Solo las primeras filas: en un archivo mal exportado pueden ser millones
+        primeras = [index + 1 for index in empty_rows[:MAX_MUESTRA]]
+        self.informe.add_spaced_sentence(f"Las siguientes filas están vacías: {primeras}{'...' if len(empty_rows) > MAX_MUESTRA else ''}", red=True)
+        return resultado
+
+    def validate_sin_filas_irregulares(self, _, __):
+        """
+        Valida que todas las filas tengan el mismo número de campos que el encabezado.
+        Las filas con menos campos se leen completando con valores nulos, por lo que de otro
+        modo pasarían inadvertidas.
+        Returns:
+            ResultadoValidacion: Número de filas irregulares y muestra de filas con su número de campos.
+        """
+        print("Validando número de campos por fila...")
+
+        irregulares = self.estructura.irregulares
+        muestra = [(fila, f"{campos} campos (línea {linea})") for fila, linea, campos in self.estructura.muestra_irregulares]
+        resultado = ResultadoValidacion("validate_sin_filas_irregulares", None, None, irregulares == 0,
+                                        infracciones=irregulares, muestra=muestra)
+        self._informar_infracciones(
+            resultado,
+            "Validación de número de campos por fila",
+            f"Todas las filas tienen {self.estructura.campos} campos, igual que el encabezado.",
+            f"Se encontraron {irregulares:,} filas con un número de campos distinto al encabezado ({self.estructura.campos}).".replace(",", "."),
+        )
+        return resultado
     
     # Funciones específicas (columna)
     def validate_column_names(self, _, expected_names):
@@ -234,15 +882,15 @@ class Validador:
         Params:
             expected_names (str): Nombre esperado de la columna, puede ser una lista separada por comas.
         Returns:
-            Agrega un mensaje al informe indicando si el nombre de la columna coincide con el esperado.
-
+            ResultadoValidacion: Cumple si están todas las columnas esperadas y ninguna otra; las
+            infracciones son las columnas faltantes más las no esperadas.
         """
         print("Validando nombres de columnas...")
         
         expected_names_list = [name.strip() for name in expected_names.split(",")]
-        columns_found = [col for col in expected_names_list if col in self.df.columns]
-        columns_not_found = [col for col in expected_names_list if col not in self.df.columns]
-        columns_not_expected = [col for col in self.df.columns if col not in expected_names_list]
+        columns_found = [col for col in expected_names_list if col in self.columns]
+        columns_not_found = [col for col in expected_names_list if col not in self.columns]
+        columns_not_expected = [col for col in self.columns if col not in expected_names_list]
 
         self.informe.add_heading("Validación de nombres de columnas")
         if columns_found:
@@ -253,6 +901,9 @@ class Validador:
             self.informe.add_sentence(f"Las siguientes columnas no son esperadas: {', '.join(columns_not_expected)}.", red=True)
 
         self.informe.add_spacer()
+        infracciones = len(columns_not_found) + len(columns_not_expected)
+        return ResultadoValidacion("validate_column_names", None, expected_names, infracciones == 0,
+                                   infracciones=infracciones)
 
 
     def validate_column_type(self, column_name, expected_type):
@@ -271,28 +922,20 @@ class Validador:
         if not self._check_column_exists(column_name, "validación de tipo de dato"):
             return False
         
-        if expected_type not in ["texto", "entero", "decimal", "fecha"]:
+        if expected_type not in TIPOS_COLUMNA:
             raise ValueError("Tipo de dato no válido.")
 
-        if expected_type == "texto":
-            if pd.api.types.is_string_dtype(self.df[column_name]):
-                return True
-        elif expected_type == "entero":
-            if pd.api.types.is_integer_dtype(self.df[column_name]):
-                return True
-            else:
-                return self.df[~pd.api.types.is_integer_dtype(self.df[column_name])].index.tolist()
+        # El tipo se evalúa en cada bloque; en modo normal el archivo completo es un único bloque
+        tipos = self._acumulado("validate_column_type", column_name, expected_type)
+        resultado = ResultadoValidacion("validate_column_type", column_name, expected_type, tipos.cumple[expected_type],
+                                        infracciones=None)
 
-        elif expected_type == "decimal":
-            if pd.api.types.is_float_dtype(self.df[column_name]):
-                return True
-            else:
-                return self.df[column_name][pd.api.types.is_float_dtype(self.df[column_name])].tolist()
-        elif expected_type == "fecha":
-            if pd.api.types.is_datetime64_any_dtype(self.df[column_name]):
-                return True
-            else:
-                return self.df[column_name][not pd.api.types.is_datetime64_any_dtype(self.df[column_name])].tolist()
+        self.informe.add_heading(f"Validación de tipo de dato en columna '{column_name}'")
+        if resultado.cumple:
+            self.informe.add_spaced_sentence(f"✓ La columna '{column_name}' es de tipo {expected_type}.")
+        else:
+            self.informe.add_spaced_sentence(f"✗ La columna '{column_name}' no es de tipo {expected_type}.", red=True)
+        return resultado
 
         
         # try:
@@ -301,13 +944,13 @@ class Validador:
         # except ValueError:
         #     return False
 
-    def validate_sin_ruts_falsos(self, column_name, _):
+    def validate_sin_ruts_falsos(self, column_name, param):
         """
         Valida que los RUTs de la columna no estén en el archivo de RUTs de prueba.
         Params:
             column_name (str): Nombre de la columna a validar, debe contener RUTs.
         Returns:
-            list: Lista de RUTs que están en el archivo de RUTs de prueba.
+            ResultadoValidacion: Ocurrencias de RUTs de prueba, muestra de filas y mapa de filas.
         """
         print("Validando RUTs falsos...")
         
@@ -315,33 +958,24 @@ class Validador:
         if not self._check_column_exists(column_name, "validación de RUTs falsos"):
             return
         
-        if not pd.api.types.is_integer_dtype(self.df[column_name]):
+        ruts_falsos = self._acumulado("validate_sin_ruts_falsos", column_name, param)
+        if not ruts_falsos.es_entero:
             raise TypeError("La columna no es numérica.")
         
         self.informe.add_heading("Validación de RUTs falsos")
 
-        # Obtener RUTs de prueba como set para búsqueda O(1)
-        print(f"📋 Cargando RUTs de prueba desde archivo...")
-        ruts_prueba_set = set(self.ruts_prueba.iloc[:, 0])
-        print(f"✅ {len(ruts_prueba_set):,} RUTs de prueba cargados".replace(",", "."))
-        print(f"📄 Ejemplos de RUTs de prueba: {list(ruts_prueba_set)[:5]}...")
+        # Los RUTs de prueba se buscan en el índice compilado con una búsqueda vectorizada por bloque
+        print(f"✅ {len(self.ruts_prueba):,} RUTs de prueba cargados".replace(",", "."))
+        print(f"📄 Ejemplos de RUTs de prueba: {self.ruts_prueba.ruts[:5].tolist()}...")
         
-        # Obtener RUTs únicos de la columna para optimizar la búsqueda
         print(f"🔍 Analizando columna '{column_name}'...")
-        total_ruts = len(self.df[column_name])
-        ruts_unicos = self.df[column_name].unique()
-        print(f"📊 Total de registros: {total_ruts:,}, RUTs únicos: {len(ruts_unicos):,}".replace(",", "."))
-        
-        # Usar intersección de sets para encontrar coincidencias (mucho más eficiente)
-        print(f"🚀 Buscando intersección entre RUTs de archivo y RUTs de prueba...")
-        ruts_unicos_set = set(ruts_unicos)
-        ruts_falsos_unicos = ruts_unicos_set.intersection(ruts_prueba_set)
+        print(f"📊 Total de registros: {ruts_falsos.total:,}".replace(",", "."))
+        ruts_falsos_unicos = ruts_falsos.falsos
         
         if ruts_falsos_unicos:
             # Contar ocurrencias de cada RUT falso en el DataFrame original
-            print(f"⚠️  Encontrados {len(ruts_falsos_unicos)} RUTs falsos únicos, contando ocurrencias...")
-            mask_falsos = self.df[column_name].isin(ruts_falsos_unicos)
-            total_ocurrencias = mask_falsos.sum()
+            print(f"⚠️  Encontrados {len(ruts_falsos_unicos)} RUTs falsos únicos")
+            total_ocurrencias = ruts_falsos.ocurrencias
             
             print(f"❌ Total de ocurrencias de RUTs falsos: {total_ocurrencias:,}".replace(",", "."))
             print(f"📋 RUTs falsos encontrados: {sorted(list(ruts_falsos_unicos))[:10]}{'...' if len(ruts_falsos_unicos) > 10 else ''}")
@@ -351,8 +985,55 @@ class Validador:
         else:
             print(f"✅ No se encontraron RUTs falsos en la columna")
             self.informe.add_spaced_sentence("✓ No se encontraron RUTs falsos en la columna.")
+        return ResultadoValidacion("validate_sin_ruts_falsos", column_name, param, ruts_falsos.ocurrencias == 0,
+                                   infracciones=ruts_falsos.ocurrencias, muestra=ruts_falsos.muestra,
+                                   filas=ruts_falsos.filas)
     
-    def validate_sin_valores_nulos(self, column_name, _):
+    def validate_digito_verificador(self, column_name, dv_column):
+        """
+        Valida el dígito verificador (módulo 11) de una columna de RUTs.
+        Params:
+            column_name (str): Nombre de la columna de RUTs, entera o con formato ("12.345.678-9").
+            dv_column (str): Nombre de la columna con el DV. Si se deja vacío, el DV se toma
+                             del mismo valor del RUT.
+        Returns:
+            ResultadoValidacion: Número de RUTs con DV incorrecto, muestra de filas y mapa de filas.
+            Los RUTs sin DV o que no se pudieron interpretar se informan aparte y no cuentan.
+        """
+        print(f"Validando dígito verificador de la columna {column_name}...")
+
+        if not self._check_column_exists(column_name, "validación de dígito verificador"):
+            return
+        if dv_column and dv_column.strip() and not self._check_column_exists(dv_column.strip(), "validación de dígito verificador"):
+            return
+
+        self.informe.add_heading(f"Validación de dígito verificador en columna '{column_name}'")
+        digitos = self._acumulado("validate_digito_verificador", column_name, dv_column)
+        resultado = ResultadoValidacion("validate_digito_verificador", column_name, dv_column, digitos.incorrectos == 0,
+                                        infracciones=digitos.incorrectos,
+                                        muestra=[(fila, f"{cuerpo}-{dv} (esperado {esperado})")
+                                                 for fila, cuerpo, dv, esperado in digitos.muestra],
+                                        filas=digitos.filas)
+
+        if digitos.sin_dato:
+            self.informe.add_sentence(f"RUTs sin dígito verificador o que no se pudieron interpretar: {digitos.sin_dato:,}".replace(",", "."), red=True)
+
+        if digitos.incorrectos == 0:
+            self.informe.add_spaced_sentence("✓ Todos los RUTs tienen dígito verificador correcto.")
+            return resultado
+
+        self.informe.add_sentence(f"✗ Se encontraron {digitos.incorrectos:,} RUTs con dígito verificador incorrecto.".replace(",", "."), red=True)
+        ejemplos = [f"fila {fila + 1}: {cuerpo:,}-{dv} (esperado {esperado})".replace(",", ".") for fila, cuerpo, dv, esperado in digitos.muestra]
+        self.informe.add_sentence(f"Ejemplos: {'; '.join(ejemplos)}{'...' if digitos.incorrectos > len(ejemplos) else ''}.", red=True)
+        self.informe.add_spacer()
+        return resultado
+
+    def validate_sin_valores_nulos(self, column_name, param):
+        """
+        Cuenta los valores nulos de la columna.
+        Returns:
+            ResultadoValidacion: Número de valores nulos y mapa de sus filas.
+        """
         print("Validando valores nulos...")
         
         # Verificar si la columna existe
@@ -360,33 +1041,116 @@ class Validador:
             return
             
         self.informe.add_heading("Validación de valores nulos")
-        self.informe.add_spaced_sentence(f"Número de valores nulos en la columna: {self.df[column_name].isnull().sum():,}".replace(",", "."))
+        perfil = self._perfil("validate_sin_valores_nulos", column_name)
+        nulos = perfil.nulos
+        self.informe.add_spaced_sentence(f"Número de valores nulos en la columna: {nulos:,}".replace(",", "."))
+        filas = perfil.filas_nulas.filas()[:MAX_MUESTRA].tolist()
+        return ResultadoValidacion("validate_sin_valores_nulos", column_name, param, nulos == 0, infracciones=nulos,
+                                   muestra=[(fila, None) for fila in filas], filas=perfil.filas_nulas)
     
 
     
+    def _informar_infracciones(self, resultado, heading, mensaje_cumple, mensaje_infracciones):
+        """
+        Agrega al informe un resultado con infracciones: el total y una muestra de filas.
+        """
+        self.informe.add_heading(heading)
+        if resultado.cumple:
+            return self.informe.add_spaced_sentence(f"✓ {mensaje_cumple}")
+
+        self.informe.add_sentence(f"✗ {mensaje_infracciones}", red=True)
+        ejemplos = [f"fila {fila + 1}: {valor}" for fila, valor in resultado.muestra]
+        self.informe.add_spaced_sentence(f"Ejemplos: {'; '.join(ejemplos)}{'...' if resultado.infracciones > len(ejemplos) else ''}.", red=True)
+
+    def _validar_rango(self, function, column_name, value, minimo, tipo="valores"):
+        fuera = self._acumulado(function, column_name, value)
+        muestra = fuera.muestra
+        if tipo == "fechas":
+            comparacion, contraria = ("posteriores o iguales", "anteriores") if minimo else ("anteriores o iguales", "posteriores")
+            muestra = [(fila, fecha.strftime("%Y-%m-%d")) for fila, fecha in muestra]
+        else:
+            comparacion, contraria = ("mayores o iguales", "menores") if minimo else ("menores o iguales", "mayores")
+        resultado = ResultadoValidacion(function, column_name, value, fuera.infracciones == 0,
+                                        infracciones=fuera.infracciones, muestra=muestra, filas=fuera.filas)
+        self._informar_infracciones(
+            resultado,
+            f"Validación de {tipo} {comparacion} a {value} en columna '{column_name}'",
+            f"Todos los {tipo} de la columna '{column_name}' son {comparacion} a {value}.",
+            f"Se encontraron {fuera.infracciones:,} {tipo} {contraria} a {value}.".replace(",", "."),
+        )
+        return resultado
+
     def validate_mayor_igual_a(self, column_name, value):
+        """
+        Valida que los valores de la columna sean mayores o iguales al valor indicado.
+        Returns:
+            ResultadoValidacion: Número de valores menores, muestra de filas y mapa de filas.
+        """
         if not self._check_column_exists(column_name, "validación mayor igual a"):
             return False
-        menores = self.df[column_name][self.df[column_name] < float(value)].tolist()
-        if menores:
-            return menores
-        return True
+        return self._validar_rango("validate_mayor_igual_a", column_name, value, minimo=True)
     
     def validate_menor_igual_a(self, column_name, value):
+        """
+        Valida que los valores de la columna sean menores o iguales al valor indicado.
+        Returns:
+            ResultadoValidacion: Número de valores mayores, muestra de filas y mapa de filas.
+        """
         if not self._check_column_exists(column_name, "validación menor igual a"):
             return False
-        mayores = self.df[column_name][self.df[column_name] > float(value)].tolist()
-        if mayores:
-            return mayores
-        return True
+        return self._validar_rango("validate_menor_igual_a", column_name, value, minimo=False)
 
-    def validate_sin_valores_repetidos(self, column_name, _):
+    def validate_sin_valores_repetidos(self, column_name, param):
+        """
+        Valida que la columna no tenga valores repetidos (sin contar nulos).
+        Returns:
+            ResultadoValidacion: Número de valores que repiten uno anterior, muestra con la primera
+            fila de cada grupo y mapa de filas repetidas.
+        """
         if not self._check_column_exists(column_name, "validación sin valores repetidos"):
             return False
-        repetidos = self.df[column_name][self.df[column_name].duplicated()].tolist()
-        if repetidos:
-            return list(set(repetidos))
-        return True
+        acumulador = self._acumulado("validate_sin_valores_repetidos", column_name, param)
+        repetidos = acumulador.resultado()
+        # Solo se materializan los valores de la muestra de grupos; por bloques salen de los valores
+        # guardados durante la pasada y solo si falta alguno se vuelve a leer la columna
+        filas = [filas[0] for filas, _ in repetidos.muestra]
+        valores = acumulador.valores_de(filas) if self.df is None else None
+        if valores is None:
+            valores = self._valores_en_filas(column_name, filas)
+        resultado = ResultadoValidacion("validate_sin_valores_repetidos", column_name, param, repetidos.repetidas == 0,
+                                        infracciones=repetidos.repetidas,
+                                        muestra=list(zip(filas, valores)),
+                                        filas=repetidos.filas)
+        self._informar_infracciones(
+            resultado,
+            f"Validación de valores repetidos en columna '{column_name}'",
+            f"No existen valores repetidos en la columna '{column_name}'.",
+            f"Se encontraron {repetidos.repetidas:,} valores repetidos en {repetidos.grupos:,} grupos.".replace(",", "."),
+        )
+        return resultado
+
+    def filas_infractoras(self, resultado, columnas=None):
+        """
+        Lee las filas completas con infracciones de un resultado. Es la única operación que
+        materializa todas las filas, por lo que solo se ejecuta cuando se pide.
+        Params:
+            resultado (ResultadoValidacion): Resultado con mapa de filas.
+            columnas (list): Columnas a leer (por defecto todas).
+        Returns:
+            pd.DataFrame: Filas con infracciones, indexadas por número de fila (desde 0).
+        """
+        if resultado.filas is None:
+            raise ValueError(f"La validación {resultado.validacion} no registra filas con infracciones.")
+        filas = resultado.filas.filas()
+        usecols = columnas or None
+
+        if self.df is not None and (columnas or self.columns) and all(col in self.df.columns for col in (columnas or self.columns)):
+            return self.df.loc[filas, columnas or self.columns]
+
+        partes = []
+        for chunk in self.file_selector.iter_chunks(self.file_path, self.chunksize or BLOQUE_LECTURA, usecols):
+            partes.append(chunk.loc[chunk.index.intersection(filas)])
+        return pd.concat(partes) if partes else pd.DataFrame(columns=columnas or self.columns)
 
     def validate_pertenece_a_categorias(self, column_name, cat_string):
         """
@@ -395,7 +1159,10 @@ class Validador:
             column_name (str): Nombre de la columna a validar.
             cat_string (str): Categorías válidas separadas por comas.
         Returns:
-            Agrega un mensaje al informe indicando si todos los valores pertenecen a las categorías esperadas.
+            ResultadoValidacion: Número de valores fuera de las categorías (también los nulos). No se
+            cumple si las categorías no se pueden convertir al tipo de la columna. Las categorías se
+            resuelven con las frecuencias de la columna, sin filas: el resultado no trae muestra ni
+            mapa de filas.
         """
         # Verificar si la columna existe
         if not self._check_column_exists(column_name, "validación de categorías"):
@@ -406,63 +1173,348 @@ class Validador:
         # Separar y limpiar las categorías
         categorias_str = [cat.strip() for cat in cat_string.split(",")]
         
-        # Convertir las categorías al tipo de dato de la columna
-        try:
-            if pd.api.types.is_numeric_dtype(self.df[column_name]):
-                categorias = [float(cat) if '.' in cat else int(cat) for cat in categorias_str]
-            else:
-                categorias = categorias_str
-        except ValueError:
-            return self.informe.add_spaced_sentence(f"Error: No se pudieron convertir las categorías [{cat_string}] al tipo de dato de la columna.", red=True)
+        # Las categorías se evalúan sobre las frecuencias del perfil; solo si la columna tiene demasiados
+        # valores distintos se recorre de nuevo convirtiendo las categorías al tipo de dato de cada bloque
+        categorias = Categorias.desde_perfil(self._perfil("validate_pertenece_a_categorias", column_name), categorias_str)
+        if categorias is None:
+            categorias = self._acumulado("validate_pertenece_a_categorias", column_name, cat_string)
+        if categorias.error_conversion:
+            self.informe.add_spaced_sentence(f"Error: No se pudieron convertir las categorías [{cat_string}] al tipo de dato de la columna.", red=True)
+            return ResultadoValidacion("validate_pertenece_a_categorias", column_name, cat_string, False, infracciones=None)
         
-        # Verificar qué valores pertenecen a las categorías
-        pertenece = self.df[column_name].isin(categorias)
-        valores_invalidos = self.df[column_name][~pertenece].unique().tolist()
-        valores_encontrados = self.df[column_name].unique().tolist()
+        valores_invalidos = categorias.primeros_invalidos
+        valores_encontrados = categorias.encontrados
         
         # Mostrar información básica
         self.informe.add_sentence(f"Categorías esperadas: {', '.join(categorias_str)}.")
         self.informe.add_sentence(f"Valores encontrados en la columna: {valores_encontrados[:15]}{'...' if len(valores_encontrados) > 15 else ''}.")
         
-        if pertenece.all():
-            return self.informe.add_spaced_sentence(f"✓ Todos los valores de la columna '{column_name}' pertenecen a las categorías esperadas.")
+        resultado = ResultadoValidacion("validate_pertenece_a_categorias", column_name, cat_string, categorias.invalidos == 0,
+                                        infracciones=categorias.invalidos)
+        if categorias.invalidos == 0:
+            self.informe.add_spaced_sentence(f"✓ Todos los valores de la columna '{column_name}' pertenecen a las categorías esperadas.")
         else:
-            count_invalidos = (~pertenece).sum()
+            count_invalidos = categorias.invalidos
             self.informe.add_sentence(f"✗ Se encontraron {count_invalidos:,} valores que no pertenecen a las categorías esperadas.".replace(",", "."), red=True)
             self.informe.add_sentence(f"Valores inválidos: {valores_invalidos[:10]}{'...' if len(valores_invalidos) > 10 else ''}.", red=True)
             self.informe.add_spacer()
+        return resultado
     
-    def validate_fecha_desde(self, column_name, _):
-        raise NotImplementedError
+    def validate_formato_fecha(self, column_name, formato):
+        """
+        Declara el formato de una columna de fechas. La columna se lee con ese formato en lugar
+        de deducirlo y las validaciones de fecha de la columna lo usan.
+        Params:
+            formato (str): Formato de las fechas, con la notación de validate_filename
+                           (AAAA, MM, DD), por ejemplo DD/MM/AAAA o AAAAMMDD.
+        Returns:
+            ResultadoValidacion: Número de valores vacíos o que no calzan con el formato.
+        """
+        print(f"Validando formato de fecha de la columna {column_name}...")
+
+        if not self._check_column_exists(column_name, "validación de formato de fecha"):
+            return False
+
+        self.informe.add_heading(f"Validación de formato de fecha en columna '{column_name}'")
+        sin_fecha = self._perfil("validate_formato_fecha", column_name).nulos
+        if sin_fecha == 0:
+            self.informe.add_spaced_sentence(f"✓ Todos los valores de la columna '{column_name}' son fechas con formato {formato}.")
+        else:
+            self.informe.add_spaced_sentence(f"✗ Se encontraron {sin_fecha:,} valores vacíos o que no calzan con el formato {formato}.".replace(",", "."), red=True)
+        return ResultadoValidacion("validate_formato_fecha", column_name, formato, sin_fecha == 0, infracciones=sin_fecha)
+
+    def _validar_fecha(self, function, column_name, fecha, minimo):
+        if not self._check_column_exists(column_name, "validación de fecha"):
+            return False
+        if pd.isna(self._limite_fecha(column_name, fecha)):
+            self.informe.add_heading(f"Validación de fechas en columna '{column_name}'")
+            self.informe.add_spaced_sentence(f"Error: La fecha [{fecha}] no es válida (use AAAA-MM-DD o el formato declarado de la columna).", red=True)
+            return False
+        return self._validar_rango(function, column_name, fecha, minimo, tipo="fechas")
+
+    def validate_fecha_desde(self, column_name, fecha):
+        """
+        Valida que las fechas de la columna sean posteriores o iguales a la fecha indicada.
+        Params:
+            fecha (str): Fecha mínima, como AAAA-MM-DD o en el formato declarado para la columna.
+        Returns:
+            ResultadoValidacion: Número de fechas anteriores, muestra de filas y mapa de filas.
+        """
+        return self._validar_fecha("validate_fecha_desde", column_name, fecha, minimo=True)
     
-    def validate_fecha_hasta(self, column_name, _):
-        raise NotImplementedError
+    def validate_fecha_hasta(self, column_name, fecha):
+        """
+        Valida que las fechas de la columna sean anteriores o iguales a la fecha indicada.
+        Params:
+            fecha (str): Fecha máxima, como AAAA-MM-DD o en el formato declarado para la columna.
+        Returns:
+            ResultadoValidacion: Número de fechas posteriores, muestra de filas y mapa de filas.
+        """
+        return self._validar_fecha("validate_fecha_hasta", column_name, fecha, minimo=False)
     
     def validate_nulos_permitidos(self, column_name, _):
         raise NotImplementedError
     
-    def validate_sin_caracteres_especiales(self, column_name, _):
-        raise NotImplementedError
+    def validate_sin_caracteres_especiales(self, column_name, permitidos):
+        """
+        Valida que los valores de la columna solo tengan caracteres de la clase permitida. Detecta
+        caracteres de control, separadores sueltos (';') y secuencias de mojibake de la lectura en
+        latin1 (por ejemplo 'ï»¿' o 'Ã±').
+        Params:
+            permitidos (str): Contenido de una clase de caracteres de expresión regular, por ejemplo
+                              A-Za-z0-9 áéíóúñÑ. Vacío para usar CARACTERES_PERMITIDOS.
+        Returns:
+            ResultadoValidacion: Número de valores con caracteres no permitidos, muestra de filas y mapa de filas.
+        """
+        print(f"Validando caracteres especiales de la columna {column_name}...")
+
+        if not self._check_column_exists(column_name, "validación de caracteres especiales"):
+            return False
+
+        especiales = self._acumulado("validate_sin_caracteres_especiales", column_name, permitidos)
+        resultado = ResultadoValidacion("validate_sin_caracteres_especiales", column_name, permitidos,
+                                        especiales.infracciones == 0, infracciones=especiales.infracciones,
+                                        muestra=especiales.muestra, filas=especiales.filas)
+        # Los caracteres no imprimibles se muestran por su código
+        caracteres = sorted(especiales.caracteres.items(), key=lambda item: (-item[1], item[0]))
+        encontrados = ", ".join(f"'{caracter}'" if caracter.isprintable() else f"U+{ord(caracter):04X}"
+                                for caracter, _ in caracteres[:20])
+        # La lista de caracteres puede tener comas, solo el total lleva separador de miles
+        total = f"{especiales.infracciones:,}".replace(",", ".")
+        self._informar_infracciones(
+            resultado,
+            f"Validación de caracteres especiales en columna '{column_name}'",
+            f"Todos los valores de la columna '{column_name}' tienen solo caracteres permitidos ([{permitidos.strip() or CARACTERES_PERMITIDOS}]).",
+            f"Se encontraron {total} valores con caracteres no permitidos: {encontrados}{'...' if len(caracteres) > 20 else ''}.",
+        )
+        return resultado
     
-    def validate_comuna(self, column_name, _):
-        raise NotImplementedError
+    def validate_comuna(self, column_name, nombre_column):
+        """
+        Valida que los valores de la columna sean comunas de la tabla de comunas, por código
+        (5101, 05101) o por nombre, sin distinguir tildes ni mayúsculas.
+        Params:
+            nombre_column (str): Columna con el nombre de la comuna. Si se indica, se revisa además
+                                 que el nombre de cada fila corresponda a su código.
+        Returns:
+            ResultadoValidacion: Número de valores desconocidos o inconsistentes, muestra de filas y mapa de filas.
+        """
+        print(f"Validando comunas de la columna {column_name}...")
+
+        if not self._check_column_exists(column_name, "validación de comunas"):
+            return False
+        if nombre_column and nombre_column.strip() and not self._check_column_exists(nombre_column.strip(), "validación de comunas"):
+            return False
+        if self.comunas_no_encontrada:
+            self.informe.add_heading(f"Validación de comunas en columna '{column_name}'")
+            self.informe.add_spaced_sentence(f"No se encontró la tabla de comunas {self.comunas_no_encontrada}; indíquela con "
+                                             "--comunas=ARCHIVO o con la variable de entorno VALIDADOR_COMUNAS.", red=True)
+            return False
+
+        comunas = self._acumulado("validate_comuna", column_name, nombre_column)
+        resultado = ResultadoValidacion("validate_comuna", column_name, nombre_column, comunas.infracciones == 0,
+                                        infracciones=comunas.infracciones, muestra=comunas.muestra, filas=comunas.filas)
+
+        # Los valores pueden tener comas, solo los totales llevan separador de miles
+        partes = []
+        if comunas.desconocidas:
+            desconocidas = sorted(comunas.desconocidas.items(), key=lambda item: (-item[1], str(item[0])))
+            listado = ", ".join(f"'{valor}' ({veces:,})".replace(",", ".") for valor, veces in desconocidas[:10])
+            total = f"{sum(comunas.desconocidas.values()):,}".replace(",", ".")
+            partes.append(f"{total} valores que no están en la tabla de comunas: {listado}{'...' if len(desconocidas) > 10 else ''}")
+        if comunas.inconsistentes:
+            pares = sorted(comunas.pares_inconsistentes.items(), key=lambda item: (-item[1], str(item[0])))
+            listado = ", ".join(f"{codigo} / '{nombre}' (es {self.comunas.nombre(self.comunas.resolver([codigo])[0])})"
+                                for (codigo, nombre), _ in pares[:10])
+            total = f"{comunas.inconsistentes:,}".replace(",", ".")
+            partes.append(f"{total} filas cuyo nombre de comuna no corresponde al código: {listado}{'...' if len(pares) > 10 else ''}")
+
+        consistencia = f" y corresponden a los nombres de la columna '{comunas.nombre_column}'" if comunas.nombre_column else ""
+        self._informar_infracciones(
+            resultado,
+            f"Validación de comunas en columna '{column_name}'",
+            f"Todos los valores de la columna '{column_name}' son comunas de la tabla de comunas{consistencia}.",
+            f"Se encontraron {' y '.join(partes)}.",
+        )
+        if comunas.sin_dato:
+            self.informe.add_spaced_sentence(f"Valores sin dato: {comunas.sin_dato:,}".replace(",", "."))
+        return resultado
 
     def run_validations(self):
 
-        for campo, validation in self.validations:
-            function, param = self.get_function_param(validation)
-            if function in self.validations_availables:
+        # Primero se calculan todas las validaciones (en paralelo, o en una sola pasada por bloques)
+        # y luego se escribe el informe en el orden del archivo de validaciones
+        # Con perfilar no se precalcula: cada validación calcula sus acumuladores dentro de su
+        # propio perfil de cProfile
+        inicio_total = time.perf_counter()
+        with MedicionMemoria() as medicion:
+            if not self.perfilar:
+                claves = [clave for clave in self._claves_plan()
+                          if clave[0] in self.acumuladores_disponibles and clave[0] not in VALIDACIONES_PERFIL]
+                self._precalcular(claves + self._claves_perfil())
+        self.segundos_precalculo = time.perf_counter() - inicio_total
+        self.memoria_precalculo = medicion.mb
+        if self.chunksize:
+            self._describir_medido()
 
-                self.validations_availables[function](campo, param)
+        # Las funciones del plan ya se verificaron al compilarlo
+        for regla in self.plan:
+            resultado = self._ejecutar_medido(regla.numero, regla.funcion, regla.campo, regla.param)
+            if not isinstance(resultado, ResultadoValidacion):
+                # La validación no se pudo evaluar (por ejemplo, la columna no existe): cuenta como no cumplida
+                resultado = ResultadoValidacion(regla.funcion, regla.campo or None, regla.param or None, False, infracciones=None)
+            self.resultados.append(resultado)
+            self.informe.add_resultado(resultado.a_dict())
 
-            else:
-                self.informe.add_heading(f"Validación {function}")
-                self.informe.add_spaced_sentence("No se encontró la función de validación.")
+        self.segundos_validaciones = time.perf_counter() - inicio_total
+        self._informar_rendimiento()
+        creado = self.informe.create_informe()
+        self._guardar_rendimiento()
+        self._guardar_instantanea()
+        if creado:
+            print("Informe generado con éxito.")
+        else:
+            print("❌ No se pudieron generar todos los formatos del informe.")
+        return creado
+
+    def _describir_medido(self):
+        """
+        Describe el archivo midiendo su tiempo y memoria aparte: con el archivo completo se llama
+        desde el constructor y el perfil de las columnas se calcula ahí, fuera del precálculo.
+        """
+        inicio = time.perf_counter()
+        with MedicionMemoria() as medicion:
+            self.describir_archivo()
+        self.segundos_descripcion = time.perf_counter() - inicio
+        self.memoria_descripcion = medicion.mb
 
-        self.informe.create_informe()
-        print("Informe generado con éxito.")
+    def _ejecutar_medido(self, numero, function, campo, param):
+        """
+        Ejecuta una validación midiendo su tiempo (más el de los acumuladores precalculados que usa),
+        la memoria máxima que usó y, si se pidió, su perfil de cProfile.
+        """
+        self._claves_usadas = set()
+        perfil = cProfile.Profile() if self.perfilar else None
+        medicion = MedicionMemoria(trazar=True)
+        inicio = time.perf_counter()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            with medicion:
+                resultado = self.validations_availables[function](campo, param)
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            segundos = time.perf_counter() - inicio
+            segundos_calculo = sum(self._tiempos_acumuladores.get(clave, 0) for clave in self._claves_usadas
+                                   if clave in self._precalculadas)
+            perfil_path = None
+            if perfil is not None:
+                perfil_path = os.path.join(self.output_folder, f"perfil_{self.filename}_{numero:02d}_{function}.prof")
+                perfil.dump_stats(perfil_path)
+            self.metricas.append(MetricaValidacion(function, campo if isinstance(campo, str) else None, param,
+                                                   segundos + segundos_calculo, segundos_calculo,
+                                                   medicion.mb, self.num_filas, perfil_path))
+        return resultado
+
+    def _informar_rendimiento(self):
+        """
+        Agrega al informe la sección de rendimiento: tiempo de precálculo y de cada validación.
+        """
+        self.informe.add_heading("Rendimiento de las validaciones")
+        self.informe.add_sentence(f"Tiempo de descripción y perfil de columnas: {self.segundos_descripcion:.2f} s")
+        self.informe.add_sentence(f"Tiempo de lectura y precálculo de acumuladores: {self.segundos_precalculo:.2f} s")
+        self.informe.add_sentence(f"Tiempo total de validaciones: {self.segundos_validaciones:.2f} s")
+        if not self.metricas:
+            return self.informe.add_spacer()
+
+        filas_tabla = [[metrica.validacion, metrica.columna or "-", f"{metrica.segundos:.3f}",
+                        f"{metrica.filas_por_segundo:,.0f}".replace(",", ".") if metrica.filas_por_segundo else "-",
+                        "-" if metrica.memoria_mb is None else f"{metrica.memoria_mb:.1f}"]
+                       for metrica in self.metricas]
+        self.informe.add_table(filas_tabla, headers=["Validación", "Columna", "Segundos", "Filas/s", "Memoria (MB)"])
+
+    def _guardar_instantanea(self):
+        """
+        Guarda la instantánea estadística del archivo en la carpeta de instantáneas.
+        """
+        try:
+            guardar_instantanea(self.carpeta_instantaneas, self.filename, self._instantanea())
+        except OSError as e:
+            print(f"Error al guardar la instantánea del archivo: {e}")
+
+    def _guardar_rendimiento(self):
+        """
+        Escribe las métricas de rendimiento en un JSON junto al informe.
+        """
+        rendimiento_path = os.path.join(self.output_folder, f"{self.informe.filename}_rendimiento.json")
+        rendimiento = {
+            "archivo": self.file_path,
+            "filas": self.num_filas,
+            "columnas": len(self.columns),
+            "bloques": self.chunksize,
+            "hilos": self.workers,
+            "segundos_descripcion": self.segundos_descripcion,
+            "memoria_descripcion_mb": self.memoria_descripcion,
+            "segundos_precalculo": self.segundos_precalculo,
+            "memoria_precalculo_mb": self.memoria_precalculo,
+            "segundos_validaciones": self.segundos_validaciones,
+            "segundos_informe": self.informe.tiempos,
+            "validaciones": [metrica.a_dict() for metrica in self.metricas],
+        }
+        try:
+            with open(rendimiento_path, "w", encoding="utf-8") as f:
+                json.dump(rendimiento, f, ensure_ascii=False, indent=2, default=str)
+        except OSError as e:
+            print(f"Error al guardar las métricas de rendimiento: {e}")
 
 if __name__ == "__main__":
+    # Lectura por bloques opcional: --bloques=N (filas por bloque)
+    # --sin-cache: parsear el archivo aunque exista en la caché columnar
+    # --hilos=N: número de hilos para calcular validaciones en paralelo
+    # --formatos=pdf,html,md,json,jsonl: formatos del informe (por defecto pdf y json)
+    # --gabinete=N, --salida=CARPETA: en modo CLI no se pregunta nada por consola
+    # --perfilar: guarda un perfil de cProfile por validación junto al informe
+    # --motor=arrow: lee el archivo completo con el lector CSV multihilo de pyarrow
+    # --comunas=ARCHIVO: tabla de comunas (código;nombre) para validate_comuna
+    chunksize = None
+    use_cache = True
+    workers = None
+    formatos = None
+    gabinete = None
+    output_folder = None
+    perfilar = False
+    motor = None
+    comunas = None
+    for arg in list(sys.argv[1:]):
+        if arg.startswith("--bloques="):
+            chunksize = int(arg.split("=", 1)[1])
+            sys.argv.remove(arg)
+        elif arg == "--sin-cache":
+            use_cache = False
+            sys.argv.remove(arg)
+        elif arg.startswith("--hilos="):
+            workers = int(arg.split("=", 1)[1])
+            sys.argv.remove(arg)
+        elif arg.startswith("--formatos="):
+            formatos = arg.split("=", 1)[1].split(",")
+            sys.argv.remove(arg)
+        elif arg.startswith("--gabinete="):
+            gabinete = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+        elif arg.startswith("--salida="):
+            output_folder = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+        elif arg == "--perfilar":
+            perfilar = True
+            sys.argv.remove(arg)
+        elif arg.startswith("--motor="):
+            motor = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+        elif arg.startswith("--comunas="):
+            comunas = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+
     # Verificar si se pasaron argumentos desde la línea de comandos
     if len(sys.argv) == 4:
         # Usar argumentos de línea de comandos: archivo_datos, validaciones, ruts_prueba
@@ -475,17 +1527,28 @@ if __name__ == "__main__":
         print(f"- Archivo de validaciones: {archivo_validaciones}")
         print(f"- Archivo de RUTs de prueba: {archivo_ruts_prueba}")
         
-        validador = Validador(archivo_datos, archivo_validaciones, archivo_ruts_prueba)
-        validador.run_validations()
+        # Modo no interactivo: sin gabinete se informa vacío en lugar de preguntarlo
+        try:
+            validador = Validador(archivo_datos, archivo_validaciones, archivo_ruts_prueba, chunksize, use_cache, workers,
+                                  gabinete=gabinete if gabinete is not None else "", output_folder=output_folder,
+                                  formatos=formatos, perfilar=perfilar, motor=motor, comunas=comunas)
+        except PlanInvalido as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if not validador.run_validations():
+            sys.exit(1)
     elif len(sys.argv) == 1:
         # Modo interactivo (sin argumentos) - usar selección de archivos
         print("Modo interactivo: seleccione los archivos manualmente")
-        validador = Validador(None, None, "RUTDEPRUEBAS.CSV")
-        validador.run_validations()
+        validador = Validador(None, None, "RUTDEPRUEBAS.CSV", chunksize, use_cache, workers, gabinete=gabinete,
+                              output_folder=output_folder, formatos=formatos, perfilar=perfilar, motor=motor,
+                              comunas=comunas)
+        if not validador.run_validations():
+            sys.exit(1)
     else:
         # Mostrar ayuda si el número de argumentos es incorrecto
         print("Uso del programa:")
-        print("  Modo CLI: python validaciones.py <archivo_datos> <archivo_validaciones> <archivo_ruts_prueba>")
+        print("  Modo CLI: python validaciones.py <archivo_datos> <archivo_validaciones> <archivo_ruts_prueba> [--bloques=N] [--sin-cache] [--hilos=N] [--formatos=pdf,html,md,json,jsonl] [--gabinete=N] [--salida=CARPETA] [--perfilar] [--motor=pandas|arrow] [--comunas=ARCHIVO]")
         print("  Ejemplo:  python validaciones.py catastro_ciren.csv validaciones_ciren.csv RUTDEPRUEBA.csv")
         print("  Modo interactivo: python validaciones.py (sin argumentos)")
         sys.exit(1)
@@ -0,0 +1,302 @@
+"""
+Vigilancia de una carpeta de entregas.
+
+Detecta los CSV nuevos o modificados de la carpeta (con inotify en Linux y, si no está disponible,
+revisando la carpeta periódicamente), espera a que cada archivo termine de escribirse (tamaño y
+fecha de modificación sin cambios durante unos segundos) y lo valida en un pool de procesos junto
+con los demás. El archivo de validaciones de cada entrega es el de la carpeta de validaciones cuyo
+validate_filename calza con el nombre del archivo.
+
+Los archivos ya validados se recuerdan por el hash de su contenido en vigilancia.json, en la carpeta
+de salida: una entrega copiada de nuevo, o con otro nombre, no se vuelve a validar.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import ctypes
+import ctypes.util
+import datetime
+import glob
+import json
+import os
+import re
+import select
+import signal
+import struct
+import sys
+import time
+
+from cache_archivos import CacheArchivos
+from file_selector import FileSelector
+from indice_comunas import IndiceComunas
+from indice_ruts import IndiceRuts
+from plan import parsear_validacion
+from validaciones import patron_nombre_archivo
+import lote
+
+
+REGISTRO_FILENAME = "vigilancia.json"
+
+# Eventos de inotify: archivo cerrado después de escribirlo y archivo movido a la carpeta
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+EVENTO = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Eventos de escritura de una carpeta con inotify (Linux), a través de la libc con ctypes.
+    Lanza OSError si el sistema no tiene inotify.
+    """
+
+    def __init__(self, carpeta):
+        nombre = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(nombre, use_errno=True) if nombre else None
+        if libc is None or not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify no está disponible en este sistema")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "No se pudo iniciar inotify")
+        if libc.inotify_add_watch(self.fd, os.fsencode(carpeta), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"No se pudo vigilar la carpeta {carpeta}")
+
+    def esperar(self, timeout):
+        """
+        Espera eventos hasta timeout segundos y retorna los nombres de archivo que cambiaron.
+        """
+        nombres = set()
+        listos, _, _ = select.select([self.fd], [], [], timeout)
+        while listos:
+            try:
+                datos = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            posicion = 0
+            while posicion < len(datos):
+                _, _, _, largo = EVENTO.unpack_from(datos, posicion)
+                posicion += EVENTO.size
+                nombre = datos[posicion:posicion + largo].rstrip(b"\0")
+                posicion += largo
+                if nombre:
+                    nombres.add(os.fsdecode(nombre))
+        return nombres
+
+    def cerrar(self):
+        os.close(self.fd)
+
+
+def _inicializar_worker(ruts_prueba, comunas):
+    # Ctrl+C detiene la vigilancia, no las validaciones en curso, que se esperan antes de salir
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    lote._inicializar_worker(ruts_prueba, comunas)
+
+
+def es_entrega(nombre):
+    # Se omiten los archivos ocultos y los temporales de Excel o de copias en curso
+    return nombre.lower().endswith(".csv") and not nombre.startswith((".", "~$"))
+
+
+def cargar_patrones(carpeta_validaciones):
+    """
+    Patrones de nombre de los archivos de validaciones de la carpeta (su validate_filename).
+    Returns:
+        list: Tuplas (expresión regular compilada, patrón, ruta del archivo de validaciones).
+    """
+    patrones = []
+    for validations_path in sorted(glob.glob(os.path.join(carpeta_validaciones, "*.csv"))):
+        try:
+            filas = FileSelector().load_validations(validations_path)
+        except ValueError as e:
+            print(f"⚠️ No se pudo leer {os.path.basename(validations_path)}: {e}")
+            continue
+        for _, validacion in filas:
+            try:
+                funcion, patron = parsear_validacion(validacion)
+            except ValueError:
+                continue
+            if funcion == "validate_filename" and patron.strip():
+                patrones.append((re.compile(patron_nombre_archivo(patron.strip())), patron.strip(), os.path.abspath(validations_path)))
+    return patrones
+
+
+def asignar_validaciones(file_path, patrones):
+    nombre = os.path.basename(file_path).rsplit(".", 1)[0]
+    for regex, _, validations_path in patrones:
+        if regex.match(nombre):
+            return validations_path
+    return None
+
+
+class Registro:
+    """
+    Archivos ya validados por hash de contenido, guardado en un JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.validados = json.load(f)
+        except (OSError, ValueError):
+            self.validados = {}
+
+    def __contains__(self, clave):
+        return clave in self.validados
+
+    def agregar(self, clave, resumen):
+        self.validados[clave] = dict(resumen, fecha=datetime.datetime.now().isoformat(timespec="seconds"))
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.validados, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def vigilar(carpeta, carpeta_validaciones, ruts_prueba_path, output_folder=None, procesos=None, gabinete="",
+            chunksize=None, use_cache=True, formatos=None, comunas_path=None, intervalo=2.0, espera=5.0,
+            una_vez=False):
+    """
+    Vigila la carpeta y valida cada entrega nueva o modificada.
+    Params:
+        carpeta (str): Carpeta donde llegan las entregas.
+        carpeta_validaciones (str): Carpeta con los archivos de validaciones (uno por tipo de entrega).
+        ruts_prueba_path (str): Archivo de RUTs de prueba, se carga una sola vez.
+        output_folder (str): Carpeta de los informes y del registro (por defecto, la carpeta vigilada).
+        procesos (int): Archivos que se validan a la vez (por defecto, uno por núcleo).
+        intervalo (float): Segundos entre revisiones de la carpeta (sin inotify) y de los archivos pendientes.
+        espera (float): Segundos que un archivo debe quedar sin cambios para considerarlo completo.
+        una_vez (bool): Validar las entregas presentes y terminar, en lugar de seguir vigilando.
+    """
+    carpeta = os.path.abspath(carpeta)
+    output_folder = os.path.abspath(output_folder or carpeta)
+    os.makedirs(output_folder, exist_ok=True)
+    registro = Registro(os.path.join(output_folder, REGISTRO_FILENAME))
+    cache = CacheArchivos()
+    excluidos = {os.path.abspath(path) for path in [ruts_prueba_path, comunas_path] if path}
+    excluidos.update(os.path.abspath(path) for path in glob.glob(os.path.join(carpeta_validaciones, "*.csv")))
+
+    inotify = None
+    if not una_vez:
+        try:
+            inotify = Inotify(carpeta)
+            print(f"👀 Vigilando {carpeta} con inotify")
+        except OSError as e:
+            print(f"👀 Vigilando {carpeta} cada {intervalo:g} s ({e})")
+
+    ruts_prueba = IndiceRuts.desde_csv(ruts_prueba_path, use_cache=use_cache)
+    comunas = IndiceComunas.desde_csv(comunas_path, use_cache=use_cache) if comunas_path else None
+
+    # Último (tamaño, fecha de modificación) procesado de cada ruta, archivos que se están escribiendo
+    # (ruta -> (tamaño, fecha, desde cuándo sin cambios)) y validaciones en curso (clave -> futuro)
+    procesados = {}
+    pendientes = {}
+    en_proceso = {}
+
+    def revisar(nombres):
+        for nombre in nombres:
+            path = os.path.join(carpeta, nombre)
+            if not es_entrega(nombre) or path in excluidos:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            firma = (stat.st_size, stat.st_mtime_ns)
+            if procesados.get(path) != firma and path not in pendientes:
+                pendientes[path] = (*firma, time.monotonic())
+
+    def listos():
+        ahora = time.monotonic()
+        for path, (size, mtime_ns, desde) in list(pendientes.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del pendientes[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                pendientes[path] = (stat.st_size, stat.st_mtime_ns, ahora)
+            elif ahora - desde >= espera and size > 0:
+                del pendientes[path]
+                procesados[path] = (size, mtime_ns)
+                yield path
+
+    def recoger():
+        for clave, (path, futuro) in list(en_proceso.items()):
+            if futuro.done():
+                del en_proceso[clave]
+                resumen = futuro.result()
+                registro.agregar(clave, resumen)
+                icono = "✅" if resumen["estado"] == "ok" else "❌"
+                print(f"{icono} {resumen['archivo']}: {resumen['estado']} {resumen['error'] or resumen['informe']}")
+
+    revisar(os.listdir(carpeta))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker,
+                             initargs=(ruts_prueba, comunas)) as executor:
+        try:
+            while True:
+                patrones = None
+                for path in listos():
+                    clave = cache.clave(path)
+                    if clave in registro or clave in en_proceso:
+                        print(f"⏭️ {os.path.basename(path)} ya fue validado (mismo contenido)")
+                        continue
+                    # Los archivos de validaciones se leen de nuevo en cada tanda, por si cambiaron
+                    patrones = patrones if patrones is not None else cargar_patrones(carpeta_validaciones)
+                    validations_path = asignar_validaciones(path, patrones)
+                    if validations_path is None:
+                        print(f"⚠️ {os.path.basename(path)}: ningún validate_filename calza con el nombre")
+                        continue
+                    print(f"📥 Validando {os.path.basename(path)} con {os.path.basename(validations_path)}")
+                    en_proceso[clave] = (path, executor.submit(lote._validar_archivo, path, validations_path, gabinete,
+                                                               output_folder, chunksize, use_cache, formatos))
+                recoger()
+
+                if una_vez and not pendientes and not en_proceso:
+                    return registro
+                if inotify is not None:
+                    revisar(inotify.esperar(intervalo))
+                else:
+                    time.sleep(intervalo)
+                    revisar(os.listdir(carpeta))
+        except KeyboardInterrupt:
+            print("🛑 Deteniendo la vigilancia; se esperan las validaciones en curso...")
+        finally:
+            if inotify is not None:
+                inotify.cerrar()
+            executor.shutdown(wait=True)
+            recoger()
+    return registro
+
+
+if __name__ == "__main__":
+    # Opciones: --gabinete=N, --salida=CARPETA, --procesos=N, --bloques=N, --formatos=pdf,json, --comunas=ARCHIVO,
+    # --intervalo=S, --espera=S, --una-vez, --sin-cache
+    opciones = {"gabinete": "", "salida": None, "procesos": None, "bloques": None, "formatos": None, "comunas": None,
+                "intervalo": "2", "espera": "5"}
+    use_cache = True
+    una_vez = False
+    argumentos = []
+    for arg in sys.argv[1:]:
+        if arg == "--sin-cache":
+            use_cache = False
+        elif arg == "--una-vez":
+            una_vez = True
+        elif arg.startswith("--") and "=" in arg and arg[2:].split("=", 1)[0] in opciones:
+            nombre, valor = arg[2:].split("=", 1)
+            opciones[nombre] = valor
+        else:
+            argumentos.append(arg)
+
+    if len(argumentos) != 3:
+        print("Uso del programa:")
+        print("  python vigilancia.py <carpeta_entregas> <carpeta_validaciones> <archivo_ruts_prueba> "
+              "[--gabinete=N] [--salida=CARPETA] [--procesos=N] [--bloques=N] [--formatos=pdf,html,md,json,jsonl] "
+              "[--comunas=ARCHIVO] [--intervalo=S] [--espera=S] [--una-vez] [--sin-cache]")
+        print("  Ejemplo:  python vigilancia.py /compartida/entregas validaciones/ RUTDEPRUEBAS.csv --salida=informes/")
+        sys.exit(1)
+
+    vigilar(argumentos[0], argumentos[1], argumentos[2], output_folder=opciones["salida"],
+            procesos=int(opciones["procesos"]) if opciones["procesos"] else None, gabinete=opciones["gabinete"],
+            chunksize=int(opciones["bloques"]) if opciones["bloques"] else None, use_cache=use_cache,
+            formatos=opciones["formatos"].split(",") if opciones["formatos"] else None,
+            comunas_path=opciones["comunas"], intervalo=float(opciones["intervalo"]), espera=float(opciones["espera"]),
+            una_vez=una_vez)